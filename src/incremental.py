@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+Append-only incremental feed updates with a retention window
+
+The existing feed is split into its raw <item> blocks and the CSV into its
+raw rows; neither is parsed into items nor re-rendered. Only items whose
+GUID is not in the feed yet are rendered, the blocks are ordered newest first
+by pubDate (undated blocks last), and blocks beyond the retention limits
+(max items / max age) are dropped from the end. The feed and the CSV are
+generated from the same item list in the same order, so the n-th CSV row
+belongs to the n-th feed item.
+"""
+
+import datetime
+import re
+import xml.etree.ElementTree as ET
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+ITEM_BLOCK_PATTERN = re.compile(r'  <item>\n.*?  </item>\n', re.S)
+GUID_PATTERN = re.compile(r'<guid[^>]*>(.*?)</guid>', re.S)
+PUBDATE_PATTERN = re.compile(r'<pubDate>(.*?)</pubDate>', re.S)
+
+def split_feed(text: str) -> List[str]:
+    """フィードのテキストからitem要素のブロックをそのまま取り出す"""
+    return ITEM_BLOCK_PATTERN.findall(text)
+
+def get_block_guid(block: str) -> Optional[str]:
+    """item要素のブロックからGUIDを取り出す"""
+    match = GUID_PATTERN.search(block)
+    return match.group(1) if match else None
+
+def get_block_pub_date(block: str) -> Optional[str]:
+    """item要素のブロックからpubDateの文字列を取り出す"""
+    match = PUBDATE_PATTERN.search(block)
+    return match.group(1) if match else None
+
+def block_to_item(block: str) -> Dict[str, Any]:
+    """item要素のブロックをアイテムに変換する（CSVの行を作り直す場合のみ使用する）
+
+    Raises:
+        xml.etree.ElementTree.ParseError: ブロックがXMLとして不正な場合（エスケープされていない&など）
+    """
+    element = ET.fromstring(block)
+    return {
+        'title': element.findtext('title'),
+        'link': element.findtext('link'),
+        'description': element.findtext('description'),
+        'pubDate': element.findtext('pubDate'),
+        'categories': [category.text for category in element.findall('category') if category.text],
+        'guid': element.findtext('guid'),
+    }
+
+def split_csv_rows(text: str) -> Tuple[str, List[str]]:
+    """CSVのテキストをヘッダー行とデータ行（改行を含む生の文字列）に分ける
+
+    すべてのフィールドがダブルクォートで囲まれている前提で、クォートの外にある改行で区切る。
+    """
+    rows = []
+    start = 0
+    in_quotes = False
+    for index, char in enumerate(text):
+        if char == '"':
+            in_quotes = not in_quotes
+        elif char == '\n' and not in_quotes:
+            rows.append(text[start:index + 1])
+            start = index + 1
+    if start < len(text):
+        rows.append(text[start:])
+    if not rows:
+        return '', []
+    return rows[0], rows[1:]
+
+def _to_aware(value: datetime.datetime) -> datetime.datetime:
+    return value.replace(tzinfo=datetime.timezone.utc) if value.tzinfo is None else value
+
+def sort_by_date(
+    entries: List[Any],
+    get_date: Callable[[Any], Optional[datetime.datetime]]
+) -> List[int]:
+    """エントリのインデックスを日付の新しい順に返す（日付が不明なエントリは元の順序のまま末尾に置く）"""
+    dates = [get_date(entry) for entry in entries]
+    dated = sorted((index for index, date in enumerate(dates) if date is not None),
+                   key=lambda index: _to_aware(dates[index]), reverse=True)
+    return dated + [index for index, date in enumerate(dates) if date is None]
+
+def apply_retention(
+    entries: List[Any],
+    get_date: Callable[[Any], Optional[datetime.datetime]],
+    max_items: Optional[int] = None,
+    max_days: Optional[int] = None,
+    now: Optional[datetime.datetime] = None
+) -> List[int]:
+    """保持するエントリのインデックスを返す
+
+    max_daysより古いエントリを除外し（日付が不明なエントリは保持する）、先頭からmax_items件までを残す。
+    """
+    kept = list(range(len(entries)))
+
+    if max_days is not None:
+        now = now or datetime.datetime.now(datetime.timezone.utc)
+        cutoff = now - datetime.timedelta(days=max_days)
+
+        def is_recent(index: int) -> bool:
+            entry_date = get_date(entries[index])
+            if entry_date is None:
+                return True
+            return _to_aware(entry_date) >= cutoff
+
+        kept = [index for index in kept if is_recent(index)]
+
+    if max_items is not None:
+        kept = kept[:max(0, max_items)]
+
+    return kept
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+Store of raw scraped items for reprocessing without scraping
+
+With --store-items the raw items of each scrape (before filtering) are saved
+as one gzip-compressed NDJSON file per URL and run:
+
+    <store>/<host>_<hash>/20251015T000000000000.ndjson.gz
+
+The first line is a header ({'url': ..., 'scraped_at': ..., 'scraper': ...})
+and every following line is one item. `main.py reprocess <url|all> [options]`
+reads the stored runs (newest first, de-duplicated by GUID) and runs the
+usual filtering and output generation over them without any network access.
+Runs scraped before --since are not read, since they cannot contain newer
+items.
+"""
+
+import datetime
+import gzip
+import hashlib
+import json
+import logging
+import os
+import urllib.parse
+from typing import Any, Dict, Iterator, List, Optional
+
+from scrapers.state import get_state_dir, write_file_atomic
+
+# ロガーの設定
+logger = logging.getLogger(__name__)
+
+RUN_FILE_SUFFIX = '.ndjson.gz'
+RUN_TIMESTAMP_FORMAT = '%Y%m%dT%H%M%S%f'
+
+# URLごとに保持する実行結果の数の上限（古いものから削除する）
+MAX_STORED_RUNS = 100
+
+def get_default_store_dir() -> str:
+    """アイテムの保存先の既定のディレクトリを返す"""
+    return os.path.join(get_state_dir(), 'items')
+
+def get_url_dir(store_dir: str, url: str) -> str:
+    """URLの実行結果を保存するディレクトリを返す"""
+    host = urllib.parse.urlparse(url).netloc.replace(':', '_') or 'unknown'
+    digest = hashlib.sha1(url.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(store_dir, f"{host}_{digest}")
+
+def list_runs(store_dir: str, url: str) -> List[str]:
+    """URLの実行結果のファイルを新しい順に返す"""
+    url_dir = get_url_dir(store_dir, url)
+    try:
+        names = os.listdir(url_dir)
+    except FileNotFoundError:
+        return []
+    runs = sorted((name for name in names if name.endswith(RUN_FILE_SUFFIX)), reverse=True)
+    return [os.path.join(url_dir, name) for name in runs]
+
+def get_run_time(path: str) -> Optional[datetime.datetime]:
+    """実行結果のファイル名から取得日時を返す"""
+    name = os.path.basename(path)[:-len(RUN_FILE_SUFFIX)]
+    try:
+        return datetime.datetime.strptime(name, RUN_TIMESTAMP_FORMAT)
+    except ValueError:
+        return None
+
+def save_run(store_dir: str, url: str, items: List[Dict[str, Any]], scraper: Optional[str] = None,
+             scraped_at: Optional[datetime.datetime] = None, max_runs: int = MAX_STORED_RUNS) -> str:
+    """1回の取得結果を保存し、上限を超えた古い実行結果を削除する
+
+    Returns:
+        保存したファイルのパス
+    """
+    scraped_at = scraped_at or datetime.datetime.now()
+    header = {'url': url, 'scraped_at': scraped_at.isoformat(), 'scraper': scraper}
+    lines = [json.dumps(record, ensure_ascii=False, default=str) for record in [header] + list(items)]
+    payload = gzip.compress(('\n'.join(lines) + '\n').encode('utf-8'), mtime=0)
+
+    path = os.path.join(get_url_dir(store_dir, url), scraped_at.strftime(RUN_TIMESTAMP_FORMAT) + RUN_FILE_SUFFIX)
+    write_file_atomic(path, payload)
+
+    for old_path in list_runs(store_dir, url)[max_runs:]:
+        try:
+            os.remove(old_path)
+        except OSError as e:
+            logger.warning(f"古い実行結果を削除できませんでした: {old_path}: {e}")
+    return path
+
+def read_run(path: str) -> Iterator[Dict[str, Any]]:
+    """実行結果のファイルからアイテムを順に返す（ヘッダー行を除く）"""
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        next(f, None)
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+def load_items(store_dir: str, url: str, since: Optional[str] = None) -> Optional[List[Dict[str, Any]]]:
+    """保存された実行結果からURLのアイテムを集める
+
+    新しい実行結果のアイテムを優先し、GUIDの重複を除く。sinceより前に取得した実行結果は読まない。
+
+    Returns:
+        アイテムのリスト。保存された実行結果がない場合はNone
+    """
+    runs = list_runs(store_dir, url)
+    if since:
+        cutoff = datetime.datetime.strptime(since, '%Y-%m-%d')
+        runs = [path for path in runs if (get_run_time(path) or cutoff) >= cutoff]
+    if not runs:
+        return None
+
+    items = []
+    guids = set()
+    for path in runs:
+        try:
+            for item in read_run(path):
+                guid = item.get('guid')
+                if guid and guid in guids:
+                    continue
+                guids.add(guid)
+                items.append(item)
+        except (OSError, EOFError, ValueError) as e:
+            logger.warning(f"実行結果の読み込みに失敗しました: {path}: {e}")
+
+    logger.info(f"保存された{len(runs)}回分の実行結果から{len(items)}件のアイテムを読み込みました")
+    return items
@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+"""
+AWS Lambda entry point
+
+Heavy resources (Chrome driver, HTTP connection pool, site configs and the
+date/category caches in the scraper modules) live at module scope so that
+warm invocations reuse them.
+
+Event format:
+    {
+        "urls": ["https://ja.monaca.io/headline/"],  # または "all"（省略時は "all"）
+        "since": "2025-01-01",
+        "until": "2025-12-31",
+        "category": "Important",
+        "exclude_category": "Other",
+        "selenium_wait": 30,
+        "post_load_wait": 8,
+        "debug": false,
+        "url_deadline": 120,         # URLごとの期限（秒）。実行全体の期限はLambdaの残り時間から決まる
+        "output": {
+            "type": "inline",        # "inline" / "local" / "s3"
+            "directory": "/tmp",     # type=local の出力先
+            "bucket": "my-bucket",   # type=s3 の出力先バケット
+            "prefix": "feeds/"       # type=s3 のキーのプレフィックス
+        }
+    }
+
+Local test:
+    python src/lambda_handler.py event.json
+"""
+
+import json
+import logging
+import os
+import sys
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+# モジュールのインポートパスを設定
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPT_DIR not in sys.path:
+    sys.path.insert(0, SCRIPT_DIR)
+
+import main as feed_main
+from scrapers import browser
+from scrapers import deadline
+from scrapers import report
+from scrapers import fetch  # noqa: F401  共有HTTPセッションをコンテナ内で保持する
+from scrapers.config import SITE_CONFIGS  # noqa: F401  サイト設定をコンテナ内で保持する
+
+# ロガーの設定
+logger = logging.getLogger(__name__)
+
+# コールドスタート後の最初の呼び出しかどうか
+_cold_start = True
+
+# S3クライアント（初回利用時に生成し、以降のinvocationで再利用する）
+_s3_client = None
+
+DEFAULT_OUTPUT_DIRECTORY = '/tmp'
+
+# Lambdaのタイムアウトまでに、結果の書き込みと応答のために残しておく時間（秒）
+DEADLINE_SAFETY_MARGIN = 15.0
+
+def _get_s3_client():
+    global _s3_client
+    if _s3_client is None:
+        import boto3
+        _s3_client = boto3.client('s3')
+    return _s3_client
+
+def build_args(event: Dict[str, Any]):
+    """イベントからmain.pyと同じ形式の引数オブジェクトを作成する"""
+    args = feed_main.parse_args(['all'])
+
+    for key in ('since', 'until', 'category', 'exclude_category',
+                'selenium_wait', 'post_load_wait', 'debug', 'debug_selenium', 'url_deadline'):
+        if key in event:
+            setattr(args, key, event[key])
+
+    # Lambda上では常にLambda最適化を使用し、ログはCloudWatchに出力する
+    args.lambda_optimized = True
+    args.silent = False
+
+    return args
+
+def get_event_urls(event: Dict[str, Any]) -> List[str]:
+    """イベントから対象URLのリストを取得する"""
+    urls = event.get('urls', 'all')
+    if isinstance(urls, str):
+        if urls.lower() == 'all':
+            return feed_main.get_target_urls()
+        return [urls]
+    return list(urls)
+
+def write_output(output: Dict[str, Any], filename: str, data: str) -> Optional[str]:
+    """出力先の種類に応じてデータを書き込む
+
+    Returns:
+        書き込み先のパスまたはS3 URI。inlineの場合はNone
+    """
+    output_type = output.get('type', 'inline')
+
+    if output_type == 'inline':
+        return None
+
+    if output_type == 'local':
+        directory = output.get('directory', DEFAULT_OUTPUT_DIRECTORY)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, filename)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(data)
+        return path
+
+    if output_type == 's3':
+        bucket = output['bucket']
+        key = f"{output.get('prefix', '')}{filename}"
+        content_type = 'application/rss+xml' if filename.endswith('.xml') else 'text/csv'
+        _get_s3_client().put_object(
+            Bucket=bucket,
+            Key=key,
+            Body=data.encode('utf-8'),
+            ContentType=f'{content_type}; charset=utf-8'
+        )
+        return f"s3://{bucket}/{key}"
+
+    raise ValueError(f"不明な出力先の種類です: {output_type}")
+
+def process_event_url(url: str, args, output: Dict[str, Any], run_report) -> Dict[str, Any]:
+    """1つのURLについてスクレイピングから出力までを実行し、処理結果を返す"""
+    logger.info(f"=== URLの処理を開始: {url} ===")
+    started = time.monotonic()
+
+    items = feed_main.scrape_url(url, args, SCRIPT_DIR)
+    if items is None:
+        return {'url': url, 'status': 'error'}
+
+    filtered_items = feed_main.filter_items(
+        items, args.since, args.until, args.category, args.exclude_category
+    )
+    rss_data = feed_main.generate_rss(filtered_items, url)
+    csv_data = feed_main.generate_csv(filtered_items)
+
+    feed_filename = feed_main.generate_default_filename(url, 'xml')
+    csv_filename = feed_filename.replace('.xml', '.csv')
+
+    try:
+        feed_output = write_output(output, feed_filename, rss_data)
+        csv_output = write_output(output, csv_filename, csv_data)
+    except Exception as e:
+        # 出力先のエラーは実行レポートに記録し、残りのURLの処理を続ける
+        logger.error(f"出力の書き込みに失敗しました: {url}: {e}")
+        run_report.set(url, 'output_error', str(e))
+        return {'url': url, 'status': 'error', 'error': str(e), 'report': run_report.get(url)}
+
+    result = {
+        'url': url,
+        'status': 'ok',
+        'item_count': len(filtered_items),
+        'elapsed_seconds': round(time.monotonic() - started, 3),
+        'feed_output': feed_output,
+        'csv_output': csv_output,
+        'report': run_report.get(url),
+    }
+    if output.get('type', 'inline') == 'inline':
+        result['feed'] = rss_data
+        result['csv'] = csv_data
+
+    return result
+
+def get_run_deadline(context: Any) -> Optional[float]:
+    """Lambdaの残り時間から実行全体の期限（秒）を求める"""
+    get_remaining = getattr(context, 'get_remaining_time_in_millis', None)
+    if get_remaining is None:
+        return None
+    return max(0.0, get_remaining() / 1000 - DEADLINE_SAFETY_MARGIN)
+
+def handler(event: Optional[Dict[str, Any]], context: Any) -> Dict[str, Any]:
+    """Lambdaのハンドラー
+
+    Args:
+        event: 対象URL、フィルタ条件、出力先を含むイベント
+        context: Lambdaのコンテキスト
+
+    Returns:
+        URLごとの処理結果
+    """
+    global _cold_start
+
+    # ウォームスタート時にChromeDriverを再利用する（インポートしただけでは有効にしない）
+    if _cold_start:
+        browser.set_keep_alive(True)
+        _cold_start = False
+
+    event = event or {}
+    args = build_args(event)
+    logging.getLogger().setLevel(logging.DEBUG if args.debug else logging.INFO)
+
+    output = event.get('output', {'type': 'inline'})
+    results = []
+    run_report = report.get_report()
+    run_report.clear()
+
+    with deadline.deadline_scope(get_run_deadline(context)):
+        for url in get_event_urls(event):
+            # 期限を過ぎた後のURLは処理せず、次回の実行に回す
+            if deadline.expired():
+                logger.warning(f"実行の期限を過ぎたため処理しません: {url}")
+                results.append({'url': url, 'status': 'skipped'})
+                continue
+
+            results.append(process_event_url(url, args, output, run_report))
+
+    status_code = 200 if all(r['status'] == 'ok' for r in results) else 207
+    return {'statusCode': status_code, 'results': results}
+
+class LocalContext:
+    """ローカルでハンドラーを試すための疑似Lambdaコンテキスト"""
+
+    def __init__(self, timeout_seconds: int = 900, function_name: str = 'local-feed-generator'):
+        self.function_name = function_name
+        self.function_version = '$LATEST'
+        self.memory_limit_in_mb = 2048
+        self.aws_request_id = str(uuid.uuid4())
+        self._deadline = time.monotonic() + timeout_seconds
+
+    def get_remaining_time_in_millis(self) -> int:
+        return max(0, int((self._deadline - time.monotonic()) * 1000))
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    local_event = {}
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], encoding='utf-8') as f:
+            local_event = json.load(f)
+
+    try:
+        response = handler(local_event, LocalContext())
+    finally:
+        browser.shutdown_driver()
+
+    print(json.dumps(response, ensure_ascii=False, indent=2))
@@ -3,15 +3,29 @@
 
 import argparse
 import datetime
+import hashlib
+import json
 import os
 import importlib
 import importlib.util
+import inspect
 import urllib.parse
 import xml.etree.ElementTree as ET
 import re
 import sys
 import logging
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable
+
+# モジュールのインポートパスを設定（scrapersパッケージを読み込めるようにする）
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPT_DIR not in sys.path:
+    sys.path.insert(0, SCRIPT_DIR)
+
+from scrapers import browser
+from scrapers import deadline
+from scrapers.guid import normalize_item
+from scrapers.report import get_report
+from scrapers.state import write_file_atomic
 
 # ロガーの設定
 logger = logging.getLogger(__name__)
@@ -34,9 +48,24 @@ def setup_logger(debug_mode: bool, silent_mode: bool):
             format='%(message)s'
         )
 
-def parse_args():
-    """コマンドライン引数を解析する"""
-    parser = argparse.ArgumentParser(description='指定されたURLのWebページからお知らせ情報を取得し、フィードデータとCSVを出力します')
+def parse_args(argv: Optional[List[str]] = None):
+    """コマンドライン引数を解析する
+
+    先頭に"reprocess"を指定した場合は、スクレイピングせずに保存済みのアイテム（--store-items）から出力を再生成する。
+
+    Args:
+        argv: 解析する引数のリスト。省略時はsys.argvを使用
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+    reprocess = bool(argv) and argv[0] == 'reprocess'
+    if reprocess:
+        argv = argv[1:]
+    
+    parser = argparse.ArgumentParser(
+        description='指定されたURLのWebページからお知らせ情報を取得し、フィードデータとCSVを出力します',
+        epilog='reprocess <URL|all> [オプション]: スクレイピングせずに、--store-itemsで保存したアイテムから出力を再生成する'
+    )
     parser.add_argument('url', help='スクレイピング対象のURL、または"all"を指定して全ての対象URLに対して実行')
     parser.add_argument('--since', help='指定した日付以降の情報のみを抽出 (YYYY-MM-DD形式)')
     parser.add_argument('--until', help='指定した日付以前の情報のみを抽出 (YYYY-MM-DD形式)')
@@ -45,6 +74,9 @@ def parse_args():
     parser.add_argument('--feed-output', help='フィードデータの出力ファイルパス')
     parser.add_argument('--csv-output', help='CSVデータの出力ファイルパス')
     parser.add_argument('--diff-mode', action='store_true', help='差分モード: 既存フィードデータの最新日時以降の項目のみを出力')
+    parser.add_argument('--incremental', action='store_true', help='追記モード: 既存のフィードとCSVに新しい項目だけを追加して更新する')
+    parser.add_argument('--retention-items', type=int, help='追記モードでフィードに保持する項目数の上限')
+    parser.add_argument('--retention-days', type=int, help='追記モードでフィードに保持する項目の日数（今日から遡る日数）')
     parser.add_argument('--with-date', action='store_true', help='出力ファイル名に日付を付加する')
     parser.add_argument('--debug', action='store_true', help='デバッグモード: 詳細なログを出力')
     parser.add_argument('--silent', action='store_true', help='サイレントモード: ログを出力しない')
@@ -52,8 +84,36 @@ def parse_args():
     parser.add_argument('--post-load-wait', type=int, help='ページロード後の追加待機時間（秒）を指定')
     parser.add_argument('--lambda-optimized', action='store_true', help='Lambda最適化モードを明示的に有効化')
     parser.add_argument('--debug-selenium', action='store_true', help='Seleniumの詳細ログを出力')
+    parser.add_argument('--profiles', help='フィルタ条件と出力先をまとめたプロファイルファイル（TOML/JSON）。1回のスクレイピング結果から全プロファイルの出力を生成する')
+    parser.add_argument('--shard-by', choices=['month', 'category', 'product'], help='月・カテゴリ・製品ごとにフィードとCSVを分割して出力し、シャードの一覧を生成する')
+    parser.add_argument('--max-open-files', type=int, default=32, help='シャード出力時に同時に開くファイル数の上限')
+    parser.add_argument('--compress', help='圧縮したフィードとCSVも出力する（gzip、zstdをカンマ区切りで指定）')
+    parser.add_argument('--compression-level', type=int, help='圧縮レベル（省略時はgzip: 9、zstd: 19）')
+    parser.add_argument('--compressed-only', action='store_true', help='圧縮ファイルのみを出力し、非圧縮のファイルは出力しない')
+    parser.add_argument('--ndjson-output', help='フィードとCSVの代わりにNDJSON（1行1アイテムのJSON）を出力するファイルパス。"-"を指定すると標準出力に書き込む')
+    parser.add_argument('--merge-output', help='全対象URLのアイテムを新しい順に統合した1つのフィードの出力ファイルパス（CSVは拡張子を.csvにしたパスに出力）')
+    parser.add_argument('--merge-max-items', type=int, help='統合フィードに含める最新アイテム数の上限')
+    parser.add_argument('--merge-max-days', type=int, help='統合フィードに含めるアイテムの日数（今日から遡る日数）')
+    parser.add_argument('--force-write', action='store_true', help='内容が変わっていなくても出力ファイルを書き直す')
+    parser.add_argument('--max-pages', type=int, help='ページ送りで取得するページ数の上限（取得済みのGUIDを含むページに達した時点で終了）')
+    parser.add_argument('--deadline', type=float, help='実行全体の期限（秒）。期限までの残り時間に合わせて待機やリトライを短縮し、期限を過ぎた後のURLは処理しない')
+    parser.add_argument('--url-deadline', type=float, help='URLごとのスクレイピングの期限（秒）。間に合わない取得手法は省略し、それまでに取得できたアイテムを使用する')
+    parser.add_argument('--stale-while-revalidate', action='store_true', help='前回の正常な取得結果から先に出力し、最新の取得結果が同等以上の場合のみ置き換える')
+    parser.add_argument('--stale-max-age', type=float, help='--stale-while-revalidateで使用する前回の取得結果の経過時間の上限（秒）')
+    parser.add_argument('--record', metavar='DIR', help='取得したHTTPレスポンスとSeleniumのページをディレクトリに記録する')
+    parser.add_argument('--replay', metavar='DIR', help='--recordで記録したレスポンスを使用し、ネットワークやChromeを使わずに実行する')
+    parser.add_argument('--store-items', action='store_true', help='フィルタリング前のアイテムを実行ごとに保存する（reprocessで再利用）')
+    parser.add_argument('--item-store', metavar='DIR', help='アイテムの保存先ディレクトリ（省略時は状態ディレクトリのitems）')
+    parser.add_argument('--sites', metavar='FILE', help='宣言的なサイト定義のファイル（TOML/JSON）。定義したサイトはスクレイパーのモジュールなしで取得でき、"all"の対象にも含まれる')
+    parser.add_argument('--discover-endpoint', action='store_true', help='Seleniumの実行中にデータを返すJSONエンドポイントを検出して記録する')
+    parser.add_argument('--schedule', action='store_true', help='スケジューラーモード: サイトごとの更新間隔で繰り返し実行')
+    parser.add_argument('--schedule-interval', type=int, help='全サイト共通の更新間隔（秒）を指定（省略時はサイト設定の値を使用）')
+    parser.add_argument('--schedule-jitter', type=float, default=60.0, help='実行時刻に加えるランダムな揺らぎの最大値（秒）')
+    parser.add_argument('--schedule-workers', type=int, default=1, help='スケジューラーモードで同時に実行するサイト数の上限')
     
-    return parser.parse_args()
+    args = parser.parse_args(argv)
+    args.reprocess = reprocess
+    return args
 
 def get_scraper_module_name(url: str) -> str:
     """URLからスクレイパーのモジュール名を取得する
@@ -103,54 +163,71 @@ def get_scraper_module_name(url: str) -> str:
     
     return module_name
 
-def filter_items(items: List[Dict[str, Any]], since: Optional[str], until: Optional[str], 
-                category: Optional[str], exclude_category: Optional[str]) -> List[Dict[str, Any]]:
-    """フィルタ条件に基づいてアイテムをフィルタリングする"""
-    filtered_items = []
+def parse_item_date(item_date) -> Optional[datetime.datetime]:
+    """アイテムのpubDateをdatetimeオブジェクトに変換する。解析できない場合はNone"""
+    if isinstance(item_date, datetime.datetime):
+        return item_date
+    if not isinstance(item_date, str):
+        return None
+    try:
+        return datetime.datetime.strptime(item_date, '%a, %d %b %Y %H:%M:%S %z')
+    except ValueError:
+        try:
+            return datetime.datetime.strptime(item_date, '%Y-%m-%d')
+        except ValueError:
+            return None
+
+def build_item_filter(since: Optional[str], until: Optional[str],
+                      category: Optional[str], exclude_category: Optional[str]) -> Callable[[Dict[str, Any]], bool]:
+    """フィルタ条件からアイテムの判定関数を作成する
+
+    条件の解析は一度だけ行うため、同じ条件で多数のアイテムを判定する場合に使用する。
+    """
+    since_date = datetime.datetime.strptime(since, '%Y-%m-%d').date() if since else None
+    until_date = datetime.datetime.strptime(until, '%Y-%m-%d').date() if until else None
+    category_lower = category.lower() if category else None
+    exclude_category_lower = exclude_category.lower() if exclude_category else None
     
-    for item in items:
+    def matches(item: Dict[str, Any]) -> bool:
         # 日付フィルタリング
-        include = True
         if 'pubDate' in item and item['pubDate']:
-            item_date = item['pubDate']
-            # datetimeオブジェクトに変換
-            if isinstance(item_date, str):
-                try:
-                    item_date = datetime.datetime.strptime(item_date, '%a, %d %b %Y %H:%M:%S %z')
-                except ValueError:
-                    try:
-                        item_date = datetime.datetime.strptime(item_date, '%Y-%m-%d')
-                    except ValueError:
-                        include = False
+            item_date = parse_item_date(item['pubDate'])
+            if item_date is None:
+                return False
             
-            if include and since:
-                since_date = datetime.datetime.strptime(since, '%Y-%m-%d')
-                if item_date.date() < since_date.date():
-                    include = False
+            if since_date and item_date.date() < since_date:
+                return False
             
-            if include and until:
-                until_date = datetime.datetime.strptime(until, '%Y-%m-%d')
-                if item_date.date() > until_date.date():
-                    include = False
+            if until_date and item_date.date() > until_date:
+                return False
         
         # カテゴリを含むフィルタリング
-        if include and category and 'categories' in item:
-            if category.lower() not in [c.lower() for c in item['categories']]:
-                include = False
+        if category_lower and 'categories' in item:
+            if category_lower not in [c.lower() for c in item['categories']]:
+                return False
         
         # カテゴリを除外するフィルタリング
-        if include and exclude_category and 'categories' in item:
-            if exclude_category.lower() in [c.lower() for c in item['categories']]:
-                include = False
+        if exclude_category_lower and 'categories' in item:
+            if exclude_category_lower in [c.lower() for c in item['categories']]:
+                return False
         
-        if include:
-            filtered_items.append(item)
+        return True
     
-    return filtered_items
+    return matches
 
-def generate_rss(items: List[Dict[str, Any]], url: str, title: str = "お知らせフィード") -> str:
-    """RSSフィードを生成する"""
-    rss_template = f'''<?xml version="1.0" encoding="UTF-8" ?>
+def filter_items(items: List[Dict[str, Any]], since: Optional[str], until: Optional[str], 
+                category: Optional[str], exclude_category: Optional[str]) -> List[Dict[str, Any]]:
+    """フィルタ条件に基づいてアイテムをフィルタリングする"""
+    matches = build_item_filter(since, until, category, exclude_category)
+    return [item for item in items if matches(item)]
+
+RSS_FOOTER = '</channel>\n</rss>'
+
+CSV_HEADER = "Date,Title,Category,Description\n"
+
+def render_rss_header(url: str, title: str = "お知らせフィード") -> str:
+    """RSSフィードの先頭部分（channelの要素）を生成する"""
+    return f'''<?xml version="1.0" encoding="UTF-8" ?>
 <rss version="2.0">
 <channel>
   <title>{title}</title>
@@ -159,76 +236,115 @@ def generate_rss(items: List[Dict[str, Any]], url: str, title: str = "お知ら
   <language>ja</language>
   <lastBuildDate>{datetime.datetime.now().strftime('%a, %d %b %Y %H:%M:%S +0000')}</lastBuildDate>
 '''
+
+def render_rss_item(item: Dict[str, Any]) -> str:
+    """1件のアイテムをRSSのitem要素に変換する"""
+    rss_item = '  <item>\n'
+    if 'title' in item and item['title']:
+        rss_item += f'    <title>{item["title"]}</title>\n'
+    else:
+        rss_item += '    <title>不明</title>\n'
     
-    for item in items:
-        rss_item = '  <item>\n'
-        if 'title' in item and item['title']:
-            rss_item += f'    <title>{item["title"]}</title>\n'
-        else:
-            rss_item += '    <title>不明</title>\n'
-        
-        if 'link' in item and item['link']:
-            rss_item += f'    <link>{item["link"]}</link>\n'
-        
-        if 'description' in item and item['description']:
-            rss_item += f'    <description><![CDATA[{item["description"]}]]></description>\n'
+    if 'link' in item and item['link']:
+        rss_item += f'    <link>{item["link"]}</link>\n'
+    
+    if 'description' in item and item['description']:
+        rss_item += f'    <description><![CDATA[{item["description"]}]]></description>\n'
+    else:
+        rss_item += '    <description>不明</description>\n'
+    
+    if 'pubDate' in item and item['pubDate']:
+        if isinstance(item['pubDate'], datetime.datetime):
+            rss_item += f'    <pubDate>{item["pubDate"].strftime("%a, %d %b %Y %H:%M:%S %z")}</pubDate>\n'
         else:
-            rss_item += '    <description>不明</description>\n'
-        
-        if 'pubDate' in item and item['pubDate']:
-            if isinstance(item['pubDate'], datetime.datetime):
-                rss_item += f'    <pubDate>{item["pubDate"].strftime("%a, %d %b %Y %H:%M:%S %z")}</pubDate>\n'
-            else:
-                rss_item += f'    <pubDate>{item["pubDate"]}</pubDate>\n'
+            rss_item += f'    <pubDate>{item["pubDate"]}</pubDate>\n'
+    else:
+        rss_item += '    <pubDate>不明</pubDate>\n'
+    
+    if 'categories' in item and item['categories']:
+        for category in item['categories']:
+            rss_item += f'    <category>{category}</category>\n'
+    
+    if 'guid' in item and item['guid']:
+        rss_item += f'    <guid isPermaLink="false">{item["guid"]}</guid>\n'
+    
+    rss_item += '  </item>\n'
+    return rss_item
+
+def generate_rss(items: List[Dict[str, Any]], url: str, title: str = "お知らせフィード") -> str:
+    """RSSフィードを生成する"""
+    return render_rss_header(url, title) + ''.join(render_rss_item(item) for item in items) + RSS_FOOTER
+
+def render_csv_row(item: Dict[str, Any]) -> str:
+    """1件のアイテムをCSVの行に変換する"""
+    date = "不明"
+    if 'pubDate' in item and item['pubDate']:
+        if isinstance(item['pubDate'], datetime.datetime):
+            date = item['pubDate'].strftime('%Y/%m/%d')
         else:
-            rss_item += '    <pubDate>不明</pubDate>\n'
-        
-        if 'categories' in item and item['categories']:
-            for category in item['categories']:
-                rss_item += f'    <category>{category}</category>\n'
-        
-        if 'guid' in item and item['guid']:
-            rss_item += f'    <guid isPermaLink="false">{item["guid"]}</guid>\n'
-        
-        rss_item += '  </item>\n'
-        rss_template += rss_item
+            try:
+                # RFC822形式の日付文字列をパース
+                parsed_date = datetime.datetime.strptime(item['pubDate'], '%a, %d %b %Y %H:%M:%S %z')
+                date = parsed_date.strftime('%Y/%m/%d')
+            except ValueError:
+                # 他の形式の場合はそのまま使用
+                date = item['pubDate']
+    
+    title = "不明"
+    if 'title' in item and item['title']:
+        title = item['title'].replace('"', '""')
+    
+    category = "不明"
+    if 'categories' in item and item['categories']:
+        category = ", ".join(item['categories']).replace('"', '""')
     
-    rss_template += '</channel>\n</rss>'
-    return rss_template
+    description = "不明"
+    if 'description' in item and item['description']:
+        description = item['description'].replace('"', '""')
+    
+    return f'"{date}","{title}","{category}","{description}"\n'
 
 def generate_csv(items: List[Dict[str, Any]]) -> str:
     """CSVデータを生成する"""
-    csv_data = "Date,Title,Category,Description\n"
-    
+    return CSV_HEADER + ''.join(render_csv_row(item) for item in items)
+
+# NDJSON出力の各行のキー（順序を含めて固定）
+NDJSON_FIELDS = ('guid', 'date', 'title', 'link', 'description', 'categories', 'source', 'scraper')
+
+def item_to_record(item: Dict[str, Any], url: str, scraper: Optional[str] = None) -> Dict[str, Any]:
+    """アイテムをNDJSON出力用のレコードに変換する（日付はISO 8601形式、不明な場合はNone）"""
+    item_date = parse_item_date(item.get('pubDate')) if item.get('pubDate') else None
+    return {
+        'guid': item.get('guid'),
+        'date': item_date.isoformat() if item_date else None,
+        'title': item.get('title'),
+        'link': item.get('link'),
+        'description': item.get('description'),
+        'categories': list(item.get('categories') or []),
+        'source': url,
+        'scraper': scraper,
+    }
+
+def write_ndjson(
+    items: List[Dict[str, Any]],
+    url: str,
+    stream,
+    matches: Optional[Callable[[Dict[str, Any]], bool]] = None,
+    scraper: Optional[str] = None
+) -> int:
+    """フィルタ条件に一致したアイテムから順に1行ずつJSONとして書き込む
+
+    Returns:
+        書き込んだ行数
+    """
+    count = 0
     for item in items:
-        date = "不明"
-        if 'pubDate' in item and item['pubDate']:
-            if isinstance(item['pubDate'], datetime.datetime):
-                date = item['pubDate'].strftime('%Y/%m/%d')
-            else:
-                try:
-                    # RFC822形式の日付文字列をパース
-                    parsed_date = datetime.datetime.strptime(item['pubDate'], '%a, %d %b %Y %H:%M:%S %z')
-                    date = parsed_date.strftime('%Y/%m/%d')
-                except ValueError:
-                    # 他の形式の場合はそのまま使用
-                    date = item['pubDate']
-        
-        title = "不明"
-        if 'title' in item and item['title']:
-            title = item['title'].replace('"', '""')
-        
-        category = "不明"
-        if 'categories' in item and item['categories']:
-            category = ", ".join(item['categories']).replace('"', '""')
-        
-        description = "不明"
-        if 'description' in item and item['description']:
-            description = item['description'].replace('"', '""')
-        
-        csv_data += f'"{date}","{title}","{category}","{description}"\n'
-    
-    return csv_data
+        if matches is not None and not matches(item):
+            continue
+        stream.write(json.dumps(item_to_record(item, url, scraper), ensure_ascii=False) + '\n')
+        count += 1
+    stream.flush()
+    return count
 
 def generate_default_filename(url: str, extension: str, with_date: bool = False) -> str:
     """URLと日付に基づくデフォルトのファイル名を生成する"""
@@ -262,13 +378,20 @@ def get_next_available_filename(filename: str) -> str:
         return filename
     
     base_name, extension = os.path.splitext(filename)
-    counter = 1
     
-    while True:
-        new_filename = f"{base_name}_{counter}{extension}"
-        if not os.path.exists(new_filename):
-            return new_filename
+    # ディレクトリを1回だけ走査して使用済みの連番を集める
+    directory = os.path.dirname(base_name) or '.'
+    pattern = re.compile(re.escape(os.path.basename(base_name)) + r'_(\d+)' + re.escape(extension) + '$')
+    used = set()
+    for name in os.listdir(directory):
+        match = pattern.match(name)
+        if match:
+            used.add(int(match.group(1)))
+    
+    counter = 1
+    while counter in used:
         counter += 1
+    return f"{base_name}_{counter}{extension}"
 
 def get_latest_date_from_feed(feed_file: str) -> Optional[datetime.datetime]:
     """既存のフィードファイルから最新の日付を取得する"""
@@ -304,12 +427,642 @@ def get_latest_date_from_feed(feed_file: str) -> Optional[datetime.datetime]:
         logger.error(f"フィードファイルの解析中にエラーが発生しました: {e}")
         return None
 
+def compute_items_hash(items: List[Dict[str, Any]], url: str) -> str:
+    """出力内容を決めるアイテムのハッシュ値を計算する（カテゴリの順序に依存しない）"""
+    payload = json.dumps({'url': url, 'items': [normalize_item(item) for item in items]},
+                         ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def get_hash_sidecar_path(feed_output: str) -> str:
+    """フィードのハッシュ値を保存するサイドカーファイルのパスを返す"""
+    return f"{feed_output}.hash"
+
+def read_hash_sidecar(feed_output: str) -> Optional[str]:
+    """サイドカーファイルから前回のハッシュ値を読み込む"""
+    try:
+        with open(get_hash_sidecar_path(feed_output), encoding='utf-8') as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+def get_compression_options(args) -> Optional[Dict[str, Any]]:
+    """コマンドライン引数から圧縮出力の設定を作成する（圧縮しない場合はNone）"""
+    encodings = getattr(args, 'compress', None)
+    if not encodings:
+        return None
+    return {
+        'encodings': encodings,
+        'level': getattr(args, 'compression_level', None),
+        'keep_plain': not getattr(args, 'compressed_only', False),
+    }
+
+def write_feed_outputs(
+    items: List[Dict[str, Any]],
+    url: str,
+    feed_output: str,
+    csv_output: str,
+    force: bool = False,
+    compression: Optional[Dict[str, Any]] = None,
+    title: str = "お知らせフィード"
+) -> bool:
+    """フィードとCSVを出力する
+
+    アイテムのハッシュ値が前回と同じで出力ファイルが揃っている場合は、生成も書き込みも行わない。
+    書き込みは一時ファイルに書いてから置き換えるため、読み手が書きかけのファイルを見ることはない。
+
+    Args:
+        compression: 圧縮出力の設定（encodings、level、keep_plain）。省略時は非圧縮のみ
+        title: フィードのタイトル
+
+    Returns:
+        ファイルを書き込んだ場合True、変更がなく省略した場合False
+    """
+    content_hash = compute_items_hash(items, url)
+    
+    if compression:
+        from output_compression import get_output_paths, write_output_variants
+        expected_paths = (get_output_paths(feed_output, compression['encodings'], compression['keep_plain'])
+                          + get_output_paths(csv_output, compression['encodings'], compression['keep_plain']))
+    else:
+        expected_paths = [feed_output, csv_output]
+    
+    if (not force
+            and all(os.path.exists(path) for path in expected_paths)
+            and read_hash_sidecar(feed_output) == content_hash):
+        logger.info(f"内容に変更がないため '{feed_output}' と '{csv_output}' の出力を省略しました。")
+        return False
+    
+    # RSSフィードの生成
+    rss_data = generate_rss(items, url, title)
+    
+    # CSVデータの生成
+    csv_data = generate_csv(items)
+    
+    # ファイルに書き込み
+    if compression:
+        variants = []
+        for path, data in ((feed_output, rss_data), (csv_output, csv_data)):
+            variants.extend(write_output_variants(
+                path, data.encode('utf-8'),
+                compression['encodings'], compression['level'], compression['keep_plain']
+            ))
+        # 圧縮にかかった時間を実行レポートに記録する
+        compress_ms = round(sum(variant['compress_seconds'] for variant in variants) * 1000, 1)
+        get_report().add(url, 'compress_ms', compress_ms)
+        if compression['keep_plain']:
+            logger.info(f"フィードデータを '{feed_output}' に、CSVデータを '{csv_output}' に出力しました。")
+    else:
+        write_file_atomic(feed_output, rss_data.encode('utf-8'))
+        logger.info(f"フィードデータを '{feed_output}' に出力しました。")
+        
+        write_file_atomic(csv_output, csv_data.encode('utf-8'))
+        logger.info(f"CSVデータを '{csv_output}' に出力しました。")
+    
+    # ハッシュ値はファイルの書き込み後に更新する
+    write_file_atomic(get_hash_sidecar_path(feed_output), content_hash.encode('utf-8'))
+    
+    return True
+
+def update_feed_incrementally(
+    items: List[Dict[str, Any]],
+    url: str,
+    feed_output: str,
+    csv_output: str,
+    max_items: Optional[int] = None,
+    max_days: Optional[int] = None
+) -> Dict[str, int]:
+    """既存のフィードとCSVに新しいアイテムだけを追加し、保持期間を超えたアイテムを削除する
+
+    既存のアイテムは解析も再生成もせず、テキストのまま引き継ぐ。
+    既存のフィードがない場合は、保持期間を適用したアイテムで新規に出力する。
+
+    Returns:
+        追加・削除・保持したアイテム数
+    """
+    from incremental import (apply_retention, block_to_item, get_block_guid, get_block_pub_date,
+                             sort_by_date, split_csv_rows, split_feed)
+    
+    def rewrite() -> Dict[str, int]:
+        # 既存のフィードを引き継がず、保持期間を適用したアイテムで新規に出力する
+        get_item_date = lambda item: parse_item_date(item.get('pubDate'))
+        ordered_items = [items[index] for index in sort_by_date(items, get_item_date)]
+        kept = apply_retention(ordered_items, get_item_date, max_items, max_days)
+        retained_items = [ordered_items[index] for index in kept]
+        write_feed_outputs(retained_items, url, feed_output, csv_output, force=True)
+        return {'added': len(retained_items), 'evicted': 0, 'retained': len(retained_items)}
+    
+    if not os.path.exists(feed_output):
+        return rewrite()
+    
+    with open(feed_output, encoding='utf-8') as f:
+        blocks = split_feed(f.read())
+    
+    csv_rows = []
+    if os.path.exists(csv_output):
+        with open(csv_output, encoding='utf-8') as f:
+            _, csv_rows = split_csv_rows(f.read())
+    if len(csv_rows) != len(blocks):
+        # CSVとフィードの対応が崩れている場合のみ、フィードからCSVの行を作り直す
+        logger.warning(f"'{csv_output}' の行数がフィードと一致しないため、CSVを作り直します。")
+        try:
+            csv_rows = [render_csv_row(block_to_item(block)) for block in blocks]
+        except ET.ParseError as e:
+            logger.warning(f"'{feed_output}' のアイテムを解析できないため、フィードを作り直します: {e}")
+            return rewrite()
+    
+    # 既存のGUIDにないアイテムだけを新しく生成する
+    existing_guids = {get_block_guid(block) for block in blocks}
+    new_items = [item for item in items if not item.get('guid') or item['guid'] not in existing_guids]
+    new_blocks = [render_rss_item(item) for item in new_items]
+    new_rows = [render_csv_row(item) for item in new_items]
+    
+    # 日付の新しい順に並べてから保持期間を適用する（インデックスはall_blocksのもの）
+    all_blocks = new_blocks + blocks
+    all_rows = new_rows + csv_rows
+    get_block_date = lambda block: parse_item_date(get_block_pub_date(block))
+    order = sort_by_date(all_blocks, get_block_date)
+    kept = [order[index] for index in
+            apply_retention([all_blocks[index] for index in order], get_block_date, max_items, max_days)]
+    evicted = len(all_blocks) - len(kept)
+    
+    stats = {'added': sum(1 for index in kept if index < len(new_blocks)), 'evicted': evicted, 'retained': len(kept)}
+    if not new_blocks and not evicted:
+        logger.info(f"新しいアイテムがないため '{feed_output}' は更新しませんでした。")
+        return stats
+    
+    rss_data = render_rss_header(url) + ''.join(all_blocks[index] for index in kept) + RSS_FOOTER
+    csv_data = CSV_HEADER + ''.join(all_rows[index] for index in kept)
+    write_file_atomic(feed_output, rss_data.encode('utf-8'))
+    write_file_atomic(csv_output, csv_data.encode('utf-8'))
+    
+    # 全件出力用のハッシュ値は内容と一致しなくなるため削除する
+    try:
+        os.remove(get_hash_sidecar_path(feed_output))
+    except OSError:
+        pass
+    
+    logger.info(f"'{feed_output}' を更新しました（追加: {stats['added']}件、削除: {evicted}件、保持: {len(kept)}件）")
+    return stats
+
 def get_target_urls() -> List[str]:
-    """サポートされている対象ページのURLリストを返す"""
-    return [
+    """サポートされている対象ページのURLリストを返す（宣言的なサイト定義のサイトを含む）"""
+    from scrapers.config import get_declarative_site_urls
+    
+    target_urls = [
         'https://firebase.google.com/support/releases',
         'https://ja.monaca.io/headline/'
     ]
+    return target_urls + [url for url in get_declarative_site_urls() if url not in target_urls]
+
+def load_scraper_module(url: str, script_dir: str):
+    """URLに対応するスクレイパーモジュールを読み込む
+
+    専用のスクレイパーが見つからない場合は汎用スクレイパーを返す。
+    汎用スクレイパーも読み込めない場合はNoneを返す。
+    """
+    # URLからスクレイパーモジュール名を取得
+    scraper_module_name = get_scraper_module_name(url)
+    
+    # デバッグ情報を出力
+    logger.debug(f"スクレイパーモジュール名: {scraper_module_name}")
+    logger.debug(f"インポートパス: scrapers.{scraper_module_name}")
+    
+    # スクレイパーのファイルパスを構築
+    scraper_file_path = os.path.join(script_dir, "scrapers", f"{scraper_module_name}.py")
+    
+    # スクレイパーのファイルが存在するか確認
+    if os.path.isfile(scraper_file_path):
+        logger.debug(f"スクレイパーファイルが見つかりました: {scraper_file_path}")
+    else:
+        logger.debug(f"スクレイパーファイルが見つかりません: {scraper_file_path}")
+        
+        # ディレクトリ内の利用可能なスクレイパーを確認
+        scrapers_dir = os.path.join(script_dir, "scrapers")
+        logger.debug(f"利用可能なスクレイパーファイル:")
+        for filename in os.listdir(scrapers_dir):
+            if filename.endswith(".py") and filename != "__init__.py":
+                logger.debug(f"  - {filename}")
+    
+    try:
+        # スクレイパーモジュールを動的にインポート (複数の方法を試す)
+        try:
+            # 方法1: 絶対パスでインポート
+            logger.debug(f"方法1: 絶対パスでのインポートを試みます")
+            scraper_module = importlib.import_module(f'scrapers.{scraper_module_name}')
+        except (ImportError, ModuleNotFoundError) as e:
+            logger.debug(f"方法1失敗: {e}")
+            try:
+                # 方法2: 相対パスでインポート
+                logger.debug(f"方法2: 相対パスでのインポートを試みます")
+                scraper_module = importlib.import_module(f'.scrapers.{scraper_module_name}', package='src')
+            except (ImportError, ModuleNotFoundError) as e:
+                logger.debug(f"方法2失敗: {e}")
+                # 方法3: spec_from_file_locationを使用
+                logger.debug(f"方法3: spec_from_file_locationを使用します")
+                if os.path.exists(scraper_file_path):
+                    try:
+                        spec = importlib.util.spec_from_file_location(scraper_module_name, scraper_file_path)
+                        scraper_module = importlib.util.module_from_spec(spec)
+                        spec.loader.exec_module(scraper_module)
+                        logger.debug(f"方法3成功: モジュールをロードしました")
+                    except Exception as e:
+                        logger.error(f"方法3失敗: {e}")
+                        raise ImportError(f"スクレイパーモジュールのロード中にエラー発生: {e}")
+                else:
+                    raise ImportError(f"スクレイパーファイルが見つかりません: {scraper_file_path}")
+        
+        logger.debug(f"スクレイパーモジュール '{scraper_module_name}' を読み込みました")
+        # モジュールの属性を表示
+        logger.debug(f"モジュール属性: {dir(scraper_module)}")
+        # scrape関数が存在するか確認
+        if hasattr(scraper_module, 'scrape'):
+            logger.debug(f"scrape関数が見つかりました")
+        else:
+            logger.debug(f"scrape関数が見つかりません！モジュール内の利用可能な関数: {[attr for attr in dir(scraper_module) if callable(getattr(scraper_module, attr)) and not attr.startswith('__')]}")
+    except ImportError as e:
+        # 宣言的なサイト定義がある場合は、サイト定義に従って抽出するスクレイパーを使用
+        from scrapers.config import get_site_config
+        if get_site_config(url).get('extraction'):
+            logger.debug(f"'{url}'のサイト定義を使用します")
+            return importlib.import_module('scrapers.declarative')
+        
+        # 特定のURLに対応するスクレイパーが見つからない場合は汎用スクレイパーを使用
+        logger.warning(f"インポートエラー: {e}")
+        try:
+            scraper_module = importlib.import_module('scrapers.generic')
+            logger.info(f"'{url}'に対応するスクレイパーが見つからないため、汎用スクレイパーを使用します")
+        except ImportError:
+            logger.error(f"エラー: '{url}'に対応するスクレイパーが見つかりません。")
+            return None
+    
+    return scraper_module
+
+def scrape_url(url: str, args, script_dir: str) -> Optional[List[Dict[str, Any]]]:
+    """URLに対応するスクレイパーを実行してアイテムを取得する
+
+    スクレイパーが見つからない場合やスクレイピングに失敗した場合はNoneを返す。
+    reprocessの場合は、スクレイピングせずに保存済みのアイテムを返す。
+    """
+    if args.reprocess:
+        return load_stored_items(url, args)
+    
+    scraper_module = load_scraper_module(url, script_dir)
+    if scraper_module is None:
+        return None
+    
+    get_report().set(url, 'scraper', scraper_module.__name__.rsplit('.', 1)[-1])
+    
+    # スクレイピングを実行
+    try:
+        # scrape関数のシグネチャを確認して、新しい引数をサポートしているか確認
+        scrape_signature = inspect.signature(scraper_module.scrape)
+        scrape_params = scrape_signature.parameters
+        
+        # 基本的な引数
+        scrape_kwargs = {
+            'url': url,
+            'debug': args.debug,
+            'silent': args.silent,
+        }
+        
+        # 新しい引数が利用可能な場合のみ追加
+        if 'selenium_wait' in scrape_params:
+            scrape_kwargs['selenium_wait'] = args.selenium_wait
+        if 'post_load_wait' in scrape_params:
+            scrape_kwargs['post_load_wait'] = args.post_load_wait
+        if 'lambda_optimized' in scrape_params:
+            scrape_kwargs['lambda_optimized'] = args.lambda_optimized
+        if 'debug_selenium' in scrape_params:
+            scrape_kwargs['debug_selenium'] = args.debug_selenium
+        if 'discover_endpoint' in scrape_params:
+            scrape_kwargs['discover_endpoint'] = args.discover_endpoint
+        if 'max_pages' in scrape_params:
+            scrape_kwargs['max_pages'] = args.max_pages
+        if 'since' in scrape_params:
+            scrape_kwargs['since'] = args.since
+        
+        # URLごとの期限（実行全体の期限より後にはならない）
+        with deadline.deadline_scope(args.url_deadline):
+            items = scraper_module.scrape(**scrape_kwargs)
+        logger.info(f"スクレイピングが完了しました。{len(items)}件のアイテムを取得しました")
+    except Exception as e:
+        logger.error(f"スクレイピング中にエラーが発生しました: {e}")
+        return None
+    
+    # フィルタリング前のアイテムを保存（reprocessで再利用する）
+    if args.store_items:
+        from item_store import get_default_store_dir, save_run
+        try:
+            save_run(args.item_store or get_default_store_dir(), url, items, get_report().get(url).get('scraper'))
+        except OSError as e:
+            logger.warning(f"アイテムの保存に失敗しました: {e}")
+    
+    return items
+
+def load_stored_items(url: str, args) -> Optional[List[Dict[str, Any]]]:
+    """保存済みのアイテムを読み込む（保存されていない場合はNone）"""
+    from item_store import get_default_store_dir, load_items
+    
+    items = load_items(args.item_store or get_default_store_dir(), url, since=args.since)
+    if items is None:
+        logger.error(f"保存されたアイテムがありません: {url}（--store-itemsを指定して実行すると保存されます）")
+    return items
+
+def write_sharded_outputs(
+    items: List[Dict[str, Any]],
+    url: str,
+    shard_by: str,
+    feed_output: str,
+    max_open_files: int = 32,
+    force: bool = False,
+    compression: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """アイテムをシャードごとのフィードとCSVに分割して出力する（圧縮出力の設定はシャードごとに適用する）
+
+    Returns:
+        シャードの一覧
+    """
+    from shards import ShardFormat, write_shards
+    
+    formats = [
+        ShardFormat('xml', render_rss_header(url), render_rss_item, RSS_FOOTER),
+        ShardFormat('csv', CSV_HEADER, render_csv_row, ''),
+    ]
+    return write_shards(
+        items, url, shard_by, os.path.splitext(feed_output)[0], formats, parse_item_date,
+        max_open_files=max_open_files, force=force, compression=compression
+    )
+
+def write_profile_outputs(
+    url: str,
+    items: List[Dict[str, Any]],
+    profiles: List[Dict[str, Any]],
+    default_feed_output: str,
+    multiple_urls: bool = False,
+    force: bool = False,
+    compression: Optional[Dict[str, Any]] = None
+) -> Dict[str, int]:
+    """1回のスクレイピング結果から、各プロファイルのフィードとCSVを出力する
+
+    Returns:
+        プロファイル名と出力したアイテム数の辞書
+    """
+    from profiles import profile_applies_to, resolve_output_paths, resolve_since, route_items
+    
+    active_profiles = [profile for profile in profiles if profile_applies_to(profile, url)]
+    predicates = {
+        profile['name']: build_item_filter(
+            resolve_since(profile),
+            profile.get('until'),
+            profile.get('category'),
+            profile.get('exclude_category')
+        )
+        for profile in active_profiles
+    }
+    routed = route_items(items, predicates)
+    
+    counts = {}
+    for profile in active_profiles:
+        name = profile['name']
+        feed_output, csv_output = resolve_output_paths(profile, url, default_feed_output, multiple_urls)
+        logger.debug(f"プロファイル '{name}': {len(routed[name])}件")
+        write_feed_outputs(routed[name], url, feed_output, csv_output, force=force, compression=compression)
+        counts[name] = len(routed[name])
+    
+    return counts
+
+def start_browser_prewarm(target_urls: List[str], args) -> List[str]:
+    """ブラウザが必要なサイトがある場合は、バックグラウンドでChromeを起動しておく
+
+    Chromeの起動をHTTPのみのサイトの取得と重ねるため、ブラウザが必要なサイトを後に並べ替える。
+
+    Returns:
+        処理する順に並べ替えた対象URLのリスト
+    """
+    from scrapers import cassette, endpoint
+    from scrapers.config import get_site_config
+    
+    def needs_browser(url: str) -> bool:
+        config = get_site_config(url)
+        # 宣言的なサイト定義でfetch='selenium'のサイトもブラウザで取得する
+        uses_browser = config.get('requires_selenium') or (config.get('extraction') or {}).get('fetch') == 'selenium'
+        # 記録済みのデータエンドポイントがあるサイトはHTTPで取得できる
+        return bool(uses_browser) and not endpoint.get_endpoint(url)
+    
+    browser_urls = [url for url in target_urls if needs_browser(url)]
+    if not browser_urls or args.reprocess or cassette.is_replaying():
+        return target_urls
+    
+    browser.set_keep_alive(True)
+    browser.prewarm(
+        use_lambda_optimization=args.lambda_optimized,
+        debug=args.debug_selenium or args.debug,
+        performance_log=bool(get_site_config(browser_urls[0]).get('resource_blocking'))
+    )
+    logger.info(f"ブラウザが必要なサイト（{len(browser_urls)}件）に備えて、バックグラウンドでChromeを起動します")
+    return [url for url in target_urls if url not in browser_urls] + browser_urls
+
+def log_skipped_urls(urls: List[str]):
+    """期限を過ぎたため処理しなかったURLをログに出力する"""
+    logger.warning(f"実行の期限を過ぎたため、残りの{len(urls)}件のURLを処理しません: {', '.join(urls)}")
+
+def write_merged_outputs(target_urls: List[str], args, script_dir: str) -> int:
+    """全対象URLのアイテムを新しい順に統合した1つのフィードとCSVを出力する
+
+    Returns:
+        出力したアイテム数
+    """
+    from merge import merge_item_streams
+    
+    matches = build_item_filter(args.since, args.until, args.category, args.exclude_category)
+    sources = []
+    for index, url in enumerate(target_urls):
+        if deadline.expired():
+            log_skipped_urls(target_urls[index:])
+            break
+        logger.info(f"\n=== URLの処理を開始: {url} ===")
+        items = scrape_url(url, args, script_dir)
+        if items is None:
+            continue
+        sources.append([item for item in items if matches(item)])
+    
+    merged_items = list(merge_item_streams(
+        sources, parse_item_date, max_items=args.merge_max_items, max_days=args.merge_max_days
+    ))
+    logger.info(f"{len(sources)}件のソースから{len(merged_items)}件のアイテムを統合しました")
+    
+    feed_output = args.merge_output
+    csv_output = os.path.splitext(feed_output)[0] + '.csv'
+    write_feed_outputs(
+        merged_items, target_urls[0], feed_output, csv_output,
+        force=args.force_write, compression=get_compression_options(args),
+        title="お知らせフィード（統合）"
+    )
+    return len(merged_items)
+
+def process_url(url: str, args, script_dir: str, multiple_urls: bool = False,
+                profiles: Optional[List[Dict[str, Any]]] = None, ndjson_stream=None) -> bool:
+    """1つのURLについてスクレイピングから出力までを実行する
+
+    Args:
+        profiles: 指定した場合、コマンドラインのフィルタ条件の代わりに各プロファイルの出力を生成する
+        ndjson_stream: 指定した場合、フィードとCSVの代わりにNDJSONをこのストリームに書き込む
+
+    Returns:
+        出力まで完了した場合True、スクレイピングに失敗した場合False
+    """
+    logger.info(f"\n=== URLの処理を開始: {url} ===")
+    
+    def write_outputs(items: List[Dict[str, Any]]):
+        write_url_outputs(url, items, args, multiple_urls, profiles, ndjson_stream)
+    
+    if args.stale_while_revalidate:
+        # 差分モードとNDJSONは出力を書き直せないため、最終的な結果のみを出力する
+        can_rewrite = ndjson_stream is None and not args.diff_mode
+        return scrape_with_snapshot(url, args, script_dir, write_outputs, publish_stale_first=can_rewrite)
+    
+    items = scrape_url(url, args, script_dir)
+    if items is None:
+        return False
+    
+    write_outputs(items)
+    return True
+
+def scrape_with_snapshot(url: str, args, script_dir: str, write_outputs: Callable[[List[Dict[str, Any]]], None],
+                         publish_stale_first: bool = True) -> bool:
+    """前回の正常な取得結果（スナップショット）から出力してから、新たに取得して更新する
+
+    新しい取得結果がスナップショットと同等以上の場合のみ、スナップショットと出力を置き換える。
+    取得に失敗した場合や取得結果が少ない場合は、スナップショットの出力を維持する。
+
+    Returns:
+        出力した場合True、スナップショットがなく取得にも失敗した場合False
+    """
+    from snapshots import (DEFAULT_MIN_RETAINED_RATIO, get_snapshot_age, is_at_least_as_good, load_snapshot,
+                           save_snapshot)
+    from scrapers.config import get_site_config
+    
+    snapshot = load_snapshot(url, max_age=args.stale_max_age)
+    published = False
+    if snapshot is not None and publish_stale_first:
+        logger.info(
+            f"スナップショット（{get_snapshot_age(snapshot):.0f}秒前、{len(snapshot['items'])}件）から出力します。"
+            f"続けて最新の内容を取得します。"
+        )
+        write_outputs(snapshot['items'])
+        published = True
+    
+    items = scrape_url(url, args, script_dir)
+    
+    if snapshot is None:
+        if items is None:
+            return False
+        if items:
+            save_snapshot(url, items, get_report().get(url).get('scraper'))
+        write_outputs(items)
+        return True
+    
+    site_config = get_site_config(url)
+    min_items = site_config.get('min_items_threshold', 1)
+    min_ratio = site_config.get('snapshot_min_ratio', DEFAULT_MIN_RETAINED_RATIO)
+    if is_at_least_as_good(items, snapshot, min_items, min_ratio):
+        save_snapshot(url, items, get_report().get(url).get('scraper'))
+        write_outputs(items)
+        return True
+    
+    age = get_snapshot_age(snapshot)
+    logger.warning(
+        f"取得結果（{'失敗' if items is None else f'{len(items)}件'}）がスナップショット（{len(snapshot['items'])}件）に"
+        f"及ばないため、{age:.0f}秒前のスナップショットを使用します。"
+    )
+    get_report().set(url, 'served_stale', True)
+    get_report().set(url, 'snapshot_age_seconds', round(age))
+    if not published:
+        write_outputs(snapshot['items'])
+    return True
+
+def write_url_outputs(url: str, items: List[Dict[str, Any]], args, multiple_urls: bool = False,
+                      profiles: Optional[List[Dict[str, Any]]] = None, ndjson_stream=None):
+    """1つのURLのアイテムから、オプションに応じたフィードやCSVなどを出力する"""
+    # デフォルトのファイル名を生成
+    default_feed_output = generate_default_filename(url, "xml", args.with_date)
+    default_csv_output = default_feed_output.replace(".xml", ".csv")
+    
+    # プロファイルモード: 1回のスクレイピング結果を全プロファイルに振り分ける
+    if profiles:
+        write_profile_outputs(
+            url, items, profiles, default_feed_output, multiple_urls,
+            force=args.force_write, compression=get_compression_options(args)
+        )
+        return
+    
+    # NDJSONモード: フィルタ条件に一致したアイテムをストリームに書き込む
+    if ndjson_stream is not None:
+        matches = build_item_filter(args.since, args.until, args.category, args.exclude_category)
+        count = write_ndjson(items, url, ndjson_stream, matches, get_report().get(url).get('scraper'))
+        logger.info(f"{count}件のアイテムをNDJSONで出力しました。")
+        return
+    
+    # 出力ファイルのパスを決定
+    feed_output = args.feed_output or default_feed_output
+    csv_output = args.csv_output or default_csv_output
+    
+    # 複数URLの場合でユーザー指定の出力ファイル名がある場合、URLごとに異なるファイル名を生成
+    if multiple_urls and args.feed_output:
+        base_name, extension = os.path.splitext(args.feed_output)
+        parsed_url = urllib.parse.urlparse(url)
+        hostname = parsed_url.netloc.replace('.', '_')
+        feed_output = f"{base_name}_{hostname}{extension}"
+        csv_output = feed_output.replace(extension, ".csv")
+    
+    # 追記モード: 既存のフィードに新しいアイテムだけを追加する
+    if args.incremental:
+        filtered_items = filter_items(items, args.since, args.until, args.category, args.exclude_category)
+        update_feed_incrementally(
+            filtered_items, url, feed_output, csv_output,
+            max_items=args.retention_items, max_days=args.retention_days
+        )
+        return
+    
+    # 差分モードの処理
+    since_date = None
+    if args.diff_mode:
+        # 既存のフィードファイルが存在する場合
+        if os.path.exists(feed_output):
+            latest_date = get_latest_date_from_feed(feed_output)
+            if latest_date:
+                # 最新の日付をフィルタの条件に設定
+                since_date = latest_date.strftime('%Y-%m-%d')
+                logger.info(f"差分モード: {since_date} 以降の項目のみを取得します")
+                
+                # 出力ファイル名を変更（重複しないようにする）
+                feed_output = get_next_available_filename(feed_output)
+                csv_output = feed_output.replace(".xml", ".csv")
+    
+    # フィルタリング
+    filtered_items = filter_items(
+        items,
+        args.since or since_date,  # 差分モードの場合は最新日付を使用
+        args.until,
+        args.category,
+        args.exclude_category
+    )
+    
+    logger.debug(f"フィルタリング後のアイテム数: {len(filtered_items)}")
+    
+    # シャードモード: キーごとにフィードとCSVを分割して出力する
+    if args.shard_by:
+        write_sharded_outputs(
+            filtered_items, url, args.shard_by, feed_output,
+            max_open_files=args.max_open_files, force=args.force_write,
+            compression=get_compression_options(args)
+        )
+        return
+    
+    write_feed_outputs(
+        filtered_items, url, feed_output, csv_output,
+        force=args.force_write, compression=get_compression_options(args)
+    )
 
 def main():
     args = parse_args()
@@ -322,6 +1075,16 @@ def main():
     if script_dir not in sys.path:
         sys.path.insert(0, script_dir)
     
+    # 宣言的なサイト定義の読み込み（対象URLの決定より前に行う）
+    if args.sites:
+        from scrapers.declarative import load_site_definitions
+        try:
+            site_urls = load_site_definitions(args.sites)
+        except (OSError, ValueError) as e:
+            logger.error(f"サイト定義の読み込みに失敗しました: {e}")
+            return 1
+        logger.info(f"{len(site_urls)}件のサイト定義を読み込みました")
+    
     # 「all」が指定された場合は、全ての対象URLに対して実行
     if args.url.lower() == 'all':
         target_urls = get_target_urls()
@@ -329,165 +1092,94 @@ def main():
     else:
         target_urls = [args.url]
     
-    # 各URLに対して処理を実行
-    for url in target_urls:
-        logger.info(f"\n=== URLの処理を開始: {url} ===")
-        
-        # URLからスクレイパーモジュール名を取得
-        scraper_module_name = get_scraper_module_name(url)
-        
-        # デバッグ情報を出力
-        logger.debug(f"スクレイパーモジュール名: {scraper_module_name}")
-        logger.debug(f"インポートパス: scrapers.{scraper_module_name}")
-        
-        # スクレイパーのファイルパスを構築
-        scraper_file_path = os.path.join(script_dir, "scrapers", f"{scraper_module_name}.py")
-        
-        # スクレイパーのファイルが存在するか確認
-        if os.path.isfile(scraper_file_path):
-            logger.debug(f"スクレイパーファイルが見つかりました: {scraper_file_path}")
-        else:
-            logger.debug(f"スクレイパーファイルが見つかりません: {scraper_file_path}")
-            
-            # ディレクトリ内の利用可能なスクレイパーを確認
-            scrapers_dir = os.path.join(script_dir, "scrapers")
-            logger.debug(f"利用可能なスクレイパーファイル:")
-            for filename in os.listdir(scrapers_dir):
-                if filename.endswith(".py") and filename != "__init__.py":
-                    logger.debug(f"  - {filename}")
-        
+    multiple_urls = len(target_urls) > 1
+    
+    # 圧縮形式の検証
+    if args.compress:
+        from output_compression import parse_encodings
         try:
-            # スクレイパーモジュールを動的にインポート (複数の方法を試す)
-            try:
-                # 方法1: 絶対パスでインポート
-                logger.debug(f"方法1: 絶対パスでのインポートを試みます")
-                scraper_module = importlib.import_module(f'scrapers.{scraper_module_name}')
-            except (ImportError, ModuleNotFoundError) as e:
-                logger.debug(f"方法1失敗: {e}")
-                try:
-                    # 方法2: 相対パスでインポート
-                    logger.debug(f"方法2: 相対パスでのインポートを試みます")
-                    scraper_module = importlib.import_module(f'.scrapers.{scraper_module_name}', package='src')
-                except (ImportError, ModuleNotFoundError) as e:
-                    logger.debug(f"方法2失敗: {e}")
-                    # 方法3: spec_from_file_locationを使用
-                    logger.debug(f"方法3: spec_from_file_locationを使用します")
-                    if os.path.exists(scraper_file_path):
-                        try:
-                            spec = importlib.util.spec_from_file_location(scraper_module_name, scraper_file_path)
-                            scraper_module = importlib.util.module_from_spec(spec)
-                            spec.loader.exec_module(scraper_module)
-                            logger.debug(f"方法3成功: モジュールをロードしました")
-                        except Exception as e:
-                            logger.error(f"方法3失敗: {e}")
-                            raise ImportError(f"スクレイパーモジュールのロード中にエラー発生: {e}")
-                    else:
-                        raise ImportError(f"スクレイパーファイルが見つかりません: {scraper_file_path}")
-            
-            logger.debug(f"スクレイパーモジュール '{scraper_module_name}' を読み込みました")
-            # モジュールの属性を表示
-            logger.debug(f"モジュール属性: {dir(scraper_module)}")
-            # scrape関数が存在するか確認
-            if hasattr(scraper_module, 'scrape'):
-                logger.debug(f"scrape関数が見つかりました")
-            else:
-                logger.debug(f"scrape関数が見つかりません！モジュール内の利用可能な関数: {[attr for attr in dir(scraper_module) if callable(getattr(scraper_module, attr)) and not attr.startswith('__')]}")
-        except ImportError as e:
-            # 特定のURLに対応するスクレイパーが見つからない場合は汎用スクレイパーを使用
-            logger.warning(f"インポートエラー: {e}")
-            try:
-                scraper_module = importlib.import_module('scrapers.generic')
-                logger.info(f"'{url}'に対応するスクレイパーが見つからないため、汎用スクレイパーを使用します")
-            except ImportError:
-                logger.error(f"エラー: '{url}'に対応するスクレイパーが見つかりません。")
-                continue
-        
-        # スクレイピングを実行
+            args.compress = parse_encodings(args.compress)
+        except ValueError as e:
+            logger.error(str(e))
+            return 1
+    
+    # 取得結果の記録・再生
+    if args.record or args.replay:
+        from scrapers import cassette
+        try:
+            cassette.configure(record_dir=args.record, replay_dir=args.replay)
+        except ValueError as e:
+            logger.error(str(e))
+            return 1
+        logger.info(f"取得結果を{'記録' if args.record else '再生'}します: {args.record or args.replay}")
+    
+    # プロファイルファイルの読み込み
+    profiles = None
+    if args.profiles:
+        from profiles import load_profiles
+        try:
+            profiles = load_profiles(args.profiles)
+        except (OSError, ValueError) as e:
+            logger.error(f"プロファイルファイルの読み込みに失敗しました: {e}")
+            return 1
+        logger.info(f"{len(profiles)}件のプロファイルを読み込みました")
+    
+    # NDJSONの出力先（"-"の場合は標準出力。ログは標準エラー出力に出力される）
+    ndjson_stream = None
+    if args.ndjson_output:
+        ndjson_stream = sys.stdout if args.ndjson_output == '-' else open(args.ndjson_output, 'w', encoding='utf-8')
+    
+    # 実行全体の期限（スケジューラーモードは繰り返し実行するため、URLごとの期限のみを使用する）
+    run_deadline = None if args.schedule else args.deadline
+    with deadline.deadline_scope(run_deadline):
         try:
-            # scrape関数のシグネチャを確認して、新しい引数をサポートしているか確認
-            import inspect
-            scrape_signature = inspect.signature(scraper_module.scrape)
-            scrape_params = scrape_signature.parameters
+            # 統合モード: 全対象URLのアイテムを1つのフィードにまとめる
+            if args.merge_output:
+                write_merged_outputs(target_urls, args, script_dir)
+                get_report().log_summary()
+                return 0
             
-            # 基本的な引数
-            scrape_kwargs = {
-                'url': url,
-                'debug': args.debug,
-                'silent': args.silent,
-            }
+            # スケジューラーモード: サイトごとの更新間隔で繰り返し実行
+            if args.schedule:
+                from scheduler import SiteScheduler
             
-            # 新しい引数が利用可能な場合のみ追加
-            if 'selenium_wait' in scrape_params:
-                scrape_kwargs['selenium_wait'] = args.selenium_wait
-            if 'post_load_wait' in scrape_params:
-                scrape_kwargs['post_load_wait'] = args.post_load_wait
-            if 'lambda_optimized' in scrape_params:
-                scrape_kwargs['lambda_optimized'] = args.lambda_optimized
-            if 'debug_selenium' in scrape_params:
-                scrape_kwargs['debug_selenium'] = args.debug_selenium
+                scheduler = SiteScheduler(
+                    lambda url: process_url(url, args, script_dir, multiple_urls, profiles, ndjson_stream),
+                    jitter=args.schedule_jitter,
+                    max_workers=args.schedule_workers,
+                )
+                for url in target_urls:
+                    scheduler.add_site(url, interval=args.schedule_interval)
+                scheduler.run()
+                return 0
             
-            items = scraper_module.scrape(**scrape_kwargs)
-            logger.info(f"スクレイピングが完了しました。{len(items)}件のアイテムを取得しました")
-        except Exception as e:
-            logger.error(f"スクレイピング中にエラーが発生しました: {e}")
-            continue
-        
-        # デフォルトのファイル名を生成
-        default_feed_output = generate_default_filename(url, "xml", args.with_date)
-        default_csv_output = default_feed_output.replace(".xml", ".csv")
-        
-        # 出力ファイルのパスを決定
-        feed_output = args.feed_output or default_feed_output
-        csv_output = args.csv_output or default_csv_output
-        
-        # 複数URLの場合でユーザー指定の出力ファイル名がある場合、URLごとに異なるファイル名を生成
-        if len(target_urls) > 1 and args.feed_output:
-            base_name, extension = os.path.splitext(args.feed_output)
-            parsed_url = urllib.parse.urlparse(url)
-            hostname = parsed_url.netloc.replace('.', '_')
-            feed_output = f"{base_name}_{hostname}{extension}"
-            csv_output = feed_output.replace(extension, ".csv")
-        
-        # 差分モードの処理
-        since_date = None
-        if args.diff_mode:
-            # 既存のフィードファイルが存在する場合
-            if os.path.exists(feed_output):
-                latest_date = get_latest_date_from_feed(feed_output)
-                if latest_date:
-                    # 最新の日付をフィルタの条件に設定
-                    since_date = latest_date.strftime('%Y-%m-%d')
-                    logger.info(f"差分モード: {since_date} 以降の項目のみを取得します")
-                    
-                    # 出力ファイル名を変更（重複しないようにする）
-                    feed_output = get_next_available_filename(feed_output)
-                    csv_output = feed_output.replace(".xml", ".csv")
-        
-        # フィルタリング
-        filtered_items = filter_items(
-            items,
-            args.since or since_date,  # 差分モードの場合は最新日付を使用
-            args.until,
-            args.category,
-            args.exclude_category
-        )
-        
-        logger.debug(f"フィルタリング後のアイテム数: {len(filtered_items)}")
-        
-        # RSSフィードの生成
-        rss_data = generate_rss(filtered_items, url)
-        
-        # CSVデータの生成
-        csv_data = generate_csv(filtered_items)
-        
-        # ファイルに書き込み
-        with open(feed_output, 'w', encoding='utf-8') as f:
-            f.write(rss_data)
-        logger.info(f"フィードデータを '{feed_output}' に出力しました。")
-        
-        with open(csv_output, 'w', encoding='utf-8') as f:
-            f.write(csv_data)
-        logger.info(f"CSVデータを '{csv_output}' に出力しました。")
+            # 複数のURLを処理する場合は、Chromeの起動をHTTPのみのサイトの処理と並行させる
+            if multiple_urls:
+                target_urls = start_browser_prewarm(target_urls, args)
+            
+            # 各URLに対して処理を実行
+            for index, url in enumerate(target_urls):
+                if deadline.expired():
+                    log_skipped_urls(target_urls[index:])
+                    break
+                process_url(url, args, script_dir, multiple_urls, profiles, ndjson_stream)
+        except BrokenPipeError:
+            # パイプの読み手が終了した場合は、残りの出力を破棄して終了する
+            devnull = os.open(os.devnull, os.O_WRONLY)
+            os.dup2(devnull, sys.stdout.fileno())
+            return 1
+        finally:
+            if ndjson_stream is not None and ndjson_stream is not sys.stdout:
+                ndjson_stream.close()
+            # 事前に起動したChromeを終了する
+            browser.set_keep_alive(False)
+            # 再生用の一時的な状態ディレクトリを片付ける
+            if args.record or args.replay:
+                from scrapers import cassette
+                cassette.configure()
+    
+    # 実行レポートを出力
+    get_report().log_summary()
     
     return 0
 
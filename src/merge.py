@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+Combined multi-source feed via a streaming k-way merge by date
+
+Each source's items are sorted newest-first once, then the sources are merged
+lazily with a heap (heapq.merge). Items are deduplicated by GUID as they come
+out of the merge, and the merge stops as soon as the item or age cap is
+reached, so older items are never pulled from the per-source streams.
+Items without a parseable date are placed after all dated items.
+"""
+
+import datetime
+import heapq
+import logging
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+# ロガーの設定
+logger = logging.getLogger(__name__)
+
+def get_sort_key(
+    parse_date: Callable[[Any], Optional[datetime.datetime]]
+) -> Callable[[Dict[str, Any]], float]:
+    """アイテムの日付をUNIX時刻に変換する関数を返す（日付が不明な場合は-inf）"""
+    def sort_key(item: Dict[str, Any]) -> float:
+        item_date = parse_date(item.get('pubDate')) if item.get('pubDate') else None
+        if item_date is None:
+            return float('-inf')
+        if item_date.tzinfo is None:
+            item_date = item_date.replace(tzinfo=datetime.timezone.utc)
+        return item_date.timestamp()
+    return sort_key
+
+def merge_item_streams(
+    sources: Iterable[List[Dict[str, Any]]],
+    parse_date: Callable[[Any], Optional[datetime.datetime]],
+    max_items: Optional[int] = None,
+    max_days: Optional[int] = None,
+    now: Optional[datetime.datetime] = None
+) -> Iterator[Dict[str, Any]]:
+    """複数のソースのアイテムを新しい順に統合する
+
+    Args:
+        sources: ソースごとのアイテムのリスト
+        parse_date: アイテムの日付を解析する関数
+        max_items: 出力するアイテム数の上限
+        max_days: 出力するアイテムの日付の範囲（今日から遡る日数）
+        now: 基準日時（テスト用）
+
+    Yields:
+        GUIDで重複を除いた、新しい順のアイテム
+    """
+    sort_key = get_sort_key(parse_date)
+    streams = [sorted(items, key=sort_key, reverse=True) for items in sources]
+
+    cutoff = None
+    if max_days is not None:
+        now = now or datetime.datetime.now(datetime.timezone.utc)
+        cutoff = (now - datetime.timedelta(days=max_days)).timestamp()
+
+    seen_guids = set()
+    count = 0
+    for item in heapq.merge(*streams, key=sort_key, reverse=True):
+        if max_items is not None and count >= max_items:
+            break
+        # ソースは新しい順のため、範囲外の日付が出た時点で以降はすべて範囲外
+        if cutoff is not None and sort_key(item) < cutoff:
+            break
+
+        guid = item.get('guid')
+        if guid:
+            if guid in seen_guids:
+                continue
+            seen_guids.add(guid)
+
+        count += 1
+        yield item
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+"""
+Precompressed output variants (gzip / zstd) with sidecar metadata
+
+For every output file, a compressed copy is written as <file>.gz / <file>.zst
+together with a JSON sidecar <file>.gz.json so that static hosting can send
+the precompressed body without compressing it per request:
+
+    {
+        "path": "feed.xml.gz",
+        "encoding": "gzip",
+        "size": 1234,
+        "sha256": "...",
+        "etag": "\"...\"",
+        "original_size": 5678,
+        "original_sha256": "...",
+        "level": 9,
+        "compress_seconds": 0.0012
+    }
+
+gzip output is written with a fixed mtime, so the same input always gives the
+same bytes and ETag. zstd requires the optional "zstandard" package (or the
+standard library "compression.zstd" module on Python 3.14+).
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from scrapers.state import write_file_atomic
+
+# ロガーの設定
+logger = logging.getLogger(__name__)
+
+# 圧縮形式ごとの拡張子と圧縮レベルの範囲・デフォルト値
+ENCODINGS = {
+    'gzip': {'extension': '.gz', 'min_level': 1, 'max_level': 9, 'default_level': 9},
+    'zstd': {'extension': '.zst', 'min_level': 1, 'max_level': 22, 'default_level': 19},
+}
+
+def _load_zstd():
+    """利用可能なzstd実装を返す。存在しない場合はNone"""
+    try:
+        import zstandard
+        return lambda data, level: zstandard.ZstdCompressor(level=level).compress(data)
+    except ImportError:
+        pass
+    try:
+        from compression import zstd
+        return lambda data, level: zstd.compress(data, level=level)
+    except ImportError:
+        return None
+
+def is_encoding_available(encoding: str) -> bool:
+    """圧縮形式が利用可能かを返す"""
+    if encoding == 'gzip':
+        return True
+    if encoding == 'zstd':
+        return _load_zstd() is not None
+    return False
+
+def parse_encodings(value: Optional[str]) -> List[str]:
+    """カンマ区切りの圧縮形式を検証してリストにする
+
+    Raises:
+        ValueError: 不明な圧縮形式が含まれる場合
+    """
+    if not value:
+        return []
+    encodings = [encoding.strip().lower() for encoding in value.split(',') if encoding.strip()]
+    unknown = [encoding for encoding in encodings if encoding not in ENCODINGS]
+    if unknown:
+        raise ValueError(f"不明な圧縮形式です: {', '.join(unknown)}")
+    return list(dict.fromkeys(encodings))
+
+def resolve_level(encoding: str, level: Optional[int]) -> int:
+    """圧縮形式に応じて圧縮レベルを範囲内に丸める（省略時はデフォルト値）"""
+    spec = ENCODINGS[encoding]
+    if level is None:
+        return spec['default_level']
+    return min(max(level, spec['min_level']), spec['max_level'])
+
+def compress_bytes(data: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    """データを圧縮する"""
+    level = resolve_level(encoding, level)
+    if encoding == 'gzip':
+        return gzip.compress(data, compresslevel=level, mtime=0)
+    if encoding == 'zstd':
+        compress = _load_zstd()
+        if compress is None:
+            raise RuntimeError("zstdを使用するには zstandard パッケージが必要です")
+        return compress(data, level)
+    raise ValueError(f"不明な圧縮形式です: {encoding}")
+
+def get_compressed_path(path: str, encoding: str) -> str:
+    """圧縮ファイルのパスを返す"""
+    return f"{path}{ENCODINGS[encoding]['extension']}"
+
+def get_metadata_path(compressed_path: str) -> str:
+    """圧縮ファイルのサイドカーのパスを返す"""
+    return f"{compressed_path}.json"
+
+def write_compressed(path: str, data: bytes, encoding: str, level: Optional[int] = None) -> Dict[str, Any]:
+    """圧縮ファイルとサイドカーを書き込み、サイドカーの内容を返す"""
+    level = resolve_level(encoding, level)
+
+    started = time.perf_counter()
+    compressed = compress_bytes(data, encoding, level)
+    elapsed = time.perf_counter() - started
+
+    compressed_path = get_compressed_path(path, encoding)
+    digest = hashlib.sha256(compressed).hexdigest()
+    metadata = {
+        'path': compressed_path,
+        'encoding': encoding,
+        'size': len(compressed),
+        'sha256': digest,
+        'etag': f'"{digest[:32]}"',
+        'original_size': len(data),
+        'original_sha256': hashlib.sha256(data).hexdigest(),
+        'level': level,
+        'compress_seconds': round(elapsed, 6),
+    }
+
+    write_file_atomic(compressed_path, compressed)
+    write_file_atomic(get_metadata_path(compressed_path),
+                      json.dumps(metadata, indent=2).encode('utf-8'))
+
+    ratio = len(compressed) / len(data) if data else 1.0
+    logger.info(f"{encoding}で圧縮して '{compressed_path}' に出力しました"
+                f"（{len(data)} → {len(compressed)} バイト、{ratio:.1%}、{elapsed * 1000:.1f}ms、レベル{level}）")
+    return metadata
+
+def write_output_variants(
+    path: str,
+    data: bytes,
+    encodings: List[str],
+    level: Optional[int] = None,
+    keep_plain: bool = True
+) -> List[Dict[str, Any]]:
+    """非圧縮ファイルと圧縮ファイルを書き込む
+
+    Args:
+        path: 非圧縮ファイルのパス
+        data: 書き込むデータ
+        encodings: 圧縮形式のリスト（利用できない形式は警告して省略する）
+        level: 圧縮レベル（省略時は形式ごとのデフォルト値）
+        keep_plain: Falseの場合、非圧縮ファイルは書き込まない
+
+    Returns:
+        書き込んだ圧縮ファイルのサイドカーの内容のリスト
+    """
+    if keep_plain or not encodings:
+        write_file_atomic(path, data)
+
+    variants = []
+    for encoding in encodings:
+        if not is_encoding_available(encoding):
+            logger.warning(f"{encoding}が利用できないため、'{path}' の{encoding}圧縮を省略します。")
+            continue
+        variants.append(write_compressed(path, data, encoding, level))
+    return variants
+
+def get_output_paths(path: str, encodings: List[str], keep_plain: bool = True) -> List[str]:
+    """書き込まれるはずのファイルのパスを返す（変更がない場合の省略判定に使用する）"""
+    paths = [path] if keep_plain or not encodings else []
+    paths.extend(get_compressed_path(path, encoding) for encoding in encodings
+                 if is_encoding_available(encoding))
+    return paths
@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""
+Filter profiles: many feed variants from a single scrape
+
+Profiles file (TOML):
+
+    [[profiles]]
+    name = "deprecations"
+    category = "deprecated"
+    feed_output = "feeds/{host}_deprecations.xml"
+
+    [[profiles]]
+    name = "last-quarter"
+    since_days = 90
+    exclude_category = "Other"
+
+The same structure is accepted as JSON ({"profiles": [...]} or a list).
+Output paths may contain {name}, {host} and {base} (the default file name
+without extension). Without feed_output, "{base}_{name}.xml" is used;
+without csv_output, the feed path with a .csv extension is used.
+"""
+
+import datetime
+import json
+import logging
+import os
+import urllib.parse
+from typing import Any, Callable, Dict, List
+
+# ロガーの設定
+logger = logging.getLogger(__name__)
+
+PROFILE_KEYS = {
+    'name', 'since', 'since_days', 'until', 'category', 'exclude_category',
+    'feed_output', 'csv_output', 'urls',
+}
+
+# 文字列で指定するキー
+STRING_KEYS = ('name', 'category', 'exclude_category', 'feed_output', 'csv_output')
+
+def validate_profile(profile: Dict[str, Any], label: str):
+    """プロファイルの値の型と日付の形式を検証する
+
+    Raises:
+        ValueError: 値が不正な場合
+    """
+    for key in STRING_KEYS:
+        if key in profile and not isinstance(profile[key], str):
+            raise ValueError(f"{label}の{key}は文字列で指定してください")
+
+    for key in ('since', 'until'):
+        if key not in profile:
+            continue
+        value = profile[key]
+        try:
+            if not isinstance(value, str):
+                raise ValueError
+            datetime.datetime.strptime(value, '%Y-%m-%d')
+        except ValueError:
+            raise ValueError(f"{label}の{key}はYYYY-MM-DD形式で指定してください: {value!r}") from None
+
+    since_days = profile.get('since_days')
+    if since_days is not None and (isinstance(since_days, bool) or not isinstance(since_days, int) or since_days < 0):
+        raise ValueError(f"{label}のsince_daysは0以上の整数で指定してください: {since_days!r}")
+
+    urls = profile.get('urls')
+    if urls is not None and (not isinstance(urls, list) or not all(isinstance(url, str) for url in urls)):
+        raise ValueError(f"{label}のurlsはURLの配列で指定してください")
+
+def load_profiles(path: str) -> List[Dict[str, Any]]:
+    """プロファイルファイル（TOMLまたはJSON）を読み込む
+
+    Raises:
+        ValueError: ファイルの形式やプロファイルの内容が不正な場合
+    """
+    if path.endswith('.toml'):
+        import tomllib
+        with open(path, 'rb') as f:
+            data = tomllib.load(f)
+    else:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+
+    profiles = data.get('profiles', []) if isinstance(data, dict) else data
+    if not isinstance(profiles, list) or not profiles:
+        raise ValueError(f"プロファイルが定義されていません: {path}")
+
+    names = set()
+    normalized = []
+    for index, profile in enumerate(profiles):
+        if not isinstance(profile, dict):
+            raise ValueError(f"プロファイル{index + 1}の形式が不正です")
+
+        unknown = set(profile) - PROFILE_KEYS
+        if unknown:
+            raise ValueError(f"プロファイル{index + 1}に不明なキーがあります: {', '.join(sorted(unknown))}")
+
+        # TOMLの日付（since = 2025-01-01）は文字列として扱う
+        profile = {key: value.isoformat() if key in ('since', 'until') and isinstance(value, datetime.date) else value
+                   for key, value in profile.items()}
+        validate_profile(profile, f"プロファイル{index + 1}")
+
+        name = profile.get('name') or f"profile{index + 1}"
+        if name in names:
+            raise ValueError(f"プロファイル名が重複しています: {name}")
+        names.add(name)
+
+        normalized.append(dict(profile, name=name))
+
+    return normalized
+
+def resolve_since(profile: Dict[str, Any], today: datetime.date = None) -> str:
+    """プロファイルのsince（since_daysの場合は今日からの相対日付）を返す"""
+    if profile.get('since_days') is not None:
+        today = today or datetime.date.today()
+        return (today - datetime.timedelta(days=int(profile['since_days']))).strftime('%Y-%m-%d')
+    return profile.get('since')
+
+def profile_applies_to(profile: Dict[str, Any], url: str) -> bool:
+    """プロファイルがURLを対象とするかを返す（urlsの指定がない場合はすべて対象）"""
+    urls = profile.get('urls')
+    return not urls or url in urls
+
+def resolve_output_paths(profile: Dict[str, Any], url: str, default_feed_output: str,
+                         multiple_urls: bool = False):
+    """プロファイルのフィードとCSVの出力パスを返す
+
+    複数URLを処理する場合に{host}や{base}を含まないパスが指定されていると出力が衝突するため、
+    拡張子の前にホスト名を付加する。
+    """
+    base = os.path.splitext(default_feed_output)[0]
+    host = urllib.parse.urlparse(url).netloc.replace('.', '_')
+    values = {'name': profile['name'], 'host': host, 'base': base}
+
+    def expand(template: str) -> str:
+        path = template.format(**values)
+        if multiple_urls and '{host}' not in template and '{base}' not in template:
+            stem, extension = os.path.splitext(path)
+            path = f"{stem}_{host}{extension}"
+        return path
+
+    feed_output = expand(profile.get('feed_output') or '{base}_{name}.xml')
+    if profile.get('csv_output'):
+        csv_output = expand(profile['csv_output'])
+    else:
+        csv_output = os.path.splitext(feed_output)[0] + '.csv'
+
+    return feed_output, csv_output
+
+def route_items(
+    items: List[Dict[str, Any]],
+    predicates: Dict[str, Callable[[Dict[str, Any]], bool]]
+) -> Dict[str, List[Dict[str, Any]]]:
+    """各アイテムを、一致するすべてのプロファイルに振り分ける（アイテムの走査は1回のみ）
+
+    Args:
+        items: スクレイピングしたアイテム
+        predicates: プロファイル名と判定関数の辞書
+
+    Returns:
+        プロファイル名とアイテムのリストの辞書
+    """
+    routed = {name: [] for name in predicates}
+    for item in items:
+        for name, matches in predicates.items():
+            if matches(item):
+                routed[name].append(item)
+    return routed
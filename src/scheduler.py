@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""
+Built-in scheduler that runs each site on its own refresh interval
+"""
+
+import heapq
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from scrapers.config import get_site_config
+
+# ロガーの設定
+logger = logging.getLogger(__name__)
+
+class SiteScheduler:
+    """サイトごとの更新間隔でジョブを実行するスケジューラー
+
+    - 各サイトの実行時刻には0〜jitter秒のランダムな揺らぎを加え、実行を分散させる
+    - 同じサイトへの実行要求は1件の予約にまとめる（コアレス）
+    - 前回の実行が終わっていないサイトの実行はスキップする
+    """
+
+    def __init__(
+        self,
+        job: Callable[[str], object],
+        jitter: float = 60.0,
+        max_workers: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+        rng: Optional[random.Random] = None
+    ):
+        """
+        Args:
+            job: サイトのURLを受け取って処理を実行する関数
+            jitter: 実行時刻に加えるランダムな揺らぎの最大値（秒）
+            max_workers: 同時に実行するジョブ数の上限
+            clock: 現在時刻（秒）を返す関数
+            rng: 揺らぎの生成に使う乱数生成器
+        """
+        self.job = job
+        self.jitter = max(0.0, jitter or 0.0)
+        self.clock = clock
+        self.rng = rng or random.Random()
+
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers))
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+
+        self._intervals: Dict[str, float] = {}
+        # サイトごとの次回実行時刻（1サイトにつき1件のみ保持する）
+        self._next_run: Dict[str, float] = {}
+        # (実行時刻, 連番, URL) のヒープ。古いエントリは取り出し時に読み飛ばす
+        self._queue: List[Tuple[float, int, str]] = []
+        self._seq = 0
+        self._in_flight: Set[str] = set()
+
+        # 統計情報
+        self.stats = {'runs': 0, 'skipped_in_flight': 0, 'coalesced': 0, 'failures': 0}
+
+    def _jitter(self) -> float:
+        return self.rng.uniform(0, self.jitter) if self.jitter else 0.0
+
+    def _schedule(self, url: str, run_at: float):
+        """次回実行時刻を設定する（ロック取得済みであること）"""
+        self._next_run[url] = run_at
+        self._seq += 1
+        heapq.heappush(self._queue, (run_at, self._seq, url))
+
+    def add_site(self, url: str, interval: Optional[float] = None):
+        """サイトを登録する
+
+        Args:
+            url: 対象URL
+            interval: 更新間隔（秒）。省略時はサイト設定のrefresh_intervalを使用
+        """
+        if interval is None:
+            interval = get_site_config(url).get('refresh_interval', 3600)
+
+        with self._lock:
+            self._intervals[url] = float(interval)
+            # 初回実行も揺らぎの範囲で分散させる
+            self._schedule(url, self.clock() + self._jitter())
+
+        logger.debug(f"スケジュールに追加しました: {url} (間隔: {interval}秒)")
+        self._wakeup.set()
+
+    def trigger(self, url: str):
+        """サイトの即時実行を要求する
+
+        既に実行予約がある場合は、早い方の時刻に1件だけ残す。
+        """
+        with self._lock:
+            if url not in self._intervals:
+                raise KeyError(f"スケジュールに登録されていないURLです: {url}")
+
+            now = self.clock()
+            if self._next_run.get(url, now) <= now:
+                self.stats['coalesced'] += 1
+                logger.debug(f"実行要求をまとめました: {url}")
+                return
+            self._schedule(url, now)
+
+        self._wakeup.set()
+
+    def _pop_due(self, now: float) -> List[str]:
+        """実行時刻に達したサイトを取り出す（ロック取得済みであること）"""
+        due = []
+        while self._queue and self._queue[0][0] <= now:
+            run_at, _, url = heapq.heappop(self._queue)
+            # 再スケジュール済みの古いエントリは読み飛ばす
+            if self._next_run.get(url) != run_at:
+                continue
+            due.append(url)
+        return due
+
+    def _on_done(self, url: str, future):
+        with self._lock:
+            self._in_flight.discard(url)
+
+        error = future.exception()
+        if error is not None:
+            self.stats['failures'] += 1
+            logger.error(f"スケジュール実行中にエラーが発生しました: {url}: {error}")
+        self._wakeup.set()
+
+    def run_pending(self) -> int:
+        """実行時刻に達したサイトのジョブを投入する
+
+        Returns:
+            投入したジョブの数
+        """
+        futures = []
+        with self._lock:
+            now = self.clock()
+            for url in self._pop_due(now):
+                # 次回の実行時刻は現在時刻を基準に決める（遅延分をまとめて実行しない）
+                self._schedule(url, now + self._intervals[url] + self._jitter())
+
+                if url in self._in_flight:
+                    self.stats['skipped_in_flight'] += 1
+                    logger.info(f"前回の実行が完了していないためスキップします: {url}")
+                    continue
+
+                self._in_flight.add(url)
+                self.stats['runs'] += 1
+                futures.append((url, self._executor.submit(self.job, url)))
+
+        # 完了済みのFutureではコールバックが即座に呼ばれるため、ロックの外で登録する
+        for url, future in futures:
+            future.add_done_callback(lambda f, url=url: self._on_done(url, f))
+
+        return len(futures)
+
+    def seconds_until_next_run(self) -> Optional[float]:
+        """次の実行までの秒数を返す。登録サイトがない場合はNone"""
+        with self._lock:
+            if not self._next_run:
+                return None
+            return max(0.0, min(self._next_run.values()) - self.clock())
+
+    def run(self):
+        """stop()が呼ばれるまでスケジュールに従ってジョブを実行する"""
+        logger.info(f"スケジューラーを開始します（{len(self._intervals)}サイト）")
+        try:
+            while not self._stopped.is_set():
+                self._wakeup.clear()
+                self.run_pending()
+                self._wakeup.wait(timeout=self.seconds_until_next_run())
+        except KeyboardInterrupt:
+            logger.info("スケジューラーを停止します")
+        finally:
+            self._executor.shutdown(wait=True)
+
+    def stop(self):
+        """スケジューラーを停止する"""
+        self._stopped.set()
+        self._wakeup.set()
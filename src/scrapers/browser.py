@@ -0,0 +1,681 @@
+# -*- coding: utf-8 -*-
+"""
+Shared Selenium WebDriver management for scrapers
+
+The ChromeDriver path resolved by webdriver-manager is cached on disk
+together with the installed Chrome version, so later runs skip the network
+version check until Chrome is upgraded, the driver disappears or the entry
+is older than DRIVER_CACHE_MAX_AGE:
+
+    {'path': '/root/.wdm/.../chromedriver', 'browser_version': '119.0.6045.105', 'resolved_at': 1760000000.0}
+
+With keep-alive enabled, prewarm() launches Chrome in a background thread so
+that browser start-up overlaps the plain-HTTP sites; acquire_driver() waits
+for it and reuses the pre-launched driver.
+
+Resource blocking ('resource_blocking' in SITE_CONFIGS) uses
+Network.setBlockedURLs: every URL matching 'blocked_url_patterns' or the
+patterns of 'blocked_resource_types' is blocked. 'warn_if_blocked_patterns'
+is not an allow-list and does not exempt anything from blocking; it only
+names requests the page needs, and summarize_network_events() reports them
+as blocked_essential_requests when one of the blocking patterns caught them,
+so that an over-broad pattern shows up as a warning instead of an empty page.
+
+render_page() is the render-and-extract step shared by every scraper that
+needs a browser (site modules and declarative sites with fetch: 'selenium'):
+it waits for the container to fill, then returns its outerHTML, the whole
+page source or entries extracted in the page, and honours cassette
+record/replay and the run deadline.
+"""
+
+import json
+import logging
+import os
+import re
+import shutil
+import subprocess
+import threading
+import time
+from fnmatch import fnmatch
+from tempfile import mkdtemp
+from typing import Any, Dict, List, Optional, Tuple
+
+from .config import (
+    is_lambda_environment,
+    get_chrome_options_for_lambda,
+    get_chrome_options_for_local,
+    RESOURCE_TYPE_URL_PATTERNS,
+    TYPICAL_RESOURCE_BYTES
+)
+from . import cassette
+from . import deadline
+from . import endpoint
+from . import report
+from . import state
+
+# ロガーの設定
+logger = logging.getLogger(__name__)
+
+# ウォームスタート時に再利用するドライバー
+_cached_driver = None
+_cached_driver_key: Optional[Tuple[Any, ...]] = None
+_keep_alive = False
+
+# バックグラウンドでChromeを起動しているスレッド
+_prewarm_thread: Optional[threading.Thread] = None
+
+SYSTEM_CHROMEDRIVER = '/usr/bin/chromedriver'
+
+# ChromeDriverのパスを記録する状態の名前空間とキー
+DRIVER_STATE_NAMESPACE = 'chromedriver'
+DRIVER_STATE_KEY = 'webdriver_manager'
+
+# 記録したChromeDriverのパスを再確認するまでの期間（秒）
+DRIVER_CACHE_MAX_AGE = 7 * 24 * 60 * 60
+
+# ページ読み込みのタイムアウト（秒、期限がある場合は残り時間に収める）
+PAGE_LOAD_TIMEOUT = 60
+
+# 期限がある場合に、取得後の抽出や出力のために残しておく時間（秒）
+DEADLINE_RESERVE = 2.0
+
+# 描画を待ち、内容を取り出すコンテナの既定値
+DEFAULT_CONTAINER_SELECTOR = 'body'
+
+# コンテナのouterHTMLのみを返すスクリプト
+OUTER_HTML_SCRIPT = """
+const container = document.querySelector(arguments[0]);
+return container ? container.outerHTML : null;
+"""
+
+# セレクターパターンに従ってエントリーを抽出し、レコードの配列で返すスクリプト
+# テキストはBeautifulSoupのget_text(strip=True)と同じく、各テキストノードをtrimして連結する
+STRUCTURED_ENTRIES_SCRIPT = """
+const root = document.querySelector(arguments[0]) || document;
+const patterns = arguments[1];
+const text = (el) => {
+    if (!el) return '';
+    const walker = document.createTreeWalker(el, NodeFilter.SHOW_TEXT);
+    let out = '';
+    while (walker.nextNode()) out += walker.currentNode.nodeValue.trim();
+    return out;
+};
+const pick = (entry, selector) => selector ? entry.querySelector(selector) : null;
+const datePattern = /(\\d{4}年\\d{1,2}月\\d{1,2}日|\\d{4}[./\\-]\\d{1,2}[./\\-]\\d{1,2})/;
+for (const p of patterns) {
+    const entries = root.querySelectorAll(p.entry);
+    if (!entries.length) continue;
+    const records = [];
+    for (const entry of entries) {
+        const dateEl = pick(entry, p.date);
+        let date = dateEl ? (dateEl.getAttribute('datetime') || text(dateEl)) : '';
+        if (!date) {
+            const m = entry.textContent.match(datePattern);
+            date = m ? m[0] : '';
+        }
+        const content = text(pick(entry, p.content)) || text(entry);
+        const link = entry.querySelector('a[href]');
+        records.push({
+            date: date,
+            category: text(pick(entry, p.category)),
+            content: content,
+            title: text(pick(entry, p.title)),
+            link: link ? link.getAttribute('href') : ''
+        });
+    }
+    if (records.length) return records;
+}
+return null;
+"""
+
+CHROME_BINARIES = ('google-chrome', 'google-chrome-stable', 'chromium', 'chromium-browser', '/opt/chrome/chrome')
+
+# プロセス内で解決済みのChromeDriverのパス
+_resolved_driver_path: Optional[str] = None
+
+def set_keep_alive(enabled: bool):
+    """ドライバーを呼び出し間で再利用するかを設定する
+
+    Lambdaのウォームコンテナなど、同じプロセスで繰り返しスクレイピングする場合に有効化する。
+    """
+    global _keep_alive
+    _keep_alive = enabled
+    if not enabled:
+        shutdown_driver()
+
+def get_chrome_option_list(use_lambda_optimization: bool = False, debug: bool = False) -> list:
+    """環境に応じたChromeの起動オプションのリストを返す"""
+    # Lambda環境を自動検出
+    is_lambda = is_lambda_environment() or use_lambda_optimization
+
+    if is_lambda:
+        if debug:
+            logger.debug("Lambda最適化モードを使用")
+        return get_chrome_options_for_lambda()
+
+    if debug:
+        logger.debug("ローカルモードを使用")
+    return get_chrome_options_for_local()
+
+def get_browser_version() -> Optional[str]:
+    """インストールされているChromeのバージョンを返す（見つからない場合はNone）"""
+    for name in CHROME_BINARIES:
+        binary = shutil.which(name)
+        if not binary:
+            continue
+        try:
+            output = subprocess.run([binary, '--version'], capture_output=True, text=True, timeout=10).stdout
+        except (OSError, subprocess.SubprocessError):
+            continue
+        match = re.search(r'\d+(?:\.\d+){1,3}', output)
+        if match:
+            return match.group(0)
+    return None
+
+def is_driver_entry_valid(entry: Optional[Dict[str, Any]], browser_version: Optional[str],
+                          now: Optional[float] = None) -> bool:
+    """記録したChromeDriverのパスがまだ使えるかを判定する"""
+    if not entry or not entry.get('path'):
+        return False
+    if not os.path.isfile(entry['path']) or not os.access(entry['path'], os.X_OK):
+        return False
+    if entry.get('browser_version') != browser_version:
+        return False
+    now = now if now is not None else time.time()
+    return now - entry.get('resolved_at', 0) < DRIVER_CACHE_MAX_AGE
+
+def install_driver() -> str:
+    """webdriver-managerでChromeのバージョンに合うChromeDriverを取得し、パスを返す（ネットワークを使用する）"""
+    from webdriver_manager.chrome import ChromeDriverManager
+    return ChromeDriverManager().install()
+
+def resolve_driver_path(debug: bool = False, refresh: bool = False) -> str:
+    """ChromeDriverのパスを返す
+
+    システムのchromedriverがあればそれを使用する。ない場合はwebdriver-managerで解決したパスを
+    Chromeのバージョンとともに記録し、有効な間はネットワークでのバージョン確認を省略する。
+    """
+    global _resolved_driver_path
+
+    if os.path.isfile(SYSTEM_CHROMEDRIVER):
+        return SYSTEM_CHROMEDRIVER
+
+    if _resolved_driver_path and not refresh:
+        return _resolved_driver_path
+
+    browser_version = get_browser_version()
+    entry = state.get_entry(DRIVER_STATE_NAMESPACE, DRIVER_STATE_KEY)
+    if not refresh and is_driver_entry_valid(entry, browser_version):
+        if debug:
+            logger.debug(f"記録済みのChromeDriverを使用します: {entry['path']}")
+        _resolved_driver_path = entry['path']
+        return _resolved_driver_path
+
+    if debug:
+        logger.debug("webdriver-managerを使用してChromeDriverを取得中...")
+    path = install_driver()
+    state.set_entry(DRIVER_STATE_NAMESPACE, DRIVER_STATE_KEY, {
+        'path': path,
+        'browser_version': browser_version,
+        'resolved_at': time.time(),
+    })
+    _resolved_driver_path = path
+    return path
+
+def create_driver(option_list: list, debug: bool = False, performance_log: bool = False):
+    """ChromeDriverを起動する
+
+    Args:
+        option_list: Chromeの起動オプション
+        debug: デバッグモード
+        performance_log: DevToolsのネットワークイベントをパフォーマンスログに記録するか
+    """
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
+
+    # Chrome optionsを設定
+    chrome_options = Options()
+
+    # Optionsにオプションを追加
+    for option in option_list:
+        chrome_options.add_argument(option)
+
+    # 一時ディレクトリを作成
+    chrome_options.add_argument(f"--user-data-dir={mkdtemp()}")
+    chrome_options.add_argument(f"--data-path={mkdtemp()}")
+    chrome_options.add_argument(f"--disk-cache-dir={mkdtemp()}")
+
+    # User-Agentを設定
+    chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36")
+
+    # SSL/TLS証明書エラーを無視
+    chrome_options.add_argument("--ignore-certificate-errors")
+    chrome_options.add_argument("--ignore-ssl-errors")
+    chrome_options.add_argument("--allow-insecure-localhost")
+    chrome_options.add_argument("--ignore-certificate-errors-spki-list")
+    chrome_options.add_argument("--allow-running-insecure-content")
+
+    # SSL証明書の検証を無効化（Seleniumレベル）
+    chrome_options.set_capability('acceptInsecureCerts', True)
+
+    # パフォーマンス最適化：不要なリソースの読み込みを無効化
+    prefs = {
+        "profile.managed_default_content_settings.images": 2,  # 画像を無効化
+        "profile.managed_default_content_settings.stylesheets": 2,  # CSSを無効化
+    }
+    chrome_options.add_experimental_option("prefs", prefs)
+
+    # ネットワークイベントを取得できるようにパフォーマンスログを有効化
+    if performance_log:
+        chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+
+    if debug:
+        logger.debug("ChromeDriverを初期化中...")
+
+    # システムのchromedriver、または記録済みのパスを使用
+    driver_path = resolve_driver_path(debug)
+    try:
+        driver = webdriver.Chrome(service=Service(driver_path), options=chrome_options)
+    except Exception as e:
+        if debug:
+            logger.debug(f"ChromeDriverの起動に失敗しました: {driver_path}: {e}")
+        # 記録したパスが使えない場合は、webdriver-managerで解決し直して再試行する
+        driver_path = resolve_driver_path(debug, refresh=True)
+        driver = webdriver.Chrome(service=Service(driver_path), options=chrome_options)
+
+    return driver
+
+def _is_alive(driver) -> bool:
+    """ドライバーがまだ応答するかを確認する"""
+    try:
+        driver.current_url
+        return True
+    except Exception:
+        return False
+
+def acquire_driver(
+    use_lambda_optimization: bool = False,
+    debug: bool = False,
+    performance_log: bool = False
+):
+    """ChromeDriverを取得する
+
+    keep-aliveが有効な場合は、同じ起動オプションで生存しているドライバーを再利用する。
+
+    Args:
+        use_lambda_optimization: Lambda最適化を使用するか
+        debug: デバッグモード
+        performance_log: DevToolsのネットワークイベントをパフォーマンスログに記録するか
+
+    Returns:
+        WebDriver。Seleniumが利用できない場合はNone
+    """
+    # バックグラウンドで起動中の場合は、完了を待ってから起動済みのドライバーを使用する
+    prewarm_thread = _prewarm_thread
+    if prewarm_thread is not None and prewarm_thread is not threading.current_thread():
+        prewarm_thread.join()
+
+    return _acquire_driver(use_lambda_optimization, debug, performance_log)
+
+def _acquire_driver(use_lambda_optimization: bool, debug: bool, performance_log: bool):
+    global _cached_driver, _cached_driver_key
+
+    try:
+        import selenium  # noqa: F401
+        import webdriver_manager  # noqa: F401
+    except ImportError as e:
+        logger.error(f"Seleniumのインポートに失敗しました: {e}")
+        return None
+
+    option_list = get_chrome_option_list(use_lambda_optimization, debug)
+    key = (tuple(option_list), performance_log)
+
+    if _keep_alive and _cached_driver is not None:
+        if _cached_driver_key == key and _is_alive(_cached_driver):
+            if debug:
+                logger.debug("起動済みのChromeDriverを再利用します。")
+            return _cached_driver
+        shutdown_driver()
+
+    driver = create_driver(option_list, debug, performance_log)
+
+    if _keep_alive:
+        _cached_driver = driver
+        _cached_driver_key = key
+
+    return driver
+
+def prewarm(use_lambda_optimization: bool = False, debug: bool = False, performance_log: bool = False) -> bool:
+    """バックグラウンドのスレッドでChromeを起動しておく
+
+    起動したドライバーはkeep-aliveで保持され、同じ起動オプションのacquire_driverで再利用される。
+    acquire_driverと同じuse_lambda_optimizationとperformance_logを指定する。
+
+    Returns:
+        起動を開始した場合True（keep-aliveが無効な場合や起動中の場合はFalse）
+    """
+    global _prewarm_thread
+
+    if not _keep_alive or (_prewarm_thread is not None and _prewarm_thread.is_alive()):
+        return False
+
+    def run():
+        started = time.monotonic()
+        try:
+            if _acquire_driver(use_lambda_optimization, debug, performance_log) is not None:
+                logger.info(f"バックグラウンドでChromeを起動しました（{time.monotonic() - started:.1f}秒）")
+        except Exception as e:
+            logger.warning(f"バックグラウンドでのChromeの起動に失敗しました: {e}")
+
+    _prewarm_thread = threading.Thread(target=run, name='chrome-prewarm', daemon=True)
+    _prewarm_thread.start()
+    return True
+
+def release_driver(driver, broken: bool = False):
+    """ChromeDriverの利用を終了する
+
+    keep-aliveで保持しているドライバーは終了せずに残す。broken=Trueの場合は必ず終了する。
+    """
+    if driver is None:
+        return
+
+    if driver is _cached_driver and not broken:
+        return
+
+    if driver is _cached_driver:
+        shutdown_driver()
+        return
+
+    try:
+        driver.quit()
+    except Exception:
+        pass
+
+def shutdown_driver():
+    """保持しているChromeDriverを終了する"""
+    global _cached_driver, _cached_driver_key
+
+    # バックグラウンドで起動中のChromeを終了し損ねないよう、起動の完了を待つ
+    prewarm_thread = _prewarm_thread
+    if prewarm_thread is not None and prewarm_thread is not threading.current_thread():
+        prewarm_thread.join()
+
+    if _cached_driver is not None:
+        try:
+            _cached_driver.quit()
+        except Exception:
+            pass
+
+    _cached_driver = None
+    _cached_driver_key = None
+
+def build_blocked_url_patterns(policy: Optional[Dict[str, Any]]) -> List[str]:
+    """サイト設定のresource_blockingからブロックするURLパターンのリストを作成する"""
+    if not policy:
+        return []
+
+    patterns = list(policy.get('blocked_url_patterns', []))
+    for resource_type in policy.get('blocked_resource_types', []):
+        patterns.extend(RESOURCE_TYPE_URL_PATTERNS.get(resource_type, []))
+
+    # 順序を保ったまま重複を削除
+    return list(dict.fromkeys(patterns))
+
+def apply_resource_blocking(driver, policy: Optional[Dict[str, Any]], debug: bool = False) -> List[str]:
+    """DevToolsのNetworkドメインでリクエストのブロックを設定する
+
+    再利用されたドライバーに前回の設定が残らないよう、ポリシーがない場合も空のリストを設定する。
+
+    Returns:
+        設定したURLパターンのリスト
+    """
+    patterns = build_blocked_url_patterns(policy)
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+        if debug and patterns:
+            logger.debug(f"{len(patterns)}個のURLパターンをブロックします。")
+    except Exception as e:
+        logger.warning(f"リクエストのブロック設定に失敗しました: {e}")
+        return []
+    return patterns
+
+def read_performance_events(driver) -> List[Dict[str, Any]]:
+    """パフォーマンスログからDevToolsのイベントを読み出す
+
+    ログはバッファから取り出されるため、呼び出すたびに新しいイベントだけが返る。
+
+    Returns:
+        {'method': ..., 'params': {...}} 形式のイベントのリスト
+    """
+    try:
+        entries = driver.get_log('performance')
+    except Exception as e:
+        logger.debug(f"パフォーマンスログを取得できませんでした: {e}")
+        return []
+
+    events = []
+    for entry in entries:
+        try:
+            message = json.loads(entry['message'])['message']
+        except (KeyError, TypeError, ValueError):
+            continue
+        events.append({'method': message.get('method'), 'params': message.get('params', {})})
+    return events
+
+def summarize_network_events(
+    events: List[Dict[str, Any]],
+    policy: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """ネットワークイベントからブロック件数と転送量を集計する
+
+    ブロックしたリクエストは実際には転送されないため、削減量はリソース種別ごとの
+    平均サイズから見積もる。
+
+    Returns:
+        requests, blocked_requests, transferred_bytes, estimated_bytes_saved,
+        blocked_essential_requests（warn_if_blocked_patternsに一致したのにブロックされたURL）を含む辞書
+    """
+    warn_patterns = (policy or {}).get('warn_if_blocked_patterns', [])
+    requests_by_id: Dict[str, Dict[str, Any]] = {}
+    stats = {
+        'requests': 0,
+        'blocked_requests': 0,
+        'transferred_bytes': 0,
+        'estimated_bytes_saved': 0,
+        'blocked_essential_requests': [],
+    }
+
+    for event in events:
+        method = event.get('method')
+        params = event.get('params', {})
+
+        if method == 'Network.requestWillBeSent':
+            request_id = params.get('requestId')
+            if request_id not in requests_by_id:
+                stats['requests'] += 1
+            requests_by_id[request_id] = {
+                'url': params.get('request', {}).get('url', ''),
+                'type': params.get('type', 'Other'),
+            }
+
+        elif method == 'Network.loadingFinished':
+            stats['transferred_bytes'] += int(params.get('encodedDataLength', 0))
+
+        elif method == 'Network.loadingFailed' and params.get('blockedReason'):
+            request = requests_by_id.get(params.get('requestId'), {})
+            resource_type = params.get('type') or request.get('type', 'Other')
+            url = request.get('url', '')
+
+            stats['blocked_requests'] += 1
+            stats['estimated_bytes_saved'] += TYPICAL_RESOURCE_BYTES.get(
+                resource_type, TYPICAL_RESOURCE_BYTES['Other']
+            )
+            if url and any(fnmatch(url, pattern) for pattern in warn_patterns):
+                stats['blocked_essential_requests'].append(url)
+
+    return stats
+
+def record_network_stats(url: str, events: List[Dict[str, Any]], resource_blocking: Dict[str, Any]):
+    """ネットワークイベントの集計結果を実行レポートに記録する"""
+    stats = summarize_network_events(events, resource_blocking)
+    run_report = report.get_report()
+    run_report.add(url, 'blocked_requests', stats['blocked_requests'])
+    run_report.add(url, 'estimated_bytes_saved', stats['estimated_bytes_saved'])
+    run_report.add(url, 'transferred_bytes', stats['transferred_bytes'])
+
+    for blocked_url in stats['blocked_essential_requests']:
+        logger.warning(f"描画に必要なリクエストがブロックされました: {blocked_url}")
+
+def extract_from_driver(
+    driver,
+    extract: Optional[Dict[str, Any]],
+    selector_patterns: Optional[List[Dict[str, Optional[str]]]] = None,
+    debug: bool = False
+) -> str:
+    """サイト設定に従ってブラウザからコンテンツを取り出す
+
+    ページ全体のpage_sourceはDOM全体をシリアライズして転送するため、
+    可能な場合はコンテナ部分のみ、またはエントリーの抽出結果のみを取得する。
+    コンテナが見つからない場合はページ全体のHTMLを返す。
+    """
+    mode = (extract or {}).get('mode', 'page_source')
+    container = (extract or {}).get('container', DEFAULT_CONTAINER_SELECTOR)
+
+    try:
+        if mode == 'outer_html':
+            html = driver.execute_script(OUTER_HTML_SCRIPT, container)
+            if html:
+                if debug:
+                    logger.debug(f"コンテナ'{container}'のHTMLを取得しました（{len(html)}文字）")
+                return html
+        elif mode == 'structured' and selector_patterns:
+            result = driver.execute_script(STRUCTURED_ENTRIES_SCRIPT, container, selector_patterns)
+            if result:
+                if debug:
+                    logger.debug(f"コンテナ'{container}'から{len(result)}件のエントリーを取得しました")
+                return json.dumps(result, ensure_ascii=False)
+    except Exception as e:
+        logger.warning(f"コンテナの取得に失敗しました。ページ全体を使用します: {e}")
+
+    if debug and mode != 'page_source':
+        logger.debug(f"コンテナ'{container}'が見つからないため、ページ全体のHTMLを使用します")
+    return driver.page_source
+
+def render_page(
+    url: str,
+    wait_time: float = 20,
+    post_load_wait: float = 8,
+    use_lambda_optimization: bool = False,
+    debug: bool = False,
+    resource_blocking: Optional[Dict[str, Any]] = None,
+    captured_responses: Optional[list] = None,
+    extract: Optional[Dict[str, Any]] = None,
+    selector_patterns: Optional[List[Dict[str, Optional[str]]]] = None
+) -> Optional[str]:
+    """ブラウザでページを描画し、必要な範囲を取り出す
+
+    Args:
+        url: 取得対象のURL
+        wait_time: コンテナ内にコンテンツが描画されるまでの最大待機時間（秒）
+        post_load_wait: 描画後の追加待機時間（秒）
+        use_lambda_optimization: Lambda最適化を使用するか
+        debug: デバッグモード
+        resource_blocking: DevTools経由でブロックするリクエストの設定（サイト設定のresource_blocking）
+        captured_responses: 指定した場合、ページが読み込んだJSONレスポンスの (URL, JSON) を追加する
+        extract: ブラウザから取り出す範囲の設定。containerは待機と抽出の対象（既定はbody）、
+            mode='outer_html'はコンテナのouterHTMLのみ、mode='structured'はエントリーを
+            抽出済みのJSONで返す。省略時はページ全体のHTMLを返す
+        selector_patterns: mode='structured'で使用するCSSセレクターパターンのリスト
+
+    Returns:
+        取得したHTML（mode='structured'の場合はJSON）またはNone（失敗時）
+    """
+    # 再生モード: 記録したページを返す（Chromeは起動しない）
+    mode = (extract or {}).get('mode', 'page_source')
+    if cassette.is_replaying():
+        return cassette.replay_page(url, mode)
+
+    try:
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+    except ImportError as e:
+        logger.error(f"Seleniumのインポートに失敗しました: {e}")
+        return None
+
+    driver = None
+    performance_log = bool(resource_blocking) or captured_responses is not None
+    try:
+        if debug:
+            logger.debug(f"待機時間: {wait_time}秒、ポストロード待機: {post_load_wait}秒")
+
+        # ChromeDriverを取得（keep-alive有効時は起動済みのものを再利用）
+        driver = acquire_driver(
+            use_lambda_optimization=use_lambda_optimization,
+            debug=debug,
+            performance_log=performance_log
+        )
+        if driver is None:
+            return None
+
+        # 描画に不要なリクエストをブロック
+        if performance_log:
+            # 再利用したドライバーに残っている前回のイベントを破棄
+            read_performance_events(driver)
+        apply_resource_blocking(driver, resource_blocking, debug)
+
+        if debug:
+            logger.debug(f"URLにアクセス中: {url}")
+
+        # 期限がある場合は、ページの読み込みと待機を残り時間に収める
+        driver.set_page_load_timeout(deadline.clamp(PAGE_LOAD_TIMEOUT, reserve=DEADLINE_RESERVE))
+        wait_time = deadline.clamp(wait_time, reserve=DEADLINE_RESERVE)
+
+        driver.get(url)
+
+        # JavaScriptでコンテナ内にコンテンツが追加されるまで待機
+        if debug:
+            logger.debug(f"ページの読み込みを待機中（最大{wait_time}秒）...")
+        container = (extract or {}).get('container', DEFAULT_CONTAINER_SELECTOR)
+        try:
+            WebDriverWait(driver, wait_time).until(
+                lambda d: len(d.find_element(By.CSS_SELECTOR, container).find_elements(By.CSS_SELECTOR, "div, article, a")) > 0
+            )
+            if debug:
+                logger.debug("JavaScriptによるコンテンツの読み込みが完了しました。")
+        except Exception as e:
+            if debug:
+                logger.debug(f"JavaScriptコンテンツの読み込み待機中にタイムアウト: {e}")
+                logger.debug("現在のページ状態で処理を継続します。")
+
+        # 追加で待機（JavaScriptアニメーションなどのため）
+        post_load_wait = deadline.clamp(post_load_wait, reserve=DEADLINE_RESERVE)
+        if post_load_wait > 0:
+            if debug:
+                logger.debug(f"追加で{post_load_wait}秒待機中...")
+            time.sleep(post_load_wait)
+
+        # 必要な範囲だけをブラウザから取り出す
+        html = extract_from_driver(driver, extract, selector_patterns, debug)
+
+        events = read_performance_events(driver) if performance_log else []
+
+        # ブロックしたリクエストを実行レポートに記録
+        if resource_blocking:
+            record_network_stats(url, events, resource_blocking)
+
+        # エンドポイント検出用にJSONレスポンスを取得
+        if captured_responses is not None:
+            captured_responses.extend(endpoint.capture_json_responses(driver, events))
+
+        release_driver(driver)
+
+        if cassette.is_recording():
+            cassette.record_page(url, mode, html)
+        return html
+
+    except Exception as e:
+        logger.warning(f"Seleniumでのページ取得中にエラーが発生: {e}")
+        release_driver(driver, broken=True)
+        return None
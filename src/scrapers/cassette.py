@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""
+Record/replay cassettes for fetched responses
+
+With --record DIR every HTTP response returned by fetch.get and every page
+taken from Selenium is stored in DIR, one JSON file per request:
+
+    {
+        'kind': 'http',                       # 'http' または 'selenium'
+        'url': 'https://example.com/news',
+        'status_code': 200,
+        'headers': {'Content-Type': 'text/html; charset=utf-8'},
+        'encoding': 'utf-8',
+        'body': '<html>...',
+        'body_encoding': 'text',              # 'text' または 'base64'
+        'elapsed_ms': 123.4,
+        'recorded_at': '2025-10-15T00:00:00',
+    }
+
+With --replay DIR the stored responses are served instead of fetching, so
+parsing and output can be rerun offline (without Chrome) and benchmarked
+without network noise. A request that is not in the cassette fails like a
+network error, so the scrapers fall back as they would online.
+
+While replaying, the state store (seen GUIDs, learned templates, discovered
+feeds, probes, endpoints, snapshots) is redirected to an empty scratch
+directory that is removed when replay ends. Every replay of a cassette
+therefore starts from the same state, and a cassette miss can never delete
+or overwrite what a production run has recorded.
+"""
+
+import atexit
+import base64
+import datetime
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import urllib.parse
+from typing import Any, Dict, Optional
+
+import requests
+
+from . import state
+from .state import write_file_atomic
+
+# ロガーの設定
+logger = logging.getLogger(__name__)
+
+_mode: Optional[str] = None
+_directory: Optional[str] = None
+
+# 再生中に状態ファイルを保存する一時ディレクトリ
+_scratch_state_dir: Optional[str] = None
+
+class CassetteMissError(requests.RequestException):
+    """再生モードで、記録されていないリクエストが行われた場合の例外"""
+
+def configure(record_dir: Optional[str] = None, replay_dir: Optional[str] = None):
+    """記録または再生のモードを設定する（両方Noneの場合は通常の取得に戻す）"""
+    global _mode, _directory, _scratch_state_dir
+
+    if record_dir and replay_dir:
+        raise ValueError("記録と再生は同時に指定できません")
+    if replay_dir and not os.path.isdir(replay_dir):
+        raise ValueError(f"再生するディレクトリが見つかりません: {replay_dir}")
+
+    # 前回の再生で使用した一時的な状態ディレクトリを片付ける
+    if _scratch_state_dir is not None:
+        state.set_state_dir_override(None)
+        shutil.rmtree(_scratch_state_dir, ignore_errors=True)
+        _scratch_state_dir = None
+
+    if record_dir:
+        _mode, _directory = 'record', record_dir
+    elif replay_dir:
+        _mode, _directory = 'replay', replay_dir
+        # 再生のたびに空の状態から始め、本番の状態ファイルは読み書きしない
+        _scratch_state_dir = tempfile.mkdtemp(prefix='feed-generator-replay-')
+        state.set_state_dir_override(_scratch_state_dir)
+        atexit.register(shutil.rmtree, _scratch_state_dir, ignore_errors=True)
+    else:
+        _mode, _directory = None, None
+
+def is_recording() -> bool:
+    return _mode == 'record'
+
+def is_replaying() -> bool:
+    return _mode == 'replay'
+
+def get_cassette_path(kind: str, key: str) -> str:
+    """リクエストを保存するファイルパスを返す（ホスト名とキーのハッシュから作成する）"""
+    host = urllib.parse.urlparse(key).netloc.replace(':', '_') or 'unknown'
+    digest = hashlib.sha1(f"{kind} {key}".encode('utf-8')).hexdigest()[:16]
+    return os.path.join(_directory, kind, f"{host}_{digest}.json")
+
+def _save(kind: str, key: str, entry: Dict[str, Any]):
+    entry = dict(entry, kind=kind, key=key, recorded_at=datetime.datetime.now().isoformat(timespec='seconds'))
+    payload = json.dumps(entry, ensure_ascii=False, indent=2).encode('utf-8')
+    write_file_atomic(get_cassette_path(kind, key), payload)
+
+def _load(kind: str, key: str) -> Dict[str, Any]:
+    path = get_cassette_path(kind, key)
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        raise CassetteMissError(f"記録されていないリクエストです: {key}（{path}）: {e}")
+
+def record_response(url: str, response: requests.Response):
+    """HTTPレスポンスを記録する"""
+    try:
+        body = response.content.decode('utf-8')
+        body_encoding = 'text'
+    except UnicodeDecodeError:
+        body = base64.b64encode(response.content).decode('ascii')
+        body_encoding = 'base64'
+
+    _save('http', url, {
+        'url': response.url or url,
+        'status_code': response.status_code,
+        'headers': dict(response.headers),
+        'encoding': response.encoding,
+        'body': body,
+        'body_encoding': body_encoding,
+        'elapsed_ms': round(response.elapsed.total_seconds() * 1000, 1),
+    })
+
+def replay_response(url: str) -> requests.Response:
+    """記録したHTTPレスポンスを返す（記録がない場合はCassetteMissError）"""
+    entry = _load('http', url)
+    response = requests.Response()
+    response.status_code = entry['status_code']
+    response.headers.update(entry.get('headers', {}))
+    response.encoding = entry.get('encoding')
+    response.url = entry.get('url', url)
+    body = entry.get('body', '')
+    response._content = base64.b64decode(body) if entry.get('body_encoding') == 'base64' else body.encode('utf-8')
+    logger.debug(f"記録したレスポンスを再生します: {url}")
+    return response
+
+def record_page(url: str, mode: str, content: str):
+    """Seleniumで取得したページ（取り出し方ごと）を記録する"""
+    _save('selenium', f"{url}#{mode}", {'url': url, 'mode': mode, 'body': content})
+
+def replay_page(url: str, mode: str) -> Optional[str]:
+    """記録したSeleniumのページを返す（記録がない場合はNone）"""
+    try:
+        entry = _load('selenium', f"{url}#{mode}")
+    except CassetteMissError as e:
+        logger.warning(str(e))
+        return None
+    logger.debug(f"記録したページを再生します: {url}")
+    return entry['body']
@@ -4,13 +4,14 @@ Site-specific configuration for scrapers
 """
 
 import os
-from typing import Dict, Any
+import urllib.parse
+from typing import Dict, Any, List, Optional
 
 # サイト別の設定
 SITE_CONFIGS = {
     'https://ja.monaca.io/headline/': {
         'name': 'Monaca Headline',
-        'requires_selenium': True,
+        'requires_selenium': True,  # Trueの場合は静的HTMLのプローブを省略してブラウザを使用
         'selenium_wait_time': 20,  # Seleniumの待機時間（秒）
         'post_load_wait': 8,  # ページロード後の追加待機時間（秒）
         'use_lambda_optimization': True,
@@ -22,6 +23,34 @@ SITE_CONFIGS = {
             'article',
         ],
         'min_items_threshold': 2,  # 最低限取得すべきアイテム数
+        # Seleniumから取り出す範囲（'page_source' / 'outer_html' / 'structured'）
+        'selenium_extract': {
+            'container': '.headline-entries',
+            'mode': 'outer_html',
+        },
+        'refresh_interval': 6 * 60 * 60,  # スケジューラーモードでの更新間隔（秒）
+        # DevTools経由でブロックするリクエスト（お知らせ一覧の描画に不要なもの）
+        'resource_blocking': {
+            'blocked_resource_types': ['Image', 'Stylesheet', 'Font', 'Media'],
+            'blocked_url_patterns': [
+                '*googletagmanager.com/*',
+                '*google-analytics.com/*',
+                '*doubleclick.net/*',
+                '*googlesyndication.com/*',
+                '*facebook.net/*',
+                '*facebook.com/tr*',
+                '*hotjar.com/*',
+                '*clarity.ms/*',
+                '*platform.twitter.com/*',
+                '*youtube.com/*',
+                '*ytimg.com/*',
+            ],
+            # 描画に必要なリクエスト（ブロックの対象からは除外せず、ブロックされた場合に警告する）
+            'warn_if_blocked_patterns': [
+                '*://ja.monaca.io/headline*',
+                '*://ja.monaca.io/*.js*',
+            ],
+        },
     },
     'https://firebase.google.com/support/releases': {
         'name': 'Firebase Release Notes',
@@ -34,28 +63,66 @@ SITE_CONFIGS = {
             '.release-note',
         ],
         'min_items_threshold': 1,
+        'refresh_interval': 60 * 60,
     },
 }
 
-def get_site_config(url: str) -> Dict[str, Any]:
-    """URLからサイト設定を取得する
+# リソース種別ごとのURLパターン（DevToolsのURLブロックで使用）
+RESOURCE_TYPE_URL_PATTERNS = {
+    'Image': ['*.png*', '*.jpg*', '*.jpeg*', '*.gif*', '*.webp*', '*.svg*', '*.ico*'],
+    'Stylesheet': ['*.css*'],
+    'Font': ['*.woff*', '*.ttf*', '*.otf*', '*.eot*'],
+    'Media': ['*.mp4*', '*.webm*', '*.mp3*', '*.ogg*', '*.m3u8*'],
+}
+
+# ブロックしたリクエストの削減量を見積もるための、リソース種別ごとの平均サイズ（バイト）
+TYPICAL_RESOURCE_BYTES = {
+    'Image': 40_000,
+    'Stylesheet': 30_000,
+    'Font': 50_000,
+    'Media': 500_000,
+    'Script': 60_000,
+    'XHR': 5_000,
+    'Fetch': 5_000,
+    'Other': 10_000,
+}
+
+# ホスト名からSITE_CONFIGSのキー（パスの長い順）を引く索引（初回の検索時に作成する）
+_host_index: Dict[str, List[str]] = {}
+_indexed_configs: Optional[Dict[str, Any]] = None
+_indexed_count = -1
+
+def _get_host_index() -> Dict[str, List[str]]:
+    """ホスト名の索引を返す（SITE_CONFIGSが置き換えられた場合やサイト数が変わった場合は作り直す）"""
+    global _host_index, _indexed_configs, _indexed_count
     
-    Args:
-        url: 対象URL
-        
-    Returns:
-        サイト設定の辞書。該当する設定がない場合はデフォルト設定を返す
+    if _indexed_configs is not SITE_CONFIGS or _indexed_count != len(SITE_CONFIGS):
+        index: Dict[str, List[str]] = {}
+        for config_url in SITE_CONFIGS:
+            index.setdefault(urllib.parse.urlparse(config_url).netloc, []).append(config_url)
+        for config_urls in index.values():
+            config_urls.sort(key=lambda config_url: len(urllib.parse.urlparse(config_url).path), reverse=True)
+        _host_index, _indexed_configs, _indexed_count = index, SITE_CONFIGS, len(SITE_CONFIGS)
+    return _host_index
+
+def get_site_key(url: str) -> Optional[str]:
+    """URLに対応するSITE_CONFIGSのキーを返す（該当する設定がない場合はNone）
+    
+    完全一致の後、同じホストの設定のうちパスが前方一致するもの（パスの長いものを優先）を探す。
+    ホスト名の索引を使うため、サイト数によらず一定の時間で検索できる。
     """
-    # 完全一致で検索
     if url in SITE_CONFIGS:
-        return SITE_CONFIGS[url]
+        return url
     
-    # URLに含まれるドメインで検索
-    for config_url, config in SITE_CONFIGS.items():
-        if config_url in url or url in config_url:
-            return config
-    
-    # デフォルト設定を返す
+    parsed_url = urllib.parse.urlparse(url)
+    for config_url in _get_host_index().get(parsed_url.netloc, ()):
+        config_path = urllib.parse.urlparse(config_url).path
+        if parsed_url.path.startswith(config_path) or config_path.startswith(parsed_url.path):
+            return config_url
+    return None
+
+def get_default_site_config() -> Dict[str, Any]:
+    """該当する設定がないサイトのデフォルト設定を返す"""
     return {
         'name': 'Generic',
         'requires_selenium': False,
@@ -64,8 +131,38 @@ def get_site_config(url: str) -> Dict[str, Any]:
         'use_lambda_optimization': False,
         'css_selectors': ['article', '.news-item', '.entry'],
         'min_items_threshold': 1,
+        'refresh_interval': 60 * 60,
+        # ページ送りの設定（max_pagesが1の場合は1ページ目のみ取得する）
+        'pagination': {
+            'next_selector': 'link[rel~=next], a[rel~=next]',
+            'max_pages': 1,
+        },
     }
 
+def get_site_config(url: str) -> Dict[str, Any]:
+    """URLからサイト設定を取得する
+    
+    Args:
+        url: 対象URL
+        
+    Returns:
+        サイト設定の辞書。該当する設定がない場合はデフォルト設定を返す
+    """
+    site_key = get_site_key(url)
+    if site_key is not None:
+        return SITE_CONFIGS[site_key]
+    
+    # デフォルト設定を返す
+    return get_default_site_config()
+
+def register_site(url: str, config: Dict[str, Any]):
+    """サイト設定を追加する（指定しなかった項目はデフォルト設定の値を使用する）"""
+    SITE_CONFIGS[url] = {**get_default_site_config(), **config}
+
+def get_declarative_site_urls() -> List[str]:
+    """宣言的なサイト定義（extraction）を持つサイトのURLを返す"""
+    return [url for url, config in SITE_CONFIGS.items() if config.get('extraction')]
+
 def is_lambda_environment() -> bool:
     """AWS Lambda環境で実行されているかを判定する
     
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+End-to-end deadline budgets
+
+A deadline is set for the whole run (--deadline or the Lambda context) and,
+optionally, for each URL. Nested scopes never extend the enclosing deadline.
+Every stage reads the current deadline: HTTP timeouts and browser waits are
+shrunk to the remaining time, and fallback strategies that cannot finish in
+time are skipped so that the best partial result is returned.
+
+The deadline is kept in a context variable; work submitted to thread pools
+must be run with contextvars.copy_context() to inherit it.
+"""
+
+import contextlib
+import contextvars
+import time
+from typing import Iterator, Optional
+
+_current_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar('deadline', default=None)
+
+# テストで置き換えられるように、時刻の取得は関数を経由する
+_clock = time.monotonic
+
+class DeadlineExceeded(TimeoutError):
+    """期限を過ぎたため処理を中止した場合の例外"""
+
+@contextlib.contextmanager
+def deadline_scope(seconds: Optional[float]) -> Iterator[None]:
+    """指定した秒数の期限を設定する（外側の期限より後にはならない。Noneの場合は外側の期限のまま）"""
+    if seconds is None:
+        yield
+        return
+
+    deadline = _clock() + max(0.0, seconds)
+    outer = _current_deadline.get()
+    if outer is not None:
+        deadline = min(deadline, outer)
+
+    token = _current_deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _current_deadline.reset(token)
+
+def remaining() -> Optional[float]:
+    """期限までの残り秒数を返す（期限がない場合はNone）"""
+    deadline = _current_deadline.get()
+    if deadline is None:
+        return None
+    return max(0.0, deadline - _clock())
+
+def expired() -> bool:
+    """期限を過ぎているかを返す"""
+    left = remaining()
+    return left is not None and left <= 0
+
+def has_time_for(seconds: float) -> bool:
+    """指定した秒数の処理を期限内に終えられるかを返す（期限がない場合は常にTrue）"""
+    left = remaining()
+    return left is None or left >= seconds
+
+def clamp(timeout: Optional[float], reserve: float = 0.0) -> Optional[float]:
+    """待機時間やタイムアウトを期限までの残り時間（reserveを除く）に収める"""
+    left = remaining()
+    if left is None:
+        return timeout
+    left = max(0.0, left - reserve)
+    return left if timeout is None else min(timeout, left)
+
+def check(stage: str = ''):
+    """期限を過ぎている場合はDeadlineExceededを送出する"""
+    if expired():
+        raise DeadlineExceeded(f"期限を過ぎたため処理を中止しました{': ' + stage if stage else ''}")
@@ -0,0 +1,288 @@
+# -*- coding: utf-8 -*-
+"""
+Declarative site definitions compiled into extraction plans
+
+Simple sites need no scraper module: an 'extraction' block in SITE_CONFIGS
+(or in a file loaded with --sites) describes how to read them:
+
+    'https://example.com/news': {
+        'name': 'Example News',
+        'extraction': {
+            'fetch': 'static',                       # 'static' または 'selenium'
+            'container': '.news-list',               # fetch='selenium'で待機するコンテナ
+            'patterns': [{                           # 最初に一致したパターンを使用する
+                'entry': '.news-list li',
+                'date': 'time, .date',               # datetime属性を優先
+                'title': 'h3, .title',
+                'category': '.badge',
+                'content': '.summary',               # 省略時はエントリー全体のテキスト
+                'link': 'a[href]',                   # 省略時は最初のリンク
+            }],
+            'date_formats': ['%Y.%m.%d'],            # 解析できない場合は元の文字列のまま
+            'keywords': {'重要': 'Important'},       # 省略時は汎用スクレイパーのキーワード
+        },
+    }
+
+A single pattern may also be written directly in 'extraction' instead of
+'patterns'. Sites with fetch='selenium' are rendered with
+browser.render_page() and, like requires_selenium sites, get the browser
+pre-warmed. Each definition is compiled once (CSS selectors, date formats and
+the keyword table as one regular expression) and cached per site, so one
+engine serves any number of sites.
+"""
+
+import datetime
+import json
+import logging
+import re
+import urllib.parse
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import soupsieve
+from bs4 import BeautifulSoup
+from bs4.element import Tag
+
+from . import browser
+from . import fetch
+from . import pagination
+from .config import get_site_config, get_site_key, register_site
+from .generic import detect_categories, extract_date
+from .guid import stable_guid
+
+# ロガーの設定
+logger = logging.getLogger(__name__)
+
+FIELD_NAMES = ('date', 'title', 'category', 'content', 'link')
+EXTRACTION_KEYS = {'fetch', 'container', 'patterns', 'date_formats', 'keywords', 'entry'} | set(FIELD_NAMES)
+FETCH_STRATEGIES = ('static', 'selenium')
+
+class CompiledPattern(NamedTuple):
+    entry: Any
+    fields: Dict[str, Any]
+
+class ExtractionPlan(NamedTuple):
+    patterns: Tuple[CompiledPattern, ...]
+    date_formats: Tuple[str, ...]
+    categorize: Callable[[str], List[str]]
+    fetch: str
+    container: Optional[str]
+
+# サイトごとにコンパイル済みの抽出計画（キーはSITE_CONFIGSのキー）
+_plans: Dict[str, Tuple[Dict[str, Any], ExtractionPlan]] = {}
+
+def build_categorizer(keywords: Optional[Dict[str, str]]) -> Callable[[str], List[str]]:
+    """キーワード表から、テキストのカテゴリを検出する関数を作成する
+
+    キーワードは長い順に1つの正規表現にまとめ、テキストを1回走査して検出する。
+    """
+    if not keywords:
+        return detect_categories
+
+    categories = {keyword.lower(): category for keyword, category in keywords.items()}
+    alternation = '|'.join(re.escape(keyword) for keyword in sorted(categories, key=len, reverse=True))
+    # 先読みで各位置から照合し、重なり合うキーワード（「サービス終了」と「終了」など）も検出する
+    pattern = re.compile(f'(?=({alternation}))', re.IGNORECASE)
+
+    def categorize(text: str) -> List[str]:
+        found = {categories[match.group(1).lower()] for match in pattern.finditer(text)}
+        return sorted(found) or ['Other']
+
+    return categorize
+
+def compile_plan(extraction: Dict[str, Any]) -> ExtractionPlan:
+    """サイト定義のextractionを抽出計画にコンパイルする
+
+    Raises:
+        ValueError: 定義の内容が不正な場合
+    """
+    unknown = set(extraction) - EXTRACTION_KEYS
+    if unknown:
+        raise ValueError(f"サイト定義に不明なキーがあります: {', '.join(sorted(unknown))}")
+
+    fetch_strategy = extraction.get('fetch', 'static')
+    if fetch_strategy not in FETCH_STRATEGIES:
+        raise ValueError(f"不明な取得方法です: {fetch_strategy}（{', '.join(FETCH_STRATEGIES)}のいずれか）")
+
+    patterns = extraction.get('patterns')
+    if patterns is None:
+        patterns = [{key: extraction[key] for key in ('entry',) + FIELD_NAMES if key in extraction}]
+    if not patterns or any(not isinstance(p, dict) or not p.get('entry') for p in patterns):
+        raise ValueError("サイト定義のパターンにはentryのセレクタが必要です")
+
+    compiled = []
+    for pattern in patterns:
+        try:
+            compiled.append(CompiledPattern(
+                soupsieve.compile(pattern['entry']),
+                {name: soupsieve.compile(pattern[name]) for name in FIELD_NAMES if pattern.get(name)}
+            ))
+        except soupsieve.SelectorSyntaxError as e:
+            raise ValueError(f"CSSセレクタが不正です: {e}") from e
+
+    return ExtractionPlan(
+        patterns=tuple(compiled),
+        date_formats=tuple(extraction.get('date_formats', ())),
+        categorize=build_categorizer(extraction.get('keywords')),
+        fetch=fetch_strategy,
+        container=extraction.get('container'),
+    )
+
+def get_plan(url: str) -> Optional[ExtractionPlan]:
+    """URLのサイト定義から抽出計画を返す（サイトごとに1回だけコンパイルする）"""
+    site_key = get_site_key(url)
+    extraction = get_site_config(url).get('extraction')
+    if site_key is None or not extraction:
+        return None
+
+    cached = _plans.get(site_key)
+    if cached is None or cached[0] is not extraction:
+        cached = (extraction, compile_plan(extraction))
+        _plans[site_key] = cached
+    return cached[1]
+
+def format_date(date_str: str, date_formats: Tuple[str, ...]) -> str:
+    """日付の文字列をRSSのpubDate形式に変換する（解析できない場合は元の文字列）"""
+    for date_format in date_formats:
+        try:
+            parsed = datetime.datetime.strptime(date_str, date_format)
+        except ValueError:
+            continue
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+        return parsed.strftime('%a, %d %b %Y %H:%M:%S %z')
+    return date_str
+
+def _text(element: Optional[Tag]) -> str:
+    return element.get_text(strip=True) if element is not None else ''
+
+def extract_entry(entry: Tag, fields: Dict[str, Any], plan: ExtractionPlan, url: str) -> Dict[str, Any]:
+    """1つのエントリー要素からアイテムを作成する"""
+    def select(name: str) -> Optional[Tag]:
+        return fields[name].select_one(entry) if name in fields else None
+
+    content = _text(select('content')) or _text(entry)
+    title = _text(select('title')) or content[:100]
+
+    date_element = select('date')
+    if date_element is not None:
+        date_str = date_element.get('datetime') or _text(date_element)
+    else:
+        date_str = extract_date(content)
+
+    link_element = select('link')
+    if link_element is None:
+        title_element = select('title')
+        link_element = title_element if title_element is not None and title_element.name == 'a' else entry.find('a', href=True)
+    link = urllib.parse.urljoin(url, link_element['href']) if link_element is not None and link_element.get('href') else url
+
+    category_text = _text(select('category'))
+    categories = plan.categorize(f"{title} {content}")
+    if category_text:
+        categories = [category_text] + [category for category in categories if category not in (category_text, 'Other')]
+
+    return {
+        'title': title,
+        'description': content,
+        'link': link,
+        'pubDate': format_date(date_str, plan.date_formats) if date_str != "不明" else date_str,
+        'categories': categories,
+        'guid': stable_guid(link, title),
+    }
+
+def extract_items(plan: ExtractionPlan, soup: BeautifulSoup, url: str, debug: bool = False) -> List[Dict[str, Any]]:
+    """抽出計画に従ってページからアイテムを抽出する（最初にエントリーが見つかったパターンを使用する）"""
+    for index, pattern in enumerate(plan.patterns):
+        entries = pattern.entry.select(soup)
+        if not entries:
+            continue
+        if debug:
+            logger.debug(f"パターン{index + 1}で{len(entries)}件のエントリーを検出しました")
+        return [extract_entry(entry, pattern.fields, plan, url) for entry in entries]
+    return []
+
+def fetch_html(url: str, plan: ExtractionPlan, debug: bool = False) -> Optional[str]:
+    """サイト定義の取得方法でページのHTMLを取得する"""
+    if plan.fetch == 'selenium':
+        site_config = get_site_config(url)
+        extract = {'mode': 'outer_html', 'container': plan.container} if plan.container else {'mode': 'page_source'}
+        return browser.render_page(
+            url,
+            wait_time=site_config.get('selenium_wait_time', 10),
+            post_load_wait=site_config.get('post_load_wait', 2),
+            debug=debug,
+            resource_blocking=site_config.get('resource_blocking'),
+            extract=extract,
+        )
+    return fetch.get(url, headers={'User-Agent': fetch.DEFAULT_USER_AGENT}).text
+
+def scrape(url: str, debug: bool = False, silent: bool = False,
+           max_pages: Optional[int] = None, since: Optional[str] = None) -> List[Dict[str, Any]]:
+    """サイト定義に従ってお知らせをスクレイピングする
+
+    Args:
+        max_pages: 取得するページ数の上限（省略時はサイト設定の値）
+        since: この日付（YYYY-MM-DD）より古いページに達した時点でページ送りを終了する
+    """
+    plan = get_plan(url)
+    if plan is None:
+        raise ValueError(f"サイト定義が見つかりません: {url}")
+
+    if not silent:
+        logger.info(f"サイト定義に従って {url} をスクレイピングします。")
+
+    html = fetch_html(url, plan, debug)
+    if html is None:
+        raise RuntimeError(f"ページを取得できませんでした: {url}")
+
+    items = pagination.crawl(
+        url,
+        BeautifulSoup(html, 'html.parser'),
+        lambda page_url, page_soup: extract_items(plan, page_soup, page_url, debug),
+        lambda page_url: fetch_html(page_url, plan, debug),
+        rules=get_site_config(url).get('pagination'),
+        max_pages=max_pages,
+        since=since,
+        debug=debug
+    )
+
+    if not silent:
+        logger.info(f"合計 {len(items)} 個のアイテムを取得しました。")
+    return items
+
+def load_site_definitions(path: str) -> List[str]:
+    """サイト定義のファイル（TOMLまたはJSON）を読み込み、サイト設定に追加する
+
+    ファイルには、url・name・extractionなどを持つサイトの配列をsitesとして記述する。
+
+    Returns:
+        追加したサイトのURL
+
+    Raises:
+        ValueError: ファイルの形式やサイト定義の内容が不正な場合
+    """
+    if path.endswith('.toml'):
+        import tomllib
+        with open(path, 'rb') as f:
+            data = tomllib.load(f)
+    else:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+
+    sites = data.get('sites', []) if isinstance(data, dict) else data
+    if not isinstance(sites, list) or not sites:
+        raise ValueError(f"サイトが定義されていません: {path}")
+
+    urls = []
+    for index, site in enumerate(sites):
+        if not isinstance(site, dict) or not site.get('url') or not isinstance(site.get('extraction'), dict):
+            raise ValueError(f"サイト{index + 1}にはurlとextractionが必要です")
+        try:
+            compile_plan(site['extraction'])
+        except ValueError as e:
+            raise ValueError(f"サイト{index + 1}（{site['url']}）: {e}") from e
+
+        config = {key: value for key, value in site.items() if key != 'url'}
+        config.setdefault('name', urllib.parse.urlparse(site['url']).netloc)
+        register_site(site['url'], config)
+        urls.append(site['url'])
+    return urls
@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+"""
+Discovery of JSON data endpoints behind JavaScript-rendered pages
+
+A Selenium run records the JSON responses the page loads. The response that
+carries the announcement list is matched against the items parsed from the
+rendered HTML, and the endpoint URL together with a response-to-item field
+mapping is stored so that later runs can fetch it with plain HTTP.
+
+Mapping format:
+    {
+        'url': 'https://example.com/api/headlines',
+        'items_path': ['data', 'entries'],       # JSONのルートから一覧までのキー
+        'fields': {                              # 各要素内のキー（ドット区切り）
+            'date': 'published_at',
+            'category': 'type.name',
+            'content': 'body',
+            'title': 'title',
+            'link': 'url',
+        },
+        'discovered_at': '2025-10-15T00:00:00',
+    }
+"""
+
+import datetime
+import logging
+import re
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from bs4 import BeautifulSoup
+
+from . import fetch
+from . import state
+from .config import get_site_config
+
+# ロガーの設定
+logger = logging.getLogger(__name__)
+
+STATE_NAMESPACE = 'endpoints'
+
+# フィールドの値として扱うキーの名前のヒント
+LINK_KEY_HINTS = ('url', 'link', 'href', 'permalink', 'slug')
+DATE_PATTERN = re.compile(r'\d{4}[-/.年]\d{1,2}[-/.月]\d{1,2}')
+
+def normalize_text(value: Any) -> str:
+    """比較用にHTMLタグと空白を取り除いたテキストを返す"""
+    text = str(value)
+    if '<' in text and '>' in text:
+        text = BeautifulSoup(text, 'html.parser').get_text()
+    return re.sub(r'\s+', '', text)
+
+def to_text(value: Any) -> str:
+    """JSONの値をアイテム用のテキストに変換する（HTMLはテキスト化する）"""
+    if value is None:
+        return ''
+    text = str(value)
+    if '<' in text and '>' in text:
+        return BeautifulSoup(text, 'html.parser').get_text(strip=True)
+    return text.strip()
+
+def get_path(obj: Any, path) -> Any:
+    """キー（またはインデックス）のリスト、またはドット区切りのパスで値を取り出す"""
+    if isinstance(path, str):
+        path = path.split('.') if path else []
+    for key in path:
+        if isinstance(obj, dict):
+            obj = obj.get(key)
+        elif isinstance(obj, list) and isinstance(key, int) and -len(obj) <= key < len(obj):
+            obj = obj[key]
+        else:
+            return None
+    return obj
+
+def flatten_record(record: Dict[str, Any], prefix: str = '', depth: int = 2) -> Dict[str, Any]:
+    """要素のスカラー値を「ドット区切りのキー → 値」に平坦化する"""
+    flat = {}
+    for key, value in record.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict) and depth > 0:
+            flat.update(flatten_record(value, f"{name}.", depth - 1))
+        elif isinstance(value, (str, int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+def iter_record_lists(obj: Any, path: Optional[list] = None) -> Iterator[Tuple[list, List[Dict[str, Any]]]]:
+    """JSON内の「辞書のリスト」をパスとともに列挙する"""
+    path = path or []
+    if isinstance(obj, list):
+        if obj and all(isinstance(element, dict) for element in obj):
+            yield path, obj
+        for index, element in enumerate(obj[:1]):
+            # 先頭要素の中にさらに一覧がある場合も探索する
+            if isinstance(element, (dict, list)):
+                yield from iter_record_lists(element, path + [index])
+    elif isinstance(obj, dict):
+        for key, value in obj.items():
+            if isinstance(value, (dict, list)):
+                yield from iter_record_lists(value, path + [key])
+
+def _best_key(records: List[Dict[str, Any]], matcher, exclude=()) -> Optional[str]:
+    """matcherに一致する値が最も多いキーを返す"""
+    scores: Dict[str, int] = {}
+    for record in records:
+        for key, value in flatten_record(record).items():
+            if key in exclude:
+                continue
+            if matcher(key, value):
+                scores[key] = scores.get(key, 0) + 1
+    if not scores:
+        return None
+    return max(scores, key=lambda k: (scores[k], -len(k)))
+
+def discover_mapping(
+    responses: List[Tuple[str, Any]],
+    items: List[Dict[str, Any]],
+    min_matches: int = 1
+) -> Optional[Dict[str, Any]]:
+    """JSONレスポンスの中からHTMLで取得したアイテムを含む一覧を探し、対応付けを作成する
+
+    Args:
+        responses: (URL, JSONオブジェクト) のリスト
+        items: 描画済みHTMLから取得したアイテム
+        min_matches: 一致しなければならないアイテム数の下限
+
+    Returns:
+        エンドポイントの対応付け。見つからない場合はNone
+    """
+    item_contents = [normalize_text(item.get('description', ''))[:40] for item in items]
+    item_contents = [content for content in item_contents if len(content) >= 8]
+    if not item_contents:
+        return None
+
+    best = None
+    for response_url, payload in responses:
+        for items_path, records in iter_record_lists(payload):
+            values = [normalize_text(v) for record in records for v in flatten_record(record).values()
+                      if isinstance(v, str)]
+            matches = sum(1 for content in item_contents if any(content in v or v in content
+                                                                 for v in values if len(v) >= 8))
+            if matches >= min_matches and (best is None or matches > best[0]):
+                best = (matches, response_url, items_path, records)
+
+    if best is None:
+        return None
+
+    matches, response_url, items_path, records = best
+    contents = set(item_contents)
+    item_categories = {normalize_text(c) for item in items for c in item.get('categories', [])}
+
+    content_key = _best_key(
+        records,
+        lambda k, v: isinstance(v, str) and any(c in normalize_text(v) for c in contents)
+    )
+    date_key = _best_key(
+        records,
+        lambda k, v: isinstance(v, str) and DATE_PATTERN.search(v) is not None,
+        exclude=(content_key,)
+    )
+    category_key = _best_key(
+        records,
+        lambda k, v: isinstance(v, str) and normalize_text(v) in item_categories,
+        exclude=(content_key, date_key)
+    )
+    link_key = _best_key(
+        records,
+        lambda k, v: isinstance(v, str) and any(h in k.lower() for h in LINK_KEY_HINTS)
+        and (v.startswith('http') or v.startswith('/')),
+        exclude=(content_key, date_key, category_key)
+    )
+    title_key = _best_key(
+        records,
+        lambda k, v: isinstance(v, str) and 'title' in k.lower(),
+        exclude=(content_key, date_key, category_key, link_key)
+    )
+
+    fields = {
+        'date': date_key,
+        'category': category_key,
+        'content': content_key,
+        'title': title_key,
+        'link': link_key,
+    }
+    logger.info(f"データエンドポイントを検出しました: {response_url} ({matches}件一致)")
+
+    return {
+        'url': response_url,
+        'items_path': items_path,
+        'fields': {name: key for name, key in fields.items() if key},
+        'discovered_at': datetime.datetime.now().isoformat(timespec='seconds'),
+    }
+
+def extract_records(payload: Any, mapping: Dict[str, Any]) -> List[Dict[str, str]]:
+    """対応付けに従ってJSONからフィールドのテキストを取り出す"""
+    records = get_path(payload, mapping.get('items_path', []))
+    if not isinstance(records, list):
+        return []
+
+    fields = mapping.get('fields', {})
+    extracted = []
+    for record in records:
+        if not isinstance(record, dict):
+            continue
+        extracted.append({name: to_text(get_path(record, key)) for name, key in fields.items()})
+    return extracted
+
+def capture_json_responses(driver, events: List[Dict[str, Any]]) -> List[Tuple[str, Any]]:
+    """パフォーマンスログのイベントからJSONレスポンスの本文を取得する
+
+    再取得できるのはGETリクエストのみのため、それ以外は対象外とする。
+    """
+    import json
+
+    methods = {}
+    for event in events:
+        if event.get('method') == 'Network.requestWillBeSent':
+            params = event.get('params', {})
+            methods[params.get('requestId')] = params.get('request', {}).get('method', 'GET')
+
+    responses = []
+    for event in events:
+        if event.get('method') != 'Network.responseReceived':
+            continue
+        params = event.get('params', {})
+        response = params.get('response', {})
+        if 'json' not in response.get('mimeType', '') and params.get('type') not in ('XHR', 'Fetch'):
+            continue
+        if methods.get(params.get('requestId'), 'GET') != 'GET':
+            continue
+
+        try:
+            body = driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': params.get('requestId')})
+            payload = json.loads(body.get('body', ''))
+        except Exception:
+            continue
+        responses.append((response.get('url', ''), payload))
+
+    return responses
+
+def get_endpoint(url: str) -> Optional[Dict[str, Any]]:
+    """URLのエンドポイントの対応付けを返す（サイト設定が記録済みの値より優先される）"""
+    configured = get_site_config(url).get('endpoint')
+    if configured:
+        return configured
+    return state.get_entry(STATE_NAMESPACE, url)
+
+def save_endpoint(url: str, mapping: Optional[Dict[str, Any]]):
+    """検出したエンドポイントの対応付けを記録する。Noneの場合は記録を削除する"""
+    state.set_entry(STATE_NAMESPACE, url, mapping)
+
+def fetch_endpoint_records(mapping: Dict[str, Any], debug: bool = False) -> List[Dict[str, str]]:
+    """エンドポイントをHTTPで取得してフィールドのテキストを取り出す"""
+    response = fetch.get(mapping['url'], headers={'Accept': 'application/json'})
+    records = extract_records(response.json(), mapping)
+    if debug:
+        logger.debug(f"エンドポイントから{len(records)}件のレコードを取得しました: {mapping['url']}")
+    return records
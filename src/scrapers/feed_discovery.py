@@ -0,0 +1,279 @@
+# -*- coding: utf-8 -*-
+"""
+Autodiscovery of published feeds and structured data
+
+Many announcement pages already publish an RSS/Atom feed through
+<link rel="alternate"> or embed NewsArticle/ItemList JSON-LD. These are
+parsed directly into items instead of guessing the DOM structure. A
+discovered feed is only used when it describes the page: at least one item
+must link to an anchor on the page or to a path below the page's own path
+(a site-wide blog feed linked from a release-notes page is ignored). The
+source that worked is remembered per URL, so later runs of an RSS/Atom source fetch
+only the feed document and never the HTML page:
+
+    {'type': 'rss', 'url': 'https://example.com/feed.xml', 'discovered_at': '...'}
+    {'type': 'jsonld', 'url': 'https://example.com/news', 'discovered_at': '...'}
+"""
+
+import datetime
+import email.utils
+import json
+import logging
+import urllib.parse
+import xml.etree.ElementTree as ET
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from bs4 import BeautifulSoup
+
+from . import fetch
+from . import state
+from .guid import stable_guid
+
+# ロガーの設定
+logger = logging.getLogger(__name__)
+
+STATE_NAMESPACE = 'feed_sources'
+
+FEED_TYPES = {
+    'application/rss+xml': 'rss',
+    'application/atom+xml': 'atom',
+}
+
+# 一覧ページとみなすJSON-LDの記事数の下限（ページ自身を表す1件だけの記事は対象外）
+MIN_JSONLD_ITEMS = 2
+
+JSONLD_ARTICLE_TYPES = {'NewsArticle', 'Article', 'BlogPosting', 'Report', 'TechArticle'}
+
+ATOM_NS = '{http://www.w3.org/2005/Atom}'
+
+def get_feed_source(url: str) -> Optional[Dict[str, Any]]:
+    """URLで記録済みのフィードの取得元を返す"""
+    return state.get_entry(STATE_NAMESPACE, url)
+
+def save_feed_source(url: str, source: Optional[Dict[str, Any]]):
+    """フィードの取得元を記録する。Noneの場合は記録を削除する"""
+    state.set_entry(STATE_NAMESPACE, url, source)
+
+def discover_feed_links(soup: BeautifulSoup, base_url: str) -> List[Dict[str, str]]:
+    """<link rel="alternate">からRSS/Atomフィードを探す"""
+    links = []
+    for link in soup.find_all('link', href=True):
+        rel = link.get('rel') or []
+        if isinstance(rel, str):
+            rel = rel.split()
+        feed_type = FEED_TYPES.get((link.get('type') or '').split(';')[0].strip().lower())
+        if 'alternate' in [r.lower() for r in rel] and feed_type:
+            links.append({'type': feed_type, 'url': urllib.parse.urljoin(base_url, link['href'])})
+    return links
+
+def _normalize_link(link: str) -> str:
+    return urllib.parse.urldefrag(link)[0].rstrip('/')
+
+def feed_matches_page(items: List[Dict[str, Any]], soup: BeautifulSoup, url: str) -> bool:
+    """フィードのアイテムがページの内容と対応しているかを返す
+
+    いずれかのアイテムのリンクがページ内のリンクと一致するか、ページのパスより下にある場合に対応しているとみなす。
+    """
+    page = urllib.parse.urlparse(url)
+    page_link = _normalize_link(url)
+    page_prefix = page.path.rstrip('/') + '/'
+    anchors = {_normalize_link(urllib.parse.urljoin(url, a['href'])) for a in soup.find_all('a', href=True)}
+
+    for item in items:
+        link = _normalize_link(item.get('link') or '')
+        if not link or link == page_link:
+            continue
+        if link in anchors:
+            return True
+        parsed = urllib.parse.urlparse(link)
+        if parsed.netloc == page.netloc and parsed.path.startswith(page_prefix):
+            return True
+    return False
+
+def to_rfc822(value: Optional[str]) -> str:
+    """ISO 8601またはRFC 822の日付文字列をRSSのpubDate形式に変換する（解析できない場合は「不明」）"""
+    if not value:
+        return "不明"
+    value = value.strip()
+    try:
+        parsed = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        try:
+            parsed = datetime.datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return "不明"
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+    return parsed.strftime('%a, %d %b %Y %H:%M:%S %z')
+
+def html_to_text(value: Optional[str]) -> str:
+    """HTMLを含む可能性のある文字列をテキストにする"""
+    if not value:
+        return ''
+    if '<' in value and '>' in value:
+        return BeautifulSoup(value, 'html.parser').get_text(strip=True)
+    return value.strip()
+
+def build_item(title: str, description: str, link: str, pub_date: Optional[str],
+               categories: List[str], guid: Optional[str],
+               categorize: Callable[[str], List[str]]) -> Dict[str, Any]:
+    """フィードやJSON-LDの値からアイテムを作成する"""
+    title = html_to_text(title) or description[:100]
+    return {
+        'title': title,
+        'description': description,
+        'link': link,
+        'pubDate': to_rfc822(pub_date),
+        'categories': categories or categorize(f"{title} {description}"),
+        'guid': guid or stable_guid(link, title),
+    }
+
+def parse_feed(text: str, base_url: str, categorize: Callable[[str], List[str]]) -> List[Dict[str, Any]]:
+    """RSS 2.0またはAtomフィードをアイテムに変換する"""
+    root = ET.fromstring(text.encode('utf-8') if isinstance(text, str) else text)
+    items = []
+
+    if root.tag == f'{ATOM_NS}feed':
+        for entry in root.findall(f'{ATOM_NS}entry'):
+            link = base_url
+            for link_element in entry.findall(f'{ATOM_NS}link'):
+                if link_element.get('rel', 'alternate') == 'alternate' and link_element.get('href'):
+                    link = urllib.parse.urljoin(base_url, link_element.get('href'))
+                    break
+            description = html_to_text(entry.findtext(f'{ATOM_NS}summary') or entry.findtext(f'{ATOM_NS}content'))
+            categories = [c.get('term') for c in entry.findall(f'{ATOM_NS}category') if c.get('term')]
+            items.append(build_item(
+                entry.findtext(f'{ATOM_NS}title') or '', description, link,
+                entry.findtext(f'{ATOM_NS}published') or entry.findtext(f'{ATOM_NS}updated'),
+                categories, entry.findtext(f'{ATOM_NS}id'), categorize
+            ))
+        return items
+
+    for element in root.iter('item'):
+        link = urllib.parse.urljoin(base_url, (element.findtext('link') or '').strip()) or base_url
+        description = html_to_text(element.findtext('description'))
+        categories = [c.text.strip() for c in element.findall('category') if c.text and c.text.strip()]
+        items.append(build_item(
+            element.findtext('title') or '', description, link, element.findtext('pubDate'),
+            categories, (element.findtext('guid') or '').strip() or None, categorize
+        ))
+    return items
+
+def _iter_jsonld_nodes(data: Any) -> Iterator[Dict[str, Any]]:
+    """JSON-LDのノード（@graphやリストを展開したもの）を列挙する"""
+    if isinstance(data, list):
+        for element in data:
+            yield from _iter_jsonld_nodes(element)
+    elif isinstance(data, dict):
+        if '@graph' in data:
+            yield from _iter_jsonld_nodes(data['@graph'])
+        else:
+            yield data
+
+def _jsonld_types(node: Dict[str, Any]) -> set:
+    node_type = node.get('@type', [])
+    return set(node_type if isinstance(node_type, list) else [node_type])
+
+def parse_jsonld(soup: BeautifulSoup, base_url: str, categorize: Callable[[str], List[str]]) -> List[Dict[str, Any]]:
+    """埋め込まれたNewsArticle/ItemListのJSON-LDをアイテムに変換する"""
+    items = []
+    for script in soup.find_all('script', type='application/ld+json'):
+        try:
+            data = json.loads(script.string or '')
+        except ValueError:
+            continue
+
+        for node in _iter_jsonld_nodes(data):
+            articles = []
+            if _jsonld_types(node) & JSONLD_ARTICLE_TYPES:
+                articles.append(node)
+            elif 'ItemList' in _jsonld_types(node):
+                for element in node.get('itemListElement', []):
+                    if isinstance(element, dict):
+                        articles.append(element.get('item') if isinstance(element.get('item'), dict) else element)
+
+            for article in articles:
+                link = article.get('url') or article.get('@id') or base_url
+                title = article.get('headline') or article.get('name') or ''
+                description = html_to_text(article.get('description') or article.get('articleBody') or title)
+                section = article.get('articleSection') or []
+                categories = section if isinstance(section, list) else [section]
+                items.append(build_item(
+                    title, description, urllib.parse.urljoin(base_url, link),
+                    article.get('datePublished') or article.get('dateModified'),
+                    [c for c in categories if c], None, categorize
+                ))
+    return items
+
+def fetch_feed(feed_url: str, categorize: Callable[[str], List[str]],
+               headers: Optional[Dict[str, str]] = None) -> List[Dict[str, Any]]:
+    """RSS/Atomフィードを取得してアイテムに変換する"""
+    response = fetch.get(feed_url, headers=headers)
+    return parse_feed(response.content, feed_url, categorize)
+
+def scrape_recorded_source(url: str, categorize: Callable[[str], List[str]],
+                           headers: Optional[Dict[str, str]] = None,
+                           debug: bool = False) -> Optional[List[Dict[str, Any]]]:
+    """記録済みのRSS/Atomフィードからアイテムを取得する
+
+    Returns:
+        アイテムのリスト。記録がない場合、JSON-LDの場合、取得に失敗した場合はNone
+    """
+    source = get_feed_source(url)
+    if not source or source.get('type') not in ('rss', 'atom'):
+        return None
+
+    try:
+        items = fetch_feed(source['url'], categorize, headers)
+    except Exception as e:
+        logger.warning(f"記録済みのフィードの取得に失敗しました: {source['url']}: {e}")
+        items = []
+
+    if not items:
+        save_feed_source(url, None)
+        return None
+
+    if debug:
+        logger.debug(f"記録済みのフィードから{len(items)}件のアイテムを取得しました: {source['url']}")
+    return items
+
+def scrape_discovered_sources(url: str, soup: BeautifulSoup, categorize: Callable[[str], List[str]],
+                              headers: Optional[Dict[str, str]] = None,
+                              debug: bool = False) -> Optional[List[Dict[str, Any]]]:
+    """ページが公開しているフィードやJSON-LDからアイテムを取得し、使用した取得元を記録する
+
+    Returns:
+        アイテムのリスト。利用できる取得元がない場合はNone
+    """
+    discovered_at = datetime.datetime.now().isoformat(timespec='seconds')
+
+    # JSON-LDが記録済みの場合、以前に使えなかったフィードは試さない
+    recorded = get_feed_source(url)
+    feed_links = [] if recorded and recorded.get('type') == 'jsonld' else discover_feed_links(soup, url)
+
+    for link in feed_links:
+        try:
+            items = fetch_feed(link['url'], categorize, headers)
+        except Exception as e:
+            if debug:
+                logger.debug(f"フィードの取得に失敗しました: {link['url']}: {e}")
+            continue
+        if items and not feed_matches_page(items, soup, url):
+            # サイト全体のブログなど、ページとは別の内容のフィードは使用しない
+            logger.info(f"ページの内容と対応しないため、フィードを使用しません: {link['url']}")
+            continue
+        if items:
+            save_feed_source(url, dict(link, discovered_at=discovered_at))
+            logger.info(f"公開されているフィードを使用します: {link['url']}（{len(items)}件）")
+            return items
+
+    items = parse_jsonld(soup, url, categorize)
+    if len(items) >= MIN_JSONLD_ITEMS:
+        if not recorded or recorded.get('type') != 'jsonld':
+            save_feed_source(url, {'type': 'jsonld', 'url': url, 'discovered_at': discovered_at})
+        logger.info(f"埋め込まれたJSON-LDを使用します（{len(items)}件）")
+        return items
+
+    if recorded:
+        save_feed_source(url, None)
+    return None
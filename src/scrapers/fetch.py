@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+"""
+Shared HTTP fetch layer for scrapers
+
+Requests are limited per host (concurrency and request rate), retried with
+jittered exponential backoff on connection errors, 429 and 5xx (honouring
+Retry-After), and guarded by a per-host circuit breaker: after repeated
+failures a host is skipped immediately until a cool-down has passed, so one
+failing origin does not hold up the rest of the run.
+
+The defaults can be overridden per site with 'fetch_policy' in SITE_CONFIGS:
+
+    'fetch_policy': {
+        'max_concurrency': 2,
+        'requests_per_second': 1.0,
+        'max_retries': 3,
+    }
+"""
+
+import email.utils
+import logging
+import random
+import threading
+import time
+import urllib.parse
+from typing import Any, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from . import cassette
+from . import deadline
+from . import report
+from .config import get_site_config
+
+# ロガーの設定
+logger = logging.getLogger(__name__)
+
+DEFAULT_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36'
+
+DEFAULT_FETCH_POLICY = {
+    'max_concurrency': 4,          # ホストごとの同時リクエスト数の上限
+    'requests_per_second': None,   # ホストごとのリクエスト頻度の上限（Noneの場合は制限しない）
+    'timeout': 30.0,               # 1回のリクエストのタイムアウト（秒、期限がある場合は残り時間に収める）
+    'max_retries': 3,              # 再試行の回数
+    'backoff_base': 0.5,           # 再試行の待機時間の基準値（秒）
+    'backoff_max': 30.0,           # 再試行の待機時間の上限（秒）
+    'failure_threshold': 5,        # サーキットブレーカーを開く連続失敗回数
+    'cooldown': 60.0,              # サーキットブレーカーを開いておく時間（秒）
+}
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+class CircuitOpenError(requests.RequestException):
+    """失敗が続いているホストへのリクエストを省略した場合の例外"""
+
+class HostState:
+    """ホストごとの同時実行数・リクエスト頻度・サーキットブレーカーの状態"""
+
+    def __init__(self, max_concurrency: int):
+        self.semaphore = threading.BoundedSemaphore(max(1, max_concurrency))
+        self.lock = threading.Lock()
+        self.next_request_at = 0.0
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_in_progress = False
+
+# ホストごとの状態
+_hosts: Dict[str, HostState] = {}
+_hosts_lock = threading.Lock()
+
+# テストで置き換えられるように、待機と時刻の取得は関数を経由する
+_sleep = time.sleep
+_clock = time.monotonic
+
+def get_fetch_policy(url: str) -> Dict[str, Any]:
+    """URLのサイト設定を反映した取得ポリシーを返す"""
+    return {**DEFAULT_FETCH_POLICY, **get_site_config(url).get('fetch_policy', {})}
+
+def _get_host_state(host: str, policy: Dict[str, Any]) -> HostState:
+    with _hosts_lock:
+        host_state = _hosts.get(host)
+        if host_state is None:
+            host_state = HostState(policy['max_concurrency'])
+            _hosts[host] = host_state
+        return host_state
+
+def reset_host_states():
+    """ホストごとの状態を初期化する"""
+    with _hosts_lock:
+        _hosts.clear()
+
+def _check_circuit(host: str, host_state: HostState, policy: Dict[str, Any]):
+    """サーキットブレーカーが開いている場合は例外を送出する（待機時間経過後は1件だけ試行を許可する）"""
+    with host_state.lock:
+        if host_state.opened_at is None:
+            return
+        if _clock() - host_state.opened_at < policy['cooldown'] or host_state.trial_in_progress:
+            raise CircuitOpenError(f"失敗が続いているため {host} へのリクエストを省略しました")
+        host_state.trial_in_progress = True
+
+def _record_result(host: str, host_state: HostState, policy: Dict[str, Any], success: bool):
+    with host_state.lock:
+        host_state.trial_in_progress = False
+        if success:
+            host_state.consecutive_failures = 0
+            host_state.opened_at = None
+            return
+        host_state.consecutive_failures += 1
+        if host_state.consecutive_failures >= policy['failure_threshold']:
+            if host_state.opened_at is None:
+                logger.warning(f"{host} への失敗が{host_state.consecutive_failures}回続いたため、"
+                               f"{policy['cooldown']:.0f}秒間リクエストを停止します。")
+            host_state.opened_at = _clock()
+
+def _release_trial(host_state: HostState):
+    """結果を記録せずに半開状態の試行を解除する"""
+    with host_state.lock:
+        host_state.trial_in_progress = False
+
+def _wait_for_rate_limit(host_state: HostState, policy: Dict[str, Any]):
+    """リクエスト頻度の上限を超えないように待機する
+
+    Raises:
+        deadline.DeadlineExceeded: 待機すると期限を過ぎる場合（リクエストの枠は確保しない）
+    """
+    rate = policy.get('requests_per_second')
+    if not rate:
+        return
+    with host_state.lock:
+        now = _clock()
+        wait = max(0.0, host_state.next_request_at - now)
+        if wait > 0 and not deadline.has_time_for(wait):
+            raise deadline.DeadlineExceeded(f"リクエスト頻度の上限による待機（{wait:.1f}秒）が期限に間に合いません")
+        host_state.next_request_at = max(now, host_state.next_request_at) + 1.0 / rate
+    if wait > 0:
+        _sleep(wait)
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-Afterヘッダー（秒数またはHTTP日付）を待機秒数に変換する"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+def get_backoff(attempt: int, policy: Dict[str, Any], retry_after: Optional[float] = None) -> float:
+    """再試行までの待機時間を返す（Retry-Afterがあればそれに従い、なければ揺らぎを加えた指数バックオフ）"""
+    if retry_after is not None:
+        return min(retry_after, policy['backoff_max'])
+    return random.uniform(0, min(policy['backoff_max'], policy['backoff_base'] * (2 ** attempt)))
+
+# プロセス内で共有するHTTPセッション（コネクションプールを再利用する）
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+def get_session() -> requests.Session:
+    """共有のrequests.Sessionを返す
+
+    Keep-Aliveの接続をプロセス内（Lambdaのウォームコンテナを含む）で再利用する。
+    """
+    global _session
+
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=10, pool_maxsize=10)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            session.headers['User-Agent'] = DEFAULT_USER_AGENT
+            _session = session
+
+    return _session
+
+def close_session():
+    """共有のHTTPセッションを閉じる"""
+    global _session
+
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+
+def get(url: str, headers: Optional[Dict[str, str]] = None, **kwargs) -> requests.Response:
+    """共有セッションでGETリクエストを送信する
+
+    Args:
+        url: 取得対象のURL
+        headers: 追加のリクエストヘッダー
+        **kwargs: requests.Session.getに渡す追加の引数
+
+    Returns:
+        レスポンス（ステータスコードがエラーの場合は例外を送出）
+    """
+    # 再生モード: 記録したレスポンスを返す（ネットワークには接続しない）
+    if cassette.is_replaying():
+        response = cassette.replay_response(url)
+        response.raise_for_status()
+        return response
+
+    host = urllib.parse.urlparse(url).netloc
+    policy = get_fetch_policy(url)
+    host_state = _get_host_state(host, policy)
+
+    timeout = kwargs.pop('timeout', policy['timeout'])
+
+    attempt = 0
+    while True:
+        deadline.check(url)
+        _check_circuit(host, host_state, policy)
+
+        retry_after = None
+        try:
+            with host_state.semaphore:
+                _wait_for_rate_limit(host_state, policy)
+                request_timeout = deadline.clamp(timeout)
+                if request_timeout is not None and request_timeout <= 0:
+                    raise deadline.DeadlineExceeded(f"期限を過ぎたため処理を中止しました: {url}")
+                try:
+                    response = get_session().get(url, headers=headers, timeout=request_timeout, **kwargs)
+                except requests.RequestException as e:
+                    # 接続エラー・タイムアウト以外（ChunkedEncodingErrorなど）も失敗として数える
+                    error = e
+                    response = None
+                else:
+                    error = None
+        except BaseException:
+            # 期限切れや想定外の例外でも、半開状態の試行を解除してホストが閉じたままにならないようにする
+            _release_trial(host_state)
+            raise
+
+        if response is not None and response.status_code not in RETRY_STATUS_CODES:
+            # 4xx（429を除く）はホストの障害ではないため、サーキットブレーカーの失敗には数えない
+            _record_result(host, host_state, policy, success=True)
+            if cassette.is_recording():
+                cassette.record_response(url, response)
+            response.raise_for_status()
+            return response
+
+        _record_result(host, host_state, policy, success=False)
+        if response is not None:
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+
+        if attempt >= policy['max_retries'] or host_state.opened_at is not None:
+            if response is not None:
+                response.raise_for_status()
+            raise error
+
+        delay = get_backoff(attempt, policy, retry_after)
+        if not deadline.has_time_for(delay):
+            # 期限内に再試行できない場合は最後の結果で終了する
+            if response is not None:
+                response.raise_for_status()
+            raise error
+
+        reason = f"ステータスコード {response.status_code}" if response is not None else str(error)
+        logger.info(f"{url} の取得に失敗したため、{delay:.1f}秒後に再試行します（{attempt + 1}/{policy['max_retries']}）: {reason}")
+        report.get_report().add(url, 'fetch_retries')
+        _sleep(delay)
+        attempt += 1
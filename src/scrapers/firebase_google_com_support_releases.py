@@ -2,16 +2,27 @@
 
 import re
 import datetime
-import requests
 from bs4 import BeautifulSoup
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import logging
+from functools import lru_cache
+
+from . import fetch
+from .guid import stable_guid
 
 # ロガーの設定
 logger = logging.getLogger(__name__)
 
 def extract_date(date_str: str) -> datetime.datetime:
     """日付文字列をパースしてdatetimeオブジェクトに変換する"""
+    parsed = _extract_date_cached(date_str)
+    
+    # パターンにマッチしない場合は現在の日時を返す
+    return parsed if parsed is not None else datetime.datetime.now()
+
+@lru_cache(maxsize=4096)
+def _extract_date_cached(date_str: str) -> Optional[datetime.datetime]:
+    """日付文字列をパースする（プロセス内でキャッシュする）"""
     # 日付フォーマットの例: "April 2, 2025" や "Apr 2, 2025"
     months = {
         'January': 1, 'Jan': 1,
@@ -43,8 +54,7 @@ def extract_date(date_str: str) -> datetime.datetime:
         dt = datetime.datetime(int(year), month, int(day))
         return dt
     
-    # パターンにマッチしない場合は現在の日時を返す
-    return datetime.datetime.now()
+    return None
 
 def extract_category_from_class(class_name: str) -> str:
     """release-* 形式のクラス名からカテゴリ名を抽出する"""
@@ -55,6 +65,11 @@ def extract_category_from_class(class_name: str) -> str:
 
 def detect_categories(title: str, description: str, class_names: List[str] = None) -> List[str]:
     """タイトル、説明文、クラス名からカテゴリを検出する"""
+    return list(_detect_categories_cached(title, description, tuple(class_names or ())))
+
+@lru_cache(maxsize=4096)
+def _detect_categories_cached(title: str, description: str, class_names: tuple) -> tuple:
+    """カテゴリを検出する（プロセス内でキャッシュする）"""
     categories = []
     
     # クラス名からカテゴリを抽出
@@ -106,7 +121,7 @@ def detect_categories(title: str, description: str, class_names: List[str] = Non
     if not categories:
         categories.append('other')
     
-    return list(set(categories))  # 重複を削除
+    return tuple(sorted(set(categories)))  # 重複を削除（プロセスによらず同じ順序にする）
 
 def scrape(url: str, debug: bool = False, silent: bool = False) -> List[Dict[str, Any]]:
     """Firebaseのリリースページからリリースノートをスクレイピングする"""
@@ -118,8 +133,7 @@ def scrape(url: str, debug: bool = False, silent: bool = False) -> List[Dict[str
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
+        response = fetch.get(url, headers=headers)
         if debug:
             logger.debug(f"ページの取得に成功しました。ステータスコード: {response.status_code}")
     except Exception as e:
@@ -205,6 +219,7 @@ def scrape(url: str, debug: bool = False, silent: bool = False) -> List[Dict[str
                             'link': f"{url}#{header_id}",
                             'pubDate': formatted_pub_date,
                             'categories': categories,
+                            'product': current_product,
                             'guid': f"{url}#{header_id}-{title}"
                         }
                         
@@ -267,7 +282,7 @@ def scrape(url: str, debug: bool = False, silent: bool = False) -> List[Dict[str
                     'link': url,
                     'pubDate': formatted_pub_date,
                     'categories': categories,
-                    'guid': f"{url}#{content[:50]}"
+                    'guid': stable_guid(url, content)
                 }
                 
                 items.append(item)
@@ -2,15 +2,24 @@
 
 import re
 import datetime
-import requests
 from bs4 import BeautifulSoup
-from typing import List, Dict, Any
+from bs4.element import CData, NavigableString, Tag
+from typing import List, Dict, Any, Optional
 import urllib.parse
 import logging
+from functools import lru_cache
+
+from . import feed_discovery
+from . import fetch
+from . import pagination
+from . import template
+from .config import get_site_config
+from .guid import stable_guid
 
 # ロガーの設定
 logger = logging.getLogger(__name__)
 
+@lru_cache(maxsize=4096)
 def extract_date(text: str) -> str:
     """テキストから日付パターンを抽出する"""
     # 様々な日付パターンを検出する正規表現
@@ -30,6 +39,11 @@ def extract_date(text: str) -> str:
 
 def detect_categories(text: str) -> List[str]:
     """テキスト内の特定のキーワードからカテゴリを検出する"""
+    return list(_detect_categories_cached(text))
+
+@lru_cache(maxsize=4096)
+def _detect_categories_cached(text: str) -> tuple:
+    """カテゴリを検出する（プロセス内でキャッシュする）"""
     categories = []
     
     # 特定のキーワードに基づいてカテゴリを検出
@@ -69,62 +83,91 @@ def detect_categories(text: str) -> List[str]:
     if not categories:
         categories.append('Other')
     
-    return list(set(categories))  # 重複を削除
+    return tuple(sorted(set(categories)))  # 重複を削除（プロセスによらず同じ順序にする）
 
-def scrape(url: str, debug: bool = False, silent: bool = False) -> List[Dict[str, Any]]:
-    """汎用的なスクレイピング関数"""
-    if not silent:
-        logger.info(f"汎用スクレイパーを使用して {url} をスクレイピングします。")
-    
-    # URLからHTMLを取得
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
-    
-    try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        if debug:
-            logger.debug(f"ページの取得に成功しました。ステータスコード: {response.status_code}")
-    except Exception as e:
-        logger.error(f"ページの取得中にエラーが発生しました: {e}")
-        raise
-    
-    # HTMLをパース
-    soup = BeautifulSoup(response.text, 'html.parser')
+TITLE_TAGS = {'h1', 'h2', 'h3', 'h4'}
+
+def dedupe_nested(elements: List[Tag]) -> List[Tag]:
+    """入れ子になった一致要素を、1つの項目につき1つの要素にまとめる
+
+    一致要素を含まない一致要素（最も内側の要素）を項目の単位として、部分木全体で判断する。
+    - 最も内側の要素を2つ以上含む要素は一覧のコンテナとみなして除外する（外枠→一覧→項目の入れ子も同様）
+    - 最も内側の要素を1つだけ含む要素は項目の外枠とみなし、最も外側の外枠だけを残す
+    """
+    matched = {id(element) for element in elements}
     
-    # お知らせの項目を格納するリスト
-    items = []
+    # 各要素の一致要素の祖先（近い順）を求める
+    matched_ancestors: Dict[int, List[int]] = {}
+    has_matched_descendant = set()
+    for element in elements:
+        ancestor_ids = [id(parent) for parent in element.parents if id(parent) in matched]
+        matched_ancestors[id(element)] = ancestor_ids
+        has_matched_descendant.update(ancestor_ids)
     
-    # 一般的なお知らせセクションのパターン
-    # 1. ニュース/お知らせリスト
-    news_elements = soup.select('article, .news-item, .notice, .announcement, .post, .entry, div[class*="news"], div[class*="notice"], div[class*="announcement"]')
+    # 各要素の部分木に含まれる最も内側の要素の数を数える
+    leaf_counts: Dict[int, int] = {}
+    for element in elements:
+        if id(element) in has_matched_descendant:
+            continue
+        for element_id in [id(element)] + matched_ancestors[id(element)]:
+            leaf_counts[element_id] = leaf_counts.get(element_id, 0) + 1
     
-    if debug:
-        logger.debug(f"ニュース要素を {len(news_elements)} 個検出しました。")
+    result = []
+    for element in elements:
+        if leaf_counts[id(element)] >= 2:
+            continue
+        # 最も近い一致要素の祖先が項目の外枠であれば、その外枠に含める（祖先ほど数は多いため最も近い祖先で判断できる）
+        ancestor_ids = matched_ancestors[id(element)]
+        if ancestor_ids and leaf_counts[ancestor_ids[0]] == 1:
+            continue
+        result.append(element)
+    return result
+
+def _is_title_element(tag: Tag) -> bool:
+    return tag.name in TITLE_TAGS or 'title' in ' '.join(tag.get('class', []))
+
+def _is_date_element(tag: Tag) -> bool:
+    if tag.name == 'time':
+        return True
+    class_text = ' '.join(tag.get('class', []))
+    return 'date' in class_text or 'time' in class_text
+
+def extract_fields(element: Tag) -> Dict[str, Any]:
+    """要素の子孫を1回だけ走査して、タイトル要素・日付要素・リンク要素・本文を取得する
+
+    以下のセレクタの最初の一致と、get_text(strip=True)と同じ本文を返す。
+    - タイトル: 'h1, h2, h3, h4, .title, [class*="title"]'
+    - 日付: 'time, .date, [class*="date"], .time, [class*="time"]'
+    - リンク: 'a'
+    """
+    title_element = None
+    date_element = None
+    link_element = None
+    texts = []
     
-    # 2. 日付とタイトルのペアを含む要素
-    if not news_elements:
-        news_elements = soup.select('ul li, div.row, div.list-item')
-        if debug:
-            logger.debug(f"リスト要素を {len(news_elements)} 個検出しました。")
+    for node in element.descendants:
+        if isinstance(node, Tag):
+            if title_element is None and _is_title_element(node):
+                title_element = node
+            if date_element is None and _is_date_element(node):
+                date_element = node
+            if link_element is None and node.name == 'a':
+                link_element = node
+        elif type(node) in (NavigableString, CData):
+            text = node.strip()
+            if text:
+                texts.append(text)
     
-    # 3. 要素が見つからない場合は、テキスト内容で判断
-    if not news_elements:
-        # すべての段落要素を取得
-        paragraphs = soup.select('p')
-        
-        temp_elements = []
-        for p in paragraphs:
-            text = p.get_text(strip=True)
-            
-            # 日付パターンを含み、最低限の長さがある段落を取得
-            if extract_date(text) != "不明" and len(text) > 50:
-                temp_elements.append(p)
-        
-        news_elements = temp_elements
-        if debug:
-            logger.debug(f"日付を含む段落要素を {len(news_elements)} 個検出しました。")
+    return {
+        'title_element': title_element,
+        'date_element': date_element,
+        'link_element': link_element,
+        'content': ''.join(texts),
+    }
+
+def build_items(news_elements: List[Tag], url: str, debug: bool = False) -> List[Dict[str, Any]]:
+    """お知らせの要素からアイテムを作成する"""
+    items = []
     
     # ベースURLの取得
     parsed_url = urllib.parse.urlparse(url)
@@ -132,19 +175,21 @@ def scrape(url: str, debug: bool = False, silent: bool = False) -> List[Dict[str
     
     # 検出された要素からお知らせ情報を抽出
     for element in news_elements:
-        # タイトル取得
-        title_element = element.select_one('h1, h2, h3, h4, .title, [class*="title"]')
-        title = title_element.get_text(strip=True) if title_element else element.get_text(strip=True)[:100]
+        fields = extract_fields(element)
         
         # 内容取得
-        content = element.get_text(strip=True)
+        content = fields['content']
+        
+        # タイトル取得
+        title_element = fields['title_element']
+        title = title_element.get_text(strip=True) if title_element else content[:100]
         
         # 日付取得
-        date_element = element.select_one('time, .date, [class*="date"], .time, [class*="time"]')
+        date_element = fields['date_element']
         date_str = date_element.get_text(strip=True) if date_element else extract_date(content)
         
         # リンク取得
-        link_element = element.select_one('a')
+        link_element = fields['link_element']
         link = urllib.parse.urljoin(base_url, link_element['href']) if link_element and 'href' in link_element.attrs else url
         
         # カテゴリを検出
@@ -157,13 +202,112 @@ def scrape(url: str, debug: bool = False, silent: bool = False) -> List[Dict[str
             'link': link,
             'pubDate': date_str,
             'categories': categories,
-            'guid': f"{link}#{title}"
+            'guid': stable_guid(link, title)
         }
         
         items.append(item)
         if debug:
             logger.debug(f"アイテムを追加しました: {title} (日付: {date_str}, カテゴリ: {', '.join(categories)})")
     
+    return items
+
+def extract_items(url: str, soup: BeautifulSoup, debug: bool = False) -> List[Dict[str, Any]]:
+    """1ページ分のHTMLからお知らせのアイテムを抽出する"""
+    # 0. サイトごとに学習したテンプレート（なければ日付とリンクを含む繰り返しブロックから学習する）
+    news_elements = template.select_with_template(
+        url, soup, lambda text: extract_date(text) != "不明",
+        has_title=lambda element: extract_fields(element)['title_element'] is not None, debug=debug
+    )
+    if news_elements:
+        return build_items(news_elements, url, debug)
+    
+    # 一般的なお知らせセクションのパターン
+    # 1. ニュース/お知らせリスト
+    news_elements = soup.select('article, .news-item, .notice, .announcement, .post, .entry, div[class*="news"], div[class*="notice"], div[class*="announcement"]')
+    matched_count = len(news_elements)
+    news_elements = dedupe_nested(news_elements)
+    
+    if debug:
+        logger.debug(f"ニュース要素を {len(news_elements)} 個検出しました（入れ子の重複を除外する前: {matched_count} 個）。")
+    
+    # 2. 日付とタイトルのペアを含む要素
+    if not news_elements:
+        news_elements = dedupe_nested(soup.select('ul li, div.row, div.list-item'))
+        if debug:
+            logger.debug(f"リスト要素を {len(news_elements)} 個検出しました。")
+    
+    # 3. 要素が見つからない場合は、テキスト内容で判断
+    if not news_elements:
+        # すべての段落要素を取得
+        paragraphs = soup.select('p')
+        
+        temp_elements = []
+        for p in paragraphs:
+            text = p.get_text(strip=True)
+            
+            # 日付パターンを含み、最低限の長さがある段落を取得
+            if extract_date(text) != "不明" and len(text) > 50:
+                temp_elements.append(p)
+        
+        news_elements = temp_elements
+        if debug:
+            logger.debug(f"日付を含む段落要素を {len(news_elements)} 個検出しました。")
+    
+    return build_items(news_elements, url, debug)
+
+def scrape(url: str, debug: bool = False, silent: bool = False,
+           max_pages: Optional[int] = None, since: Optional[str] = None) -> List[Dict[str, Any]]:
+    """汎用的なスクレイピング関数
+
+    Args:
+        max_pages: 取得するページ数の上限（省略時はサイト設定の値）
+        since: この日付（YYYY-MM-DD）より古いページに達した時点でページ送りを終了する
+    """
+    if not silent:
+        logger.info(f"汎用スクレイパーを使用して {url} をスクレイピングします。")
+    
+    # URLからHTMLを取得
+    headers = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+    }
+    
+    # 記録済みのRSS/Atomフィードがある場合は、HTMLを取得せずにフィードだけを取得する
+    items = feed_discovery.scrape_recorded_source(url, detect_categories, headers, debug)
+    if items:
+        if not silent:
+            logger.info(f"合計 {len(items)} 個のアイテムを取得しました。")
+        return items
+    
+    try:
+        response = fetch.get(url, headers=headers)
+        if debug:
+            logger.debug(f"ページの取得に成功しました。ステータスコード: {response.status_code}")
+    except Exception as e:
+        logger.error(f"ページの取得中にエラーが発生しました: {e}")
+        raise
+    
+    # HTMLをパース
+    soup = BeautifulSoup(response.text, 'html.parser')
+    
+    # ページが公開しているRSS/AtomフィードやJSON-LDがあれば、HTMLの構造を推定せずに使用する
+    discovered_items = feed_discovery.scrape_discovered_sources(url, soup, detect_categories, headers, debug)
+    if discovered_items:
+        if not silent:
+            logger.info(f"合計 {len(discovered_items)} 個のアイテムを取得しました。")
+        return discovered_items
+    
+    # 1ページ目から順にお知らせを抽出する（ページ送りの設定がある場合は次のページも取得する）
+    items = pagination.crawl(
+        url,
+        soup,
+        lambda page_url, page_soup: extract_items(page_url, page_soup, debug),
+        lambda page_url: fetch.get(page_url, headers=headers).text,
+        rules=get_site_config(url).get('pagination'),
+        max_pages=max_pages,
+        since=since,
+        debug=debug
+    )
+    
     if not silent:
         logger.info(f"合計 {len(items)} 個のアイテムを取得しました。")
     
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""
+Deterministic GUIDs and process-independent content hashes for feed items
+"""
+
+import hashlib
+import re
+import unicodedata
+from typing import Any, Dict
+
+def normalize_guid_part(value) -> str:
+    """GUIDの計算用に表記ゆれ（Unicode正規化・空白）を揃える"""
+    text = unicodedata.normalize('NFKC', str(value or ''))
+    return re.sub(r'\s+', ' ', text).strip()
+
+def stable_guid(link: str, *parts) -> str:
+    """リンクと内容から、プロセスに依存しない安定したGUIDを作成する
+
+    Pythonのhash()は実行ごとにランダム化されるため使用せず、BLAKE2のダイジェストを使う。
+
+    Args:
+        link: アイテムのリンク（GUIDの接頭辞になる）
+        *parts: アイテムを識別する値（日付、タイトル、本文など）
+
+    Returns:
+        "{link}#{ダイジェスト}" 形式のGUID
+    """
+    digest = hashlib.blake2b(digest_size=12)
+    for part in (link,) + parts:
+        digest.update(normalize_guid_part(part).encode('utf-8'))
+        # 区切り文字を挟んで ("ab", "c") と ("a", "bc") を区別する
+        digest.update(b'\x1f')
+    return f"{link}#{digest.hexdigest()}"
+
+def normalize_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    """出力の変更検知用に、順序が意味を持たない値（カテゴリ）を並べ替えたアイテムを返す
+
+    set由来のカテゴリの順序はプロセスごとのハッシュシードで変わるため、そのままハッシュ値を計算すると
+    内容が同じでも実行ごとに異なる値になる。
+    """
+    categories = item.get('categories')
+    if isinstance(categories, (list, tuple, set, frozenset)):
+        return dict(item, categories=sorted(str(category) for category in categories))
+    return item
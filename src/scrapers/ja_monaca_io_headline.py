@@ -1,20 +1,41 @@
 # -*- coding: utf-8 -*-
 
 import datetime
-import requests
+import json
 from bs4 import BeautifulSoup
 from typing import List, Dict, Any, Optional
 import re
 import urllib.parse
 import logging
-from tempfile import mkdtemp
-import time
+from functools import lru_cache
+
+from . import browser
+from . import deadline
+from . import endpoint
+from . import fetch
+from .guid import stable_guid
+from . import probe
+from . import report
 
 # ロガーの設定
 logger = logging.getLogger(__name__)
 
+# ブラウザでの取得を始めるために必要な残り時間（秒）。これより少ない場合は省略する
+MIN_SELENIUM_BUDGET = 8.0
+
+# お知らせ一覧のコンテナ（JavaScriptで中身が描画される）
+DEFAULT_CONTAINER_SELECTOR = '.headline-entries'
+
 def parse_date(date_text: str) -> datetime.datetime:
     """日付テキストを解析してdatetimeオブジェクトに変換する"""
+    parsed = _parse_date_cached(date_text)
+    
+    # パターンが見つからない場合は現在の日時を返す
+    return parsed if parsed is not None else datetime.datetime.now()
+
+@lru_cache(maxsize=4096)
+def _parse_date_cached(date_text: str) -> Optional[datetime.datetime]:
+    """日付テキストを解析する（プロセス内でキャッシュする）"""
     # ISO 8601形式 (例: "2025-10-15" or "2025-10-15T12:00:00")
     iso_pattern = r'(\d{4})-(\d{1,2})-(\d{1,2})'
     iso_match = re.search(iso_pattern, date_text)
@@ -39,11 +60,15 @@ def parse_date(date_text: str) -> datetime.datetime:
         year, month, day = num_match.groups()
         return datetime.datetime(int(year), int(month), int(day))
     
-    # その他のパターンが見つからない場合は現在の日時を返す
-    return datetime.datetime.now()
+    return None
 
 def detect_categories(text: str) -> List[str]:
     """テキスト内の特定のキーワードからカテゴリを検出する"""
+    return list(_detect_categories_cached(text))
+
+@lru_cache(maxsize=4096)
+def _detect_categories_cached(text: str) -> tuple:
+    """カテゴリを検出する（プロセス内でキャッシュする）"""
     categories = []
     
     # 日本語のキーワードとカテゴリのマッピング
@@ -83,7 +108,7 @@ def detect_categories(text: str) -> List[str]:
     if not categories:
         categories.append('Other')
     
-    return list(set(categories))  # 重複を削除
+    return tuple(sorted(set(categories)))  # 重複を削除（プロセスによらず同じ順序にする）
 
 def scrape_with_selenium(
     url: str,
@@ -91,7 +116,11 @@ def scrape_with_selenium(
     post_load_wait: int = 8,
     use_lambda_optimization: bool = False,
     debug: bool = False,
-    debug_selenium: bool = False
+    debug_selenium: bool = False,
+    resource_blocking: Optional[Dict[str, Any]] = None,
+    captured_responses: Optional[list] = None,
+    extract: Optional[Dict[str, Any]] = None,
+    selector_patterns: Optional[List[Dict[str, Optional[str]]]] = None
 ) -> Optional[str]:
     """Seleniumを使用してページをスクレイピングする
     
@@ -102,164 +131,52 @@ def scrape_with_selenium(
         use_lambda_optimization: Lambda最適化を使用するか
         debug: デバッグモード
         debug_selenium: Seleniumの詳細ログを出力するか
+        resource_blocking: DevTools経由でブロックするリクエストの設定（サイト設定のresource_blocking）
+        captured_responses: 指定した場合、ページが読み込んだJSONレスポンスの (URL, JSON) を追加する
+        extract: ブラウザから取り出す範囲の設定（サイト設定のselenium_extract）。
+            mode='outer_html'はコンテナのouterHTMLのみ、mode='structured'はエントリーを
+            抽出済みのJSONで返す。省略時はページ全体のHTMLを返す
+        selector_patterns: mode='structured'で使用するCSSセレクターパターンのリスト
         
     Returns:
-        取得したHTMLまたはNone（失敗時）
+        取得したHTML（mode='structured'の場合はJSON）またはNone（失敗時）
     """
-    try:
-        from selenium import webdriver
-        from selenium.webdriver.chrome.options import Options
-        from selenium.webdriver.chrome.service import Service
-        from selenium.webdriver.common.by import By
-        from selenium.webdriver.support.ui import WebDriverWait
-        from selenium.webdriver.support import expected_conditions as EC
-        from webdriver_manager.chrome import ChromeDriverManager
-    except ImportError as e:
-        logger.error(f"Seleniumのインポートに失敗しました: {e}")
-        return None
-    
-    try:
-        # config.pyから設定を取得
-        try:
-            from .config import (
-                is_lambda_environment,
-                get_chrome_options_for_lambda,
-                get_chrome_options_for_local
-            )
-        except ImportError:
-            # config.pyが利用できない場合はローカル関数を使用
-            def is_lambda_environment():
-                import os
-                return bool(os.environ.get('AWS_LAMBDA_FUNCTION_NAME') or 
-                           os.environ.get('LAMBDA_TASK_ROOT'))
-            
-            def get_chrome_options_for_lambda():
-                return [
-                    '--headless=new', '--no-sandbox', '--disable-gpu',
-                    '--window-size=1280x1696', '--disable-dev-shm-usage',
-                    '--disable-dev-tools', '--no-zygote', '--single-process',
-                    '--disable-software-rasterizer', '--disable-extensions',
-                    '--remote-debugging-port=9222',
-                ]
-            
-            def get_chrome_options_for_local():
-                return [
-                    '--headless=new', '--no-sandbox', '--disable-gpu',
-                    '--window-size=1280x1696', '--disable-dev-shm-usage',
-                    '--remote-debugging-port=9222',
-                ]
-        
-        # Lambda環境を自動検出
-        is_lambda = is_lambda_environment() or use_lambda_optimization
-        
-        if debug:
-            logger.debug(f"Lambda環境: {is_lambda}")
-            logger.debug(f"待機時間: {wait_time}秒、ポストロード待機: {post_load_wait}秒")
-        
-        # Chrome optionsを設定
-        chrome_options = Options()
-        
-        if is_lambda:
-            option_list = get_chrome_options_for_lambda()
-            if debug:
-                logger.debug("Lambda最適化モードを使用")
-        else:
-            option_list = get_chrome_options_for_local()
-            if debug:
-                logger.debug("ローカルモードを使用")
-        
-        # Optionsにオプションを追加
-        for option in option_list:
-            chrome_options.add_argument(option)
-        
-        # 一時ディレクトリを作成
-        chrome_options.add_argument(f"--user-data-dir={mkdtemp()}")
-        chrome_options.add_argument(f"--data-path={mkdtemp()}")
-        chrome_options.add_argument(f"--disk-cache-dir={mkdtemp()}")
-        
-        # User-Agentを設定
-        chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36")
-        
-        # SSL/TLS証明書エラーを無視
-        chrome_options.add_argument("--ignore-certificate-errors")
-        chrome_options.add_argument("--ignore-ssl-errors")
-        chrome_options.add_argument("--allow-insecure-localhost")
-        chrome_options.add_argument("--ignore-certificate-errors-spki-list")
-        chrome_options.add_argument("--allow-running-insecure-content")
-        
-        # SSL証明書の検証を無効化（Seleniumレベル）
-        chrome_options.set_capability('acceptInsecureCerts', True)
-        
-        # パフォーマンス最適化：不要なリソースの読み込みを無効化
-        prefs = {
-            "profile.managed_default_content_settings.images": 2,  # 画像を無効化
-            "profile.managed_default_content_settings.stylesheets": 2,  # CSSを無効化
-        }
-        chrome_options.add_experimental_option("prefs", prefs)
-        
-        driver = None
-        
-        if debug_selenium or debug:
-            logger.debug("ChromeDriverを初期化中...")
-        
-        # まずシステムのchromedriverを使用
-        try:
-            service = Service('/usr/bin/chromedriver')
-            driver = webdriver.Chrome(service=service, options=chrome_options)
-            if debug_selenium or debug:
-                logger.debug("システムのchromedriverを使用します。")
-        except Exception as e:
-            if debug_selenium or debug:
-                logger.debug(f"システムのchromedriver使用失敗: {e}")
-                logger.debug("webdriver-managerを使用してChromeDriverをダウンロード中...")
-            service = Service(ChromeDriverManager().install())
-            driver = webdriver.Chrome(service=service, options=chrome_options)
-        
-        if debug_selenium or debug:
-            logger.debug(f"URLにアクセス中: {url}")
-        
-        driver.get(url)
-        
-        # ページが完全に読み込まれるまで待機
-        if debug_selenium or debug:
-            logger.debug(f"ページの読み込みを待機中（最大{wait_time}秒）...")
-        
-        # JavaScriptでコンテンツが読み込まれるまで待機
-        # .headline-entries内にコンテンツが追加されるのを待つ
-        try:
-            WebDriverWait(driver, wait_time).until(
-                lambda d: len(d.find_element(By.CLASS_NAME, "headline-entries").find_elements(By.CSS_SELECTOR, "div, article, a")) > 0
-            )
-            if debug_selenium or debug:
-                logger.debug("JavaScriptによるコンテンツの読み込みが完了しました。")
-        except Exception as e:
-            if debug_selenium or debug:
-                logger.debug(f"JavaScriptコンテンツの読み込み待機中にタイムアウト: {e}")
-                logger.debug("現在のページ状態で処理を継続します。")
-        
-        # 追加で待機（JavaScriptアニメーションなどのため）
-        if post_load_wait > 0:
-            if debug_selenium or debug:
-                logger.debug(f"追加で{post_load_wait}秒待機中...")
-            time.sleep(post_load_wait)
-        
-        if debug_selenium or debug:
-            logger.debug("ページの読み込みが完了しました。")
-        
-        # ページのHTMLを取得
-        html = driver.page_source
-        
-        driver.quit()
-        return html
-        
-    except Exception as e:
-        logger.warning(f"Seleniumでのページ取得中にエラーが発生: {e}")
-        if driver:
-            try:
-                driver.quit()
-            except:
-                pass
-        return None
+    return browser.render_page(
+        url,
+        wait_time=wait_time,
+        post_load_wait=post_load_wait,
+        use_lambda_optimization=use_lambda_optimization,
+        debug=debug_selenium or debug,
+        resource_blocking=resource_blocking,
+        captured_responses=captured_responses,
+        extract=with_default_container(extract),
+        selector_patterns=selector_patterns
+    )
+
+def with_default_container(extract: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """取り出す範囲の設定にお知らせ一覧のコンテナを補う"""
+    return {'container': DEFAULT_CONTAINER_SELECTOR, **(extract or {})}
+
+def extract_from_driver(
+    driver,
+    extract: Optional[Dict[str, Any]],
+    selector_patterns: Optional[List[Dict[str, Optional[str]]]] = None,
+    debug: bool = False
+) -> str:
+    """サイト設定に従ってブラウザからコンテンツを取り出す（コンテナの既定はお知らせ一覧）"""
+    return browser.extract_from_driver(driver, with_default_container(extract), selector_patterns, debug)
+
+def parse_selenium_result(
+    result: str,
+    url: str,
+    selector_patterns: List[Dict[str, Optional[str]]],
+    extract: Optional[Dict[str, Any]] = None,
+    debug: bool = False
+) -> List[Dict[str, Any]]:
+    """scrape_with_seleniumの結果をアイテムに変換する"""
+    if (extract or {}).get('mode') == 'structured' and result.lstrip().startswith('['):
+        return items_from_records(json.loads(result), url, debug)
+    return parse_html_content(result, url, selector_patterns, debug)
 
 def scrape_with_requests(url: str, debug: bool = False) -> Optional[str]:
     """requestsを使用してページをスクレイピングする
@@ -275,8 +192,7 @@ def scrape_with_requests(url: str, debug: bool = False) -> Optional[str]:
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36'
     }
     try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
+        response = fetch.get(url, headers=headers)
         if debug:
             logger.debug("requestsを使用してページを取得しました。")
         return response.text
@@ -284,6 +200,76 @@ def scrape_with_requests(url: str, debug: bool = False) -> Optional[str]:
         logger.warning(f"requestsでのページ取得中にエラーが発生: {e}")
         return None
 
+def build_guid(base_url: str, date_str: str, content: str) -> str:
+    """取得経路（データエンドポイント・静的HTML・ブラウザ）によらず同じになるGUIDを作成する
+
+    日付は表記（"2025-10-15T09:00:00"と"2025年10月15日"など）ではなく解析した日付を、
+    本文は空白を取り除いたものを使用する。リンクは経路によって形式が異なるためGUIDの計算には含めない。
+    """
+    parsed = _parse_date_cached(date_str) if date_str != "不明" else None
+    date_key = parsed.date().isoformat() if parsed is not None else ''
+    return stable_guid(base_url, date_key, re.sub(r'\s+', '', content))
+
+def build_item(
+    date_str: str,
+    category_text: str,
+    content: str,
+    title: str,
+    link: str,
+    debug: bool = False,
+    source_url: Optional[str] = None
+) -> Dict[str, Any]:
+    """抽出したテキストからフィード用のアイテムを作成する
+    
+    Args:
+        date_str: 日付テキスト（不明な場合は"不明"）
+        category_text: サイト上のカテゴリ表記（不明な場合は"その他"）
+        content: 本文
+        title: タイトル（空の場合は本文から作成）
+        link: リンク先URL
+        debug: デバッグモード
+        source_url: 一覧ページのURL（GUIDの接頭辞。省略時はリンク先URL）
+        
+    Returns:
+        アイテムの辞書
+    """
+    # 日付をパース
+    if date_str != "不明":
+        try:
+            date_obj = parse_date(date_str)
+            formatted_pub_date = date_obj.strftime('%a, %d %b %Y %H:%M:%S +0000')
+        except Exception as e:
+            if debug:
+                logger.debug(f"日付のパースに失敗: {date_str}, エラー: {e}")
+            formatted_pub_date = datetime.datetime.now().strftime('%a, %d %b %Y %H:%M:%S +0000')
+    else:
+        formatted_pub_date = datetime.datetime.now().strftime('%a, %d %b %Y %H:%M:%S +0000')
+    
+    # タイトルが取得できない場合は内容の最初の部分をタイトルとして使用
+    if not title and content:
+        title = content[:50] + ('...' if len(content) > 50 else '')
+    elif not title:
+        title = "お知らせ"
+    
+    # カテゴリを検出
+    categories = [category_text] if category_text and category_text != "その他" else []
+    detected_categories = detect_categories(title + " " + content)
+    categories.extend(detected_categories)
+    categories = list(dict.fromkeys(categories))  # 順序を保ったまま重複を削除
+    
+    # カテゴリが空の場合は「その他」を追加
+    if not categories:
+        categories = ["その他"]
+    
+    return {
+        'title': title,
+        'description': content,
+        'link': link,
+        'pubDate': formatted_pub_date,
+        'categories': categories,
+        'guid': build_guid(source_url or link, date_str, content)
+    }
+
 def parse_html_content(
     html: str,
     url: str,
@@ -336,18 +322,6 @@ def parse_html_content(
                 if date_match:
                     date_str = date_match.group(0)
             
-            # 日付をパース
-            if date_str != "不明":
-                try:
-                    date_obj = parse_date(date_str)
-                    formatted_pub_date = date_obj.strftime('%a, %d %b %Y %H:%M:%S +0000')
-                except Exception as e:
-                    if debug:
-                        logger.debug(f"日付のパースに失敗: {date_str}, エラー: {e}")
-                    formatted_pub_date = datetime.datetime.now().strftime('%a, %d %b %Y %H:%M:%S +0000')
-            else:
-                formatted_pub_date = datetime.datetime.now().strftime('%a, %d %b %Y %H:%M:%S +0000')
-            
             # カテゴリを取得
             category_element = entry.select_one(pattern['category']) if pattern['category'] else None
             category_text = category_element.get_text(strip=True) if category_element else "その他"
@@ -370,12 +344,6 @@ def parse_html_content(
                 if title_element:
                     title = title_element.get_text(strip=True)
             
-            # タイトルが取得できない場合は内容の最初の部分をタイトルとして使用
-            if not title and content:
-                title = content[:50] + ('...' if len(content) > 50 else '')
-            elif not title:
-                title = "お知らせ"
-            
             # リンクを取得
             a_tag = entry.select_one('a')
             if a_tag and 'href' in a_tag.attrs:
@@ -383,29 +351,10 @@ def parse_html_content(
             else:
                 link = url
             
-            # カテゴリを検出
-            categories = [category_text] if category_text and category_text != "その他" else []
-            detected_categories = detect_categories(title + " " + content)
-            categories.extend(detected_categories)
-            categories = list(set(categories))  # 重複を削除
-            
-            # カテゴリが空の場合は「その他」を追加
-            if not categories:
-                categories = ["その他"]
-            
-            # 項目を追加
-            item = {
-                'title': title,
-                'description': content,
-                'link': link,
-                'pubDate': formatted_pub_date,
-                'categories': categories,
-                'guid': f"{link}#{date_str}-{hash(content)}"
-            }
-            
+            item = build_item(date_str, category_text, content, title, link, debug, source_url=url)
             items.append(item)
             if debug:
-                logger.debug(f"アイテムを追加しました: {title[:30]}... (カテゴリ: {', '.join(categories)})")
+                logger.debug(f"アイテムを追加しました: {item['title'][:30]}... (カテゴリ: {', '.join(item['categories'])})")
         
         # アイテムが見つかった場合は他のパターンを試さない
         if items:
@@ -413,6 +362,98 @@ def parse_html_content(
     
     return items
 
+def items_from_records(records: List[Dict[str, str]], url: str, debug: bool = False) -> List[Dict[str, Any]]:
+    """エンドポイントから取り出したレコードをアイテムに変換する"""
+    items = []
+    for record in records:
+        content = record.get('content', '')
+        if not content:
+            continue
+        link = urllib.parse.urljoin(url, record['link']) if record.get('link') else url
+        items.append(build_item(
+            record.get('date') or "不明",
+            record.get('category') or "その他",
+            content,
+            record.get('title', ''),
+            link,
+            debug,
+            source_url=url
+        ))
+    return items
+
+def scrape_with_endpoint(url: str, mapping: Dict[str, Any], debug: bool = False) -> Optional[List[Dict[str, Any]]]:
+    """記録済みのデータエンドポイントをHTTPで取得してアイテムを作成する
+    
+    Returns:
+        アイテムのリスト。取得に失敗した場合はNone
+    """
+    try:
+        records = endpoint.fetch_endpoint_records(mapping, debug)
+    except Exception as e:
+        logger.warning(f"データエンドポイントの取得中にエラーが発生: {e}")
+        return None
+    return items_from_records(records, url, debug)
+
+def discover_data_endpoint(
+    url: str,
+    selector_patterns: List[Dict[str, Optional[str]]],
+    wait_time: int,
+    post_load_wait: int,
+    use_lambda_optimization: bool,
+    min_items: int,
+    debug: bool = False,
+    debug_selenium: bool = False,
+    resource_blocking: Optional[Dict[str, Any]] = None,
+    extract: Optional[Dict[str, Any]] = None
+) -> List[Dict[str, Any]]:
+    """Seleniumで描画したページとJSONレスポンスを突き合わせ、データエンドポイントを記録する
+    
+    検出した対応付けはHTTPで再取得して検証し、min_items件以上のアイテムが得られた場合のみ記録する。
+    
+    Returns:
+        描画済みのHTMLから取得したアイテムのリスト
+    """
+    responses = []
+    html = scrape_with_selenium(
+        url=url,
+        wait_time=wait_time,
+        post_load_wait=post_load_wait,
+        use_lambda_optimization=use_lambda_optimization,
+        debug=debug,
+        debug_selenium=debug_selenium,
+        resource_blocking=resource_blocking,
+        captured_responses=responses,
+        extract=extract,
+        selector_patterns=selector_patterns
+    )
+    if not html:
+        return []
+    
+    items = parse_selenium_result(html, url, selector_patterns, extract, debug)
+    logger.info(f"エンドポイント検出: {len(responses)}件のJSONレスポンスを確認します")
+    
+    mapping = endpoint.discover_mapping(responses, items, min_matches=min(min_items, len(items)) or 1)
+    if mapping is None:
+        logger.warning("お知らせのデータを含むJSONレスポンスが見つかりませんでした。")
+        return items
+    
+    # HTTPで取得できるか検証してから記録する
+    endpoint_items = scrape_with_endpoint(url, mapping, debug)
+    if endpoint_items is None or len(endpoint_items) < min_items:
+        logger.warning(f"検出したエンドポイントをHTTPで再現できませんでした: {mapping['url']}")
+        return items
+    
+    endpoint.save_endpoint(url, mapping)
+    logger.info(f"データエンドポイントを記録しました: {mapping['url']}")
+    return items
+
+def skip_for_deadline(strategy: str, required_seconds: float) -> bool:
+    """期限までの残り時間が足りない場合に、手法を省略することをログに出力してTrueを返す"""
+    if deadline.has_time_for(required_seconds):
+        return False
+    logger.warning(f"期限までの残り時間（{deadline.remaining():.1f}秒）が足りないため、{strategy}を省略します。")
+    return True
+
 def scrape(
     url: str,
     debug: bool = False,
@@ -420,7 +461,8 @@ def scrape(
     selenium_wait: Optional[int] = None,
     post_load_wait: Optional[int] = None,
     lambda_optimized: bool = False,
-    debug_selenium: bool = False
+    debug_selenium: bool = False,
+    discover_endpoint: bool = False
 ) -> List[Dict[str, Any]]:
     """Monacaのヘッドラインページからお知らせをスクレイピングする
     
@@ -432,6 +474,7 @@ def scrape(
         post_load_wait: ページロード後の追加待機時間（秒）
         lambda_optimized: Lambda最適化モードを明示的に有効化
         debug_selenium: Seleniumの詳細ログを出力
+        discover_endpoint: Seleniumの実行中にデータエンドポイントを検出して記録する
         
     Returns:
         スクレイピングされたアイテムのリスト
@@ -497,23 +540,82 @@ def scrape(
     
     items = []
     
+    # エンドポイント検出モード
+    if discover_endpoint:
+        items = discover_data_endpoint(
+            url,
+            selector_patterns,
+            wait_time=wait_time,
+            post_load_wait=post_wait,
+            use_lambda_optimization=is_lambda or lambda_optimized,
+            min_items=min_items,
+            debug=debug,
+            debug_selenium=debug_selenium,
+            resource_blocking=site_config.get('resource_blocking'),
+            extract=site_config.get('selenium_extract')
+        )
+        if len(items) >= min_items:
+            if not silent:
+                logger.info(f"合計 {len(items)} 個のアイテムを取得しました。")
+            return items
+    
+    # 手法0: 記録済みのデータエンドポイントをHTTPで取得（ブラウザ不要）
+    mapping = endpoint.get_endpoint(url) if not discover_endpoint else None
+    if mapping:
+        if debug:
+            logger.info(f"手法0: データエンドポイントを試行中: {mapping['url']}")
+        
+        endpoint_items = scrape_with_endpoint(url, mapping, debug)
+        if endpoint_items is not None and len(endpoint_items) >= min_items:
+            report.get_report().set(url, 'fetch_strategy', 'endpoint')
+            if not silent:
+                logger.info(f"合計 {len(endpoint_items)} 個のアイテムを取得しました。")
+            return endpoint_items
+        
+        logger.warning("データエンドポイントから十分なアイテムを取得できませんでした。ブラウザで取得します。")
+        if endpoint_items:
+            items = endpoint_items
+    
+    # 静的HTMLのプローブ: JavaScriptが不要なサイトではブラウザを起動しない
+    static_items, needs_browser = probe.scrape_static_first(
+        url,
+        site_config,
+        lambda html: parse_html_content(html, url, selector_patterns, debug),
+        headers={'User-Agent': fetch.DEFAULT_USER_AGENT},
+        debug=debug
+    )
+    if not needs_browser:
+        report.get_report().set(url, 'fetch_strategy', 'static')
+        if not silent:
+            logger.info(f"合計 {len(static_items)} 個のアイテムを取得しました。")
+        return static_items
+    if static_items and len(static_items) > len(items):
+        items = static_items
+    
     # 手法1: Selenium最適版
     if debug:
         logger.info("手法1: Selenium最適版を試行中...")
     
-    html = scrape_with_selenium(
+    html = None if skip_for_deadline("手法1: Selenium最適版", MIN_SELENIUM_BUDGET) else scrape_with_selenium(
         url=url,
         wait_time=wait_time,
         post_load_wait=post_wait,
         use_lambda_optimization=is_lambda or lambda_optimized,
         debug=debug,
-        debug_selenium=debug_selenium
+        debug_selenium=debug_selenium,
+        resource_blocking=site_config.get('resource_blocking'),
+        extract=site_config.get('selenium_extract'),
+        selector_patterns=selector_patterns
     )
     
     if html:
-        items = parse_html_content(html, url, selector_patterns, debug)
+        items1 = parse_selenium_result(html, url, selector_patterns, site_config.get('selenium_extract'), debug)
         if debug:
-            logger.info(f"Selenium最適版で {len(items)} 個のアイテムを取得しました。")
+            logger.info(f"Selenium最適版で {len(items1)} 個のアイテムを取得しました。")
+        
+        # より多くのアイテムを取得できた方を使用
+        if len(items1) >= len(items):
+            items = items1
         
         # 十分なアイテムが取得できた場合は成功
         if len(items) >= min_items:
@@ -525,17 +627,20 @@ def scrape(
     if debug:
         logger.info("手法2: Selenium標準版を試行中...")
     
-    html = scrape_with_selenium(
+    html = None if skip_for_deadline("手法2: Selenium標準版", MIN_SELENIUM_BUDGET) else scrape_with_selenium(
         url=url,
         wait_time=10,
         post_load_wait=2,
         use_lambda_optimization=False,
         debug=debug,
-        debug_selenium=debug_selenium
+        debug_selenium=debug_selenium,
+        resource_blocking=site_config.get('resource_blocking'),
+        extract=site_config.get('selenium_extract'),
+        selector_patterns=selector_patterns
     )
     
     if html:
-        items2 = parse_html_content(html, url, selector_patterns, debug)
+        items2 = parse_selenium_result(html, url, selector_patterns, site_config.get('selenium_extract'), debug)
         if debug:
             logger.info(f"Selenium標準版で {len(items2)} 個のアイテムを取得しました。")
         
@@ -552,7 +657,10 @@ def scrape(
     if debug:
         logger.info("手法3: requests + BeautifulSoupを試行中...")
     
-    html = scrape_with_requests(url, debug)
+    # プローブで静的HTMLを取得済みの場合は再取得しない
+    html = None
+    if static_items is None and not skip_for_deadline("手法3: requests + BeautifulSoup", browser.DEADLINE_RESERVE):
+        html = scrape_with_requests(url, debug)
     
     if html:
         items3 = parse_html_content(html, url, selector_patterns, debug)
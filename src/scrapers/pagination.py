@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+"""
+Pagination / archive crawling with stop-on-seen-GUID
+
+Per-site rules live under 'pagination' in SITE_CONFIGS:
+
+    'pagination': {
+        'next_selector': 'a.next',           # 次のページへのリンク
+        'url_template': '?page={page}',      # ページ番号からURLを作る場合（相対URLも可）
+        'max_pages': 10,                     # 取得するページ数の上限（1の場合はページ送りしない）
+        'prefetch': 2,                       # 先読みするページ数（url_templateの場合のみ）
+    }
+
+Crawling stops at the first page whose last (oldest) entry was seen in a
+previous run, so an incremental run touches only the first page as long as
+the new items fit on it. Only the last entry is checked because a pinned old
+notice at the top of an otherwise new page must not end a backfill. Crawling
+also stops at an empty page or at a page whose items are all older than the
+date cutoff. Pages built from url_template are prefetched with bounded
+concurrency, but only once the first page shows that a backfill is needed.
+"""
+
+import concurrent.futures
+import contextvars
+import datetime
+import logging
+import urllib.parse
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from bs4 import BeautifulSoup
+
+from . import state
+
+# ロガーの設定
+logger = logging.getLogger(__name__)
+
+STATE_NAMESPACE = 'seen_guids'
+
+DEFAULT_NEXT_SELECTOR = 'link[rel~=next], a[rel~=next]'
+DEFAULT_PREFETCH = 2
+
+# URLごとに記録するGUIDの上限
+MAX_SEEN_GUIDS = 2000
+
+DATE_FORMATS = (
+    '%a, %d %b %Y %H:%M:%S %z',
+    '%Y-%m-%d',
+    '%Y/%m/%d',
+    '%Y.%m.%d',
+    '%B %d, %Y',
+    '%b %d, %Y',
+    '%d %B %Y',
+)
+
+def get_seen_guids(url: str) -> Set[str]:
+    """前回までに取得したGUIDを返す"""
+    return set(state.get_entry(STATE_NAMESPACE, url) or [])
+
+def record_seen_guids(url: str, guids: Iterable[str]):
+    """取得したGUIDを記録する（新しいものを優先し、上限を超えた分は古いものから削除する）"""
+    previous = state.get_entry(STATE_NAMESPACE, url) or []
+    merged = list(dict.fromkeys([guid for guid in guids if guid] + previous))[:MAX_SEEN_GUIDS]
+    if merged != previous:
+        state.set_entry(STATE_NAMESPACE, url, merged)
+
+def parse_date(value: Any) -> Optional[datetime.datetime]:
+    """ページ内のアイテムの日付文字列を解析する（解析できない場合はNone）"""
+    if not isinstance(value, str):
+        return None
+    value = value.strip()
+    for date_format in DATE_FORMATS:
+        try:
+            parsed = datetime.datetime.strptime(value, date_format)
+        except ValueError:
+            continue
+        return parsed.replace(tzinfo=None)
+    return None
+
+def get_next_url(soup: BeautifulSoup, page_url: str, next_selector: str = DEFAULT_NEXT_SELECTOR) -> Optional[str]:
+    """次のページへのリンクを返す"""
+    element = soup.select_one(next_selector)
+    if element is None or not element.get('href'):
+        return None
+    next_url = urllib.parse.urljoin(page_url, element['href'])
+    return next_url if next_url != page_url else None
+
+def build_page_url(url: str, url_template: str, page: int) -> str:
+    """ページ番号からページのURLを作成する"""
+    return urllib.parse.urljoin(url, url_template.format(page=page))
+
+def should_stop(items: List[Dict[str, Any]], seen_guids: Set[str],
+                cutoff: Optional[datetime.datetime]) -> Optional[str]:
+    """ページの取得を終了する理由を返す（続ける場合はNone）"""
+    if not items:
+        return '項目のないページ'
+    # 一覧は新しい順のため、最後（最も古い）項目が取得済みなら以降のページもすべて取得済みとみなす
+    # （先頭に固定表示された古い項目だけでは終了しない）
+    if items[-1].get('guid') in seen_guids:
+        return '最後の項目が取得済みのページ'
+    if cutoff is not None:
+        dates = [parse_date(item.get('pubDate')) for item in items]
+        if dates and all(date is not None and date < cutoff for date in dates):
+            return '日付の下限より古いページ'
+    return None
+
+def crawl(
+    url: str,
+    first_soup: BeautifulSoup,
+    parse_page: Callable[[str, BeautifulSoup], List[Dict[str, Any]]],
+    fetch_html: Callable[[str], str],
+    rules: Optional[Dict[str, Any]] = None,
+    max_pages: Optional[int] = None,
+    since: Optional[str] = None,
+    debug: bool = False
+) -> List[Dict[str, Any]]:
+    """1ページ目から順にページを取得してアイテムを集める
+
+    Args:
+        url: 1ページ目のURL
+        first_soup: 解析済みの1ページ目のHTML
+        parse_page: (ページのURL, HTML) からアイテムを抽出する関数
+        fetch_html: ページのURLからHTMLを取得する関数
+        rules: サイト設定のpagination
+        max_pages: 取得するページ数の上限（rulesの値より優先）
+        since: この日付（YYYY-MM-DD）より古いページで終了する
+        debug: デバッグモード
+
+    Returns:
+        全ページのアイテム（GUIDの重複を除く）
+    """
+    rules = rules or {}
+    max_pages = max_pages or rules.get('max_pages', 1)
+    cutoff = datetime.datetime.strptime(since, '%Y-%m-%d') if since else None
+    seen_guids = get_seen_guids(url)
+
+    items: List[Dict[str, Any]] = []
+    guids: Set[str] = set()
+
+    def add_page(page_url: str, page_items: List[Dict[str, Any]]) -> bool:
+        """ページのアイテムを追加し、次のページに進むかを返す"""
+        for item in page_items:
+            guid = item.get('guid')
+            if guid and guid in guids:
+                continue
+            guids.add(guid)
+            items.append(item)
+
+        reason = should_stop(page_items, seen_guids, cutoff)
+        if reason and debug:
+            logger.debug(f"{reason}のため、ページの取得を終了します: {page_url}")
+        return reason is None
+
+    if add_page(url, parse_page(url, first_soup)) and max_pages > 1:
+        if rules.get('url_template'):
+            _crawl_numbered_pages(url, rules, max_pages, parse_page, fetch_html, add_page)
+        else:
+            _crawl_next_links(url, first_soup, rules, max_pages, parse_page, fetch_html, add_page)
+
+    record_seen_guids(url, [item.get('guid') for item in items])
+    return items
+
+def _crawl_numbered_pages(url: str, rules: Dict[str, Any], max_pages: int, parse_page, fetch_html, add_page):
+    """ページ番号のURLを先読みしながら順に処理する"""
+    prefetch = max(1, rules.get('prefetch', DEFAULT_PREFETCH))
+    page_urls = [build_page_url(url, rules['url_template'], page) for page in range(2, max_pages + 1)]
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=prefetch) as executor:
+        pending = {}
+        next_index = 0
+        try:
+            for index, page_url in enumerate(page_urls):
+                # 処理中のページから最大prefetch件先までを取得しておく
+                while next_index < len(page_urls) and next_index < index + prefetch:
+                    # 期限（deadline）を引き継ぐため、現在のコンテキストで実行する
+                    pending[next_index] = executor.submit(
+                        contextvars.copy_context().run, fetch_html, page_urls[next_index]
+                    )
+                    next_index += 1
+
+                try:
+                    soup = BeautifulSoup(pending.pop(index).result(), 'html.parser')
+                except Exception as e:
+                    logger.warning(f"ページの取得に失敗しました: {page_url}: {e}")
+                    break
+                if not add_page(page_url, parse_page(page_url, soup)):
+                    break
+        finally:
+            for future in pending.values():
+                future.cancel()
+
+def _crawl_next_links(url: str, first_soup: BeautifulSoup, rules: Dict[str, Any], max_pages: int,
+                      parse_page, fetch_html, add_page):
+    """「次のページ」のリンクを順にたどる"""
+    next_selector = rules.get('next_selector', DEFAULT_NEXT_SELECTOR)
+    visited = {url}
+    soup = first_soup
+    page_url = url
+
+    for _ in range(max_pages - 1):
+        next_url = get_next_url(soup, page_url, next_selector)
+        if next_url is None or next_url in visited:
+            break
+        visited.add(next_url)
+
+        try:
+            soup = BeautifulSoup(fetch_html(next_url), 'html.parser')
+        except Exception as e:
+            logger.warning(f"ページの取得に失敗しました: {next_url}: {e}")
+            break
+        page_url = next_url
+        if not add_page(page_url, parse_page(page_url, soup)):
+            break
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+Static-content probe that decides whether a site needs a browser
+
+Before launching Chrome, the static HTML is fetched and parsed with the
+site's selectors. The browser is only needed when the site is marked as
+requiring JavaScript or the static result falls below min_items_threshold.
+The outcome is recorded so that steady-state runs skip the probe for sites
+that are known to need the browser.
+"""
+
+import datetime
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from . import fetch
+from . import report
+from . import state
+
+# ロガーの設定
+logger = logging.getLogger(__name__)
+
+STATE_NAMESPACE = 'probes'
+
+# 記録したプローブ結果の有効期間（秒）
+DEFAULT_PROBE_TTL = 7 * 24 * 60 * 60
+
+def get_probe_result(url: str, ttl: int = DEFAULT_PROBE_TTL) -> Optional[Dict[str, Any]]:
+    """有効期間内のプローブ結果を返す"""
+    result = state.get_entry(STATE_NAMESPACE, url)
+    if not result:
+        return None
+
+    try:
+        probed_at = datetime.datetime.fromisoformat(result['probed_at'])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+    if (datetime.datetime.now() - probed_at).total_seconds() > ttl:
+        return None
+    return result
+
+def record_probe_result(url: str, static_ok: bool, item_count: int):
+    """プローブ結果を記録する"""
+    state.set_entry(STATE_NAMESPACE, url, {
+        'static_ok': static_ok,
+        'item_count': item_count,
+        'probed_at': datetime.datetime.now().isoformat(timespec='seconds'),
+    })
+
+def scrape_static_first(
+    url: str,
+    site_config: Dict[str, Any],
+    parse: Callable[[str], List[Dict[str, Any]]],
+    headers: Optional[Dict[str, str]] = None,
+    debug: bool = False
+) -> Tuple[Optional[List[Dict[str, Any]]], bool]:
+    """ブラウザを起動する前に静的HTMLで取得を試みる
+
+    Args:
+        url: 対象URL
+        site_config: サイト設定（requires_selenium、min_items_threshold、probe_ttlを参照）
+        parse: HTMLからアイテムを抽出する関数
+        headers: 追加のリクエストヘッダー
+        debug: デバッグモード
+
+    Returns:
+        (静的HTMLから取得したアイテム, ブラウザが必要か) のタプル。
+        プローブを行わなかった場合、アイテムはNone
+    """
+    if site_config.get('requires_selenium'):
+        if debug:
+            logger.debug("requires_selenium が設定されているため、静的HTMLのプローブを省略します。")
+        return None, True
+
+    ttl = site_config.get('probe_ttl', DEFAULT_PROBE_TTL)
+    recorded = get_probe_result(url, ttl)
+    if recorded and not recorded.get('static_ok'):
+        if debug:
+            logger.debug(f"記録済みのプローブ結果により静的HTMLの取得を省略します（{recorded['probed_at']}）")
+        report.get_report().set(url, 'static_probe', 'skipped')
+        return None, True
+
+    min_items = site_config.get('min_items_threshold', 1)
+    try:
+        html = fetch.get(url, headers=headers).text
+        items = parse(html)
+    except Exception as e:
+        logger.warning(f"静的HTMLのプローブ中にエラーが発生: {e}")
+        return None, True
+
+    static_ok = len(items) >= min_items
+    report.get_report().set(url, 'static_probe', 'sufficient' if static_ok else 'insufficient')
+
+    # 結果が変わった場合、または期限切れの場合のみ記録を更新する
+    if recorded is None or recorded.get('static_ok') != static_ok:
+        record_probe_result(url, static_ok, len(items))
+
+    if static_ok:
+        logger.info(f"静的HTMLから{len(items)}件のアイテムを取得したため、ブラウザは起動しません。")
+    elif debug:
+        logger.debug(f"静的HTMLのアイテム数（{len(items)}件）が最小しきい値（{min_items}件）を下回っています。")
+
+    return items, not static_ok
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""
+Per-run statistics collected by scrapers and reported by main.py
+"""
+
+import logging
+import threading
+from typing import Any, Dict
+
+# ロガーの設定
+logger = logging.getLogger(__name__)
+
+class RunReport:
+    """URLごとの実行統計を集計する"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sites: Dict[str, Dict[str, Any]] = {}
+
+    def add(self, url: str, key: str, amount: int = 1):
+        """カウンターを加算する"""
+        with self._lock:
+            stats = self._sites.setdefault(url, {})
+            stats[key] = stats.get(key, 0) + amount
+
+    def set(self, url: str, key: str, value: Any):
+        """値を設定する"""
+        with self._lock:
+            self._sites.setdefault(url, {})[key] = value
+
+    def get(self, url: str) -> Dict[str, Any]:
+        """URLの統計のコピーを返す"""
+        with self._lock:
+            return dict(self._sites.get(url, {}))
+
+    def as_dict(self) -> Dict[str, Dict[str, Any]]:
+        """すべての統計のコピーを返す"""
+        with self._lock:
+            return {url: dict(stats) for url, stats in self._sites.items()}
+
+    def log_summary(self):
+        """統計の概要をログに出力する"""
+        for url, stats in self.as_dict().items():
+            if not stats:
+                continue
+            summary = ', '.join(f"{key}={value}" for key, value in sorted(stats.items()))
+            logger.info(f"実行レポート: {url}: {summary}")
+
+    def clear(self):
+        with self._lock:
+            self._sites.clear()
+
+# プロセス全体で共有する実行レポート
+_report = RunReport()
+
+def get_report() -> RunReport:
+    """現在の実行レポートを返す"""
+    return _report
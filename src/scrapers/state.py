@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+Small on-disk JSON state store shared by scrapers (discovered endpoints, probe results, ...)
+"""
+
+import json
+import logging
+import os
+import stat
+import tempfile
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from .config import is_lambda_environment
+
+# ロガーの設定
+logger = logging.getLogger(__name__)
+
+STATE_DIR_ENV = 'FEED_GENERATOR_STATE_DIR'
+
+_lock = threading.Lock()
+
+# 状態ファイルのディレクトリを一時的に置き換える場合のパス（取得結果の再生中など）
+_state_dir_override: Optional[str] = None
+
+def set_state_dir_override(path: Optional[str]):
+    """状態ファイルのディレクトリを置き換える（Noneの場合は元に戻す）"""
+    global _state_dir_override
+    _state_dir_override = path
+
+def get_state_dir() -> str:
+    """状態ファイルを保存するディレクトリを返す
+
+    置き換え中のディレクトリ、環境変数FEED_GENERATOR_STATE_DIRの順に優先される。
+    Lambda環境では書き込み可能な/tmpを使用する。
+    """
+    if _state_dir_override:
+        return _state_dir_override
+    state_dir = os.environ.get(STATE_DIR_ENV)
+    if not state_dir:
+        if is_lambda_environment():
+            state_dir = os.path.join(tempfile.gettempdir(), 'feed-generator-state')
+        else:
+            state_dir = os.path.join(os.path.expanduser('~'), '.cache', 'web-announcement-feed-generator')
+    return state_dir
+
+def _state_path(namespace: str) -> str:
+    return os.path.join(get_state_dir(), f"{namespace}.json")
+
+def get_file_mode(path: str) -> int:
+    """置き換え先のファイルに設定するパーミッションを返す
+
+    既存のファイルがあればそのパーミッションを引き継ぎ、なければopen()で作成した場合と同じ0o666 & ~umaskにする。
+    """
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except OSError:
+        pass
+    # umaskは変更しないと取得できないため、すぐに元に戻す
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+def create_temp_file(path: str) -> Tuple[int, str]:
+    """置き換え先と同じディレクトリに一時ファイルを作成し、(ファイル記述子, パス)を返す
+
+    mkstempは0o600で作成するため、置き換え後も他のユーザーが読めるようにパーミッションを設定する。
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix=os.path.basename(path))
+    try:
+        os.fchmod(fd, get_file_mode(path))
+    except OSError as e:
+        logger.debug(f"一時ファイルのパーミッションを設定できませんでした: {tmp_path}: {e}")
+    return fd, tmp_path
+
+def write_file_atomic(path: str, data: bytes):
+    """一時ファイルに書き込んでから置き換えることで、書きかけのファイルが見えないようにする"""
+    fd, tmp_path = create_temp_file(path)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except Exception:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def load_state(namespace: str) -> Dict[str, Any]:
+    """名前空間の状態を読み込む。存在しない場合や壊れている場合は空の辞書を返す"""
+    path = _state_path(namespace)
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        logger.warning(f"状態ファイルの読み込みに失敗しました: {path}: {e}")
+        return {}
+
+def save_state(namespace: str, data: Dict[str, Any]):
+    """名前空間の状態を保存する"""
+    payload = json.dumps(data, ensure_ascii=False, indent=2, sort_keys=True).encode('utf-8')
+    write_file_atomic(_state_path(namespace), payload)
+
+def get_entry(namespace: str, key: str) -> Optional[Any]:
+    """名前空間からキーに対応する値を取得する"""
+    with _lock:
+        return load_state(namespace).get(key)
+
+def set_entry(namespace: str, key: str, value: Any):
+    """名前空間にキーと値を保存する。Noneの場合はキーを削除する"""
+    with _lock:
+        data = load_state(namespace)
+        if value is None:
+            data.pop(key, None)
+        else:
+            data[key] = value
+        save_state(namespace, data)
@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+"""
+Learned per-domain extraction templates for the generic scraper
+
+The repeating announcement block of a page is inferred by clustering sibling
+elements that share the same tag and classes and contain both a date and a
+link. The best cluster is turned into a CSS selector made of the block and
+its nearest ancestors, checked against the page, and stored per site (the
+SITE_CONFIGS key, or the host and path of the page):
+
+    {
+        'item_selector': 'div.news-list > ul > li.entry',
+        'item_count': 12,
+        'source_url': 'https://example.com/news',
+        'learned_at': '2025-10-15T00:00:00',
+    }
+
+A cluster is only accepted when every block has a heading, so that titles do
+not fall back to the first characters of the block text. Later runs select
+the blocks with the stored selector directly and only re-learn when it yields
+fewer than the minimum number of items. Pages where nothing could be learned
+are remembered ({'item_selector': None, 'learned_at': ...}) and not analysed
+again until NEGATIVE_TEMPLATE_TTL has passed.
+"""
+
+import datetime
+import logging
+import re
+import urllib.parse
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from bs4 import BeautifulSoup
+from bs4.element import NavigableString, Tag
+
+from . import state
+from .config import get_site_key
+
+# ロガーの設定
+logger = logging.getLogger(__name__)
+
+STATE_NAMESPACE = 'templates'
+
+# テンプレートとして採用する、繰り返しブロックの最小数
+MIN_TEMPLATE_ITEMS = 3
+
+# セレクタに含める祖先要素の数
+SELECTOR_ANCESTOR_DEPTH = 2
+
+# テンプレートを学習できなかったページを再び解析するまでの時間（秒）
+NEGATIVE_TEMPLATE_TTL = 24 * 60 * 60
+
+CSS_IDENTIFIER = re.compile(r'^-?[A-Za-z_][\w-]*$')
+
+def get_template_key(url: str) -> str:
+    """テンプレートを保存するキー（サイト設定のキー、なければホストとパス）を返す
+
+    同じドメインでもページによって構造が異なるため、ドメイン単位では共有しない。
+    クエリ文字列（?page=2など）は同じテンプレートを使うものとして含めない。
+    """
+    site_key = get_site_key(url)
+    if site_key is not None:
+        return site_key
+    parsed = urllib.parse.urlparse(url)
+    return f"{parsed.netloc}{parsed.path.rstrip('/')}"
+
+def get_template(url: str) -> Optional[Dict[str, Any]]:
+    """URLのサイトで学習済みのテンプレート（学習できなかったことの記録を含む）を返す"""
+    return state.get_entry(STATE_NAMESPACE, get_template_key(url))
+
+def is_negative_cache_valid(template: Dict[str, Any], ttl: int = NEGATIVE_TEMPLATE_TTL) -> bool:
+    """学習できなかったことの記録が有効期間内かを返す"""
+    try:
+        learned_at = datetime.datetime.fromisoformat(template['learned_at'])
+    except (KeyError, TypeError, ValueError):
+        return False
+    return (datetime.datetime.now() - learned_at).total_seconds() <= ttl
+
+def save_template(url: str, template: Optional[Dict[str, Any]]):
+    """テンプレートを保存する。Noneの場合は削除する"""
+    state.set_entry(STATE_NAMESPACE, get_template_key(url), template)
+
+def selector_segment(tag: Tag) -> str:
+    """要素のタグ名とクラスからセレクタの1区間を作成する"""
+    classes = [cls for cls in tag.get('class', []) if CSS_IDENTIFIER.match(cls)]
+    return tag.name + ''.join(f'.{cls}' for cls in sorted(classes))
+
+def build_selector(tag: Tag, depth: int = SELECTOR_ANCESTOR_DEPTH) -> str:
+    """要素と最も近い祖先要素からセレクタを作成する"""
+    segments = [selector_segment(tag)]
+    for parent in tag.parents:
+        if len(segments) > depth or parent.name in (None, '[document]', 'html', 'body'):
+            break
+        segments.append(selector_segment(parent))
+    return ' > '.join(reversed(segments))
+
+def learn_template(
+    soup: BeautifulSoup,
+    has_date: Callable[[str], bool],
+    min_items: int = MIN_TEMPLATE_ITEMS,
+    has_title: Optional[Callable[[Tag], bool]] = None
+) -> Optional[Dict[str, Any]]:
+    """日付とリンクを含む兄弟要素のクラスタからお知らせのテンプレートを推定する
+
+    Args:
+        soup: ページのHTML
+        has_date: テキストが日付を含むかを判定する関数
+        min_items: テンプレートとして採用する最小のブロック数
+        has_title: ブロックが見出しを含むかを判定する関数（すべてのブロックに見出しがない場合は採用しない）
+
+    Returns:
+        item_selectorとitem_countを含む辞書。推定できない場合はNone
+    """
+    # 日付を含むテキストの祖先を、(親要素, タグとクラス) でまとめる
+    clusters: Dict[Tuple[int, str], Dict[int, Tag]] = {}
+    for text in soup.find_all(string=True):
+        if type(text) is not NavigableString or not has_date(text):
+            continue
+        for element in text.parents:
+            parent = element.parent
+            if parent is None or element.name in ('html', 'body'):
+                break
+            key = (id(parent), selector_segment(element))
+            clusters.setdefault(key, {})[id(element)] = element
+
+    best: Optional[Tuple[Tuple[int, int], List[Tag]]] = None
+    for members in clusters.values():
+        blocks = [element for element in members.values()
+                  if (element.name == 'a' and element.has_attr('href')) or element.find('a', href=True) is not None]
+        if len(blocks) < min_items:
+            continue
+        # ブロック数が多いものを優先し、同数の場合はより内側（祖先が多い）のものを優先する
+        score = (len(blocks), len(list(blocks[0].parents)))
+        if best is None or score > best[0]:
+            best = (score, blocks)
+
+    if best is None:
+        return None
+
+    blocks = best[1]
+    selector = build_selector(blocks[0])
+    selected = soup.select(selector)
+    if len(selected) < min_items:
+        logger.debug(f"推定したセレクタで十分な要素を取得できません: {selector}")
+        return None
+    if has_title is not None and not all(has_title(element) for element in selected):
+        # 見出しがないとタイトルが本文の先頭（日付を含む）になるため、テンプレートとして保存しない
+        logger.debug(f"見出しを含まないブロックがあるため、テンプレートとして採用しません: {selector}")
+        return None
+
+    return {'item_selector': selector, 'item_count': len(selected)}
+
+def select_with_template(
+    url: str,
+    soup: BeautifulSoup,
+    has_date: Callable[[str], bool],
+    min_items: int = MIN_TEMPLATE_ITEMS,
+    has_title: Optional[Callable[[Tag], bool]] = None,
+    debug: bool = False
+) -> Optional[List[Tag]]:
+    """学習済みのテンプレート（なければ新たに学習したもの）でお知らせの要素を取得する
+
+    Returns:
+        お知らせの要素のリスト。テンプレートを使えない場合はNone
+    """
+    template = get_template(url)
+    if template and not template.get('item_selector'):
+        if is_negative_cache_valid(template):
+            if debug:
+                logger.debug("テンプレートを学習できなかったページのため、再学習を省略します。")
+            return None
+        template = None
+    if template:
+        elements = soup.select(template['item_selector'])
+        if len(elements) >= min_items:
+            if debug:
+                logger.debug(f"学習済みのテンプレートを使用します: {template['item_selector']}（{len(elements)}件）")
+            return elements
+        logger.info(f"学習済みのテンプレートで取得できた要素が{len(elements)}件のため、再学習します。")
+
+    learned_at = datetime.datetime.now().isoformat(timespec='seconds')
+    learned = learn_template(soup, has_date, min_items, has_title)
+    if learned is None:
+        # 学習できなかったことを記録し、有効期間内は同じページを解析しない
+        save_template(url, {'item_selector': None, 'source_url': url, 'learned_at': learned_at})
+        return None
+
+    learned['source_url'] = url
+    learned['learned_at'] = learned_at
+    save_template(url, learned)
+    logger.info(f"お知らせのテンプレートを学習しました: {learned['item_selector']}（{learned['item_count']}件）")
+    return soup.select(learned['item_selector'])
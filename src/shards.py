@@ -0,0 +1,316 @@
+# -*- coding: utf-8 -*-
+"""
+Sharded feed outputs: one feed/CSV per month, category or product
+
+Items are streamed into per-shard temporary files in a single pass. Only a
+bounded number of file handles is kept open; the least recently used handle
+is closed and reopened in append mode when its shard receives more items.
+When all items are written, each shard is finished and moved into place
+(or discarded when its content hash is unchanged), and an index of the
+shards is written next to them:
+
+    {base}_{key}.xml / {base}_{key}.csv   # 各シャード
+    {base}_{key}.xml.gz など               # --compress を指定した場合の圧縮ファイル
+    {base}_index.json                      # シャードの一覧
+
+Shards listed in the previous index whose key no longer occurs (e.g. after a
+category disappears or --shard-by changes) are deleted together with their
+hash sidecar and compressed variants, so the index always matches the files
+on disk.
+"""
+
+import collections
+import datetime
+import hashlib
+import json
+import logging
+import os
+import re
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Set
+
+from scrapers.guid import normalize_item
+from scrapers.state import create_temp_file, write_file_atomic
+
+# ロガーの設定
+logger = logging.getLogger(__name__)
+
+SHARD_BY_CHOICES = ('month', 'category', 'product')
+
+# 同時に開いておくファイルハンドル数の上限
+DEFAULT_MAX_OPEN_FILES = 32
+
+UNKNOWN_SHARD_KEY = 'unknown'
+
+class ShardFormat(NamedTuple):
+    """シャードの出力形式（拡張子、先頭部分、アイテムの変換関数、末尾部分）"""
+    extension: str
+    header: str
+    render_item: Callable[[Dict[str, Any]], str]
+    footer: str
+
+def build_shard_key_function(
+    shard_by: str,
+    parse_date: Callable[[Any], Optional[datetime.datetime]]
+) -> Callable[[Dict[str, Any]], List[str]]:
+    """アイテムから所属するシャードのキーのリストを返す関数を作成する
+
+    カテゴリで分割する場合、複数のカテゴリを持つアイテムはそれぞれのシャードに含まれる。
+    """
+    if shard_by == 'month':
+        def keys(item):
+            date = parse_date(item.get('pubDate'))
+            return [date.strftime('%Y-%m') if date else UNKNOWN_SHARD_KEY]
+    elif shard_by == 'category':
+        def keys(item):
+            return list(dict.fromkeys(item.get('categories') or [])) or [UNKNOWN_SHARD_KEY]
+    elif shard_by == 'product':
+        def keys(item):
+            return [item.get('product') or UNKNOWN_SHARD_KEY]
+    else:
+        raise ValueError(f"不明なシャードの分割方法です: {shard_by}")
+    return keys
+
+def sanitize_shard_key(key: str) -> str:
+    """シャードのキーをファイル名に使える文字列に変換する"""
+    return re.sub(r'[^\w.-]+', '_', key).strip('_') or UNKNOWN_SHARD_KEY
+
+class ShardWriter:
+    """シャードごとの一時ファイルにアイテムを書き込み、最後にまとめて確定する"""
+
+    def __init__(self, base_path: str, formats: List[ShardFormat],
+                 max_open_files: int = DEFAULT_MAX_OPEN_FILES, force: bool = False,
+                 compression: Optional[Dict[str, Any]] = None):
+        self.base_path = base_path
+        self.formats = formats
+        self.max_open_files = max(1, max_open_files)
+        self.force = force
+        self.compression = compression
+        self._shards: Dict[str, Dict[str, Any]] = {}
+        self._open_files = collections.OrderedDict()
+
+    def shard_path(self, key: str, extension: str) -> str:
+        return f"{self.base_path}_{sanitize_shard_key(key)}.{extension}"
+
+    def _new_shard(self, key: str) -> Dict[str, Any]:
+        shard = {'item_count': 0, 'hash': hashlib.sha256(), 'tmp_paths': {}}
+        for shard_format in self.formats:
+            fd, tmp_path = create_temp_file(self.shard_path(key, shard_format.extension))
+            os.close(fd)
+            shard['tmp_paths'][shard_format.extension] = tmp_path
+        self._shards[key] = shard
+        return shard
+
+    def _get_file(self, key: str, extension: str):
+        """ファイルハンドルを返す。上限を超える場合は最も古いハンドルを閉じる"""
+        handle_key = (key, extension)
+        f = self._open_files.get(handle_key)
+        if f is not None:
+            self._open_files.move_to_end(handle_key)
+            return f
+
+        while len(self._open_files) >= self.max_open_files:
+            _, oldest = self._open_files.popitem(last=False)
+            oldest.close()
+
+        f = open(self._shards[key]['tmp_paths'][extension], 'a', encoding='utf-8')
+        self._open_files[handle_key] = f
+        return f
+
+    def _close_files(self):
+        while self._open_files:
+            _, f = self._open_files.popitem(last=False)
+            f.close()
+
+    def write(self, key: str, item: Dict[str, Any]):
+        """アイテムをシャードに追加する"""
+        shard = self._shards.get(key)
+        is_new = shard is None
+        if is_new:
+            shard = self._new_shard(key)
+
+        for shard_format in self.formats:
+            f = self._get_file(key, shard_format.extension)
+            if is_new:
+                f.write(shard_format.header)
+            f.write(shard_format.render_item(item))
+
+        shard['item_count'] += 1
+        # カテゴリの順序に依存しないよう、正規化したアイテムからハッシュ値を計算する
+        shard['hash'].update(json.dumps(normalize_item(item), ensure_ascii=False, sort_keys=True,
+                                        default=str).encode('utf-8'))
+
+    def _expected_paths(self, paths) -> List[str]:
+        """書き込まれるはずのファイルのパスを返す（圧縮する場合は圧縮ファイルを含む）"""
+        if not self.compression:
+            return list(paths)
+        from output_compression import get_output_paths
+        return [expected for path in paths
+                for expected in get_output_paths(path, self.compression['encodings'], self.compression['keep_plain'])]
+
+    def _commit_file(self, tmp_path: str, path: str):
+        """書き終えた一時ファイルを出力先に移動する（圧縮する場合は圧縮ファイルも書き込む）"""
+        if not self.compression:
+            os.replace(tmp_path, path)
+            return
+
+        from output_compression import write_output_variants
+        try:
+            with open(tmp_path, 'rb') as f:
+                data = f.read()
+            write_output_variants(path, data, self.compression['encodings'],
+                                  self.compression['level'], self.compression['keep_plain'])
+        finally:
+            os.remove(tmp_path)
+
+    def finish(self) -> List[Dict[str, Any]]:
+        """各シャードを確定し、シャードの一覧を返す
+
+        内容のハッシュ値が前回と同じで出力ファイルが揃っている場合は、一時ファイルを破棄する。
+        """
+        self._close_files()
+        shards = []
+        for key in sorted(self._shards):
+            shard = self._shards[key]
+            content_hash = shard['hash'].hexdigest()
+            paths = {shard_format.extension: self.shard_path(key, shard_format.extension)
+                     for shard_format in self.formats}
+            feed_path = paths[self.formats[0].extension]
+            sidecar_path = f"{feed_path}.hash"
+
+            expected_paths = self._expected_paths(paths.values())
+            unchanged = (not self.force
+                         and all(os.path.exists(path) for path in expected_paths)
+                         and _read_text(sidecar_path) == content_hash)
+
+            for shard_format in self.formats:
+                tmp_path = shard['tmp_paths'][shard_format.extension]
+                if unchanged:
+                    os.remove(tmp_path)
+                    continue
+                with open(tmp_path, 'a', encoding='utf-8') as f:
+                    f.write(shard_format.footer)
+                self._commit_file(tmp_path, paths[shard_format.extension])
+
+            if not unchanged:
+                write_file_atomic(sidecar_path, content_hash.encode('utf-8'))
+
+            entry = {
+                'key': key,
+                'item_count': shard['item_count'],
+                'updated': not unchanged,
+                **{f"{extension}_output": path for extension, path in paths.items()},
+            }
+            if self.compression:
+                entry['compressed_outputs'] = [path for path in expected_paths if path not in paths.values()]
+            shards.append(entry)
+
+        self._shards.clear()
+        return shards
+
+    def abort(self):
+        """書きかけの一時ファイルを削除する"""
+        self._close_files()
+        for shard in self._shards.values():
+            for tmp_path in shard['tmp_paths'].values():
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+        self._shards.clear()
+
+def _read_text(path: str) -> Optional[str]:
+    try:
+        with open(path, encoding='utf-8') as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+def get_index_path(base_path: str) -> str:
+    """シャードの一覧ファイルのパスを返す"""
+    return f"{base_path}_index.json"
+
+def _read_index(index_path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(index_path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def remove_stale_shards(base_path: str, previous_index: Optional[Dict[str, Any]], keys: Set[str]) -> List[str]:
+    """前回の一覧にあり、今回のキーにないシャードのファイルを削除する
+
+    一覧に記録されたパスのうち、このシャードの出力先（{base}_で始まるファイル）だけを削除する。
+
+    Returns:
+        削除したシャードのキー
+    """
+    removed = []
+    prefix = os.path.abspath(base_path) + '_'
+    for entry in (previous_index or {}).get('shards', []):
+        if not isinstance(entry, dict) or entry.get('key') in keys:
+            continue
+        paths = [value for name, value in entry.items() if name.endswith('_output') and isinstance(value, str)]
+        paths += [f"{path}.hash" for path in paths]
+        paths += [path for path in entry.get('compressed_outputs', []) if isinstance(path, str)]
+        paths += [f"{path}.json" for path in entry.get('compressed_outputs', []) if isinstance(path, str)]
+        for path in paths:
+            if not os.path.abspath(path).startswith(prefix):
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"古いシャードのファイルを削除できませんでした: {path}: {e}")
+        removed.append(str(entry.get('key')))
+    return removed
+
+def write_shards(
+    items: List[Dict[str, Any]],
+    url: str,
+    shard_by: str,
+    base_path: str,
+    formats: List[ShardFormat],
+    parse_date: Callable[[Any], Optional[datetime.datetime]],
+    max_open_files: int = DEFAULT_MAX_OPEN_FILES,
+    force: bool = False,
+    compression: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """アイテムを1回の走査でシャードに振り分けて出力し、一覧ファイルを書き込む
+
+    前回の一覧にあり今回出力しなかったシャードのファイルは削除する。
+
+    Args:
+        compression: 圧縮出力の設定（encodings、level、keep_plain）。省略時は非圧縮のみ
+
+    Returns:
+        一覧ファイルの内容
+    """
+    shard_keys = build_shard_key_function(shard_by, parse_date)
+    writer = ShardWriter(base_path, formats, max_open_files=max_open_files, force=force, compression=compression)
+    try:
+        for item in items:
+            for key in shard_keys(item):
+                writer.write(key, item)
+        shards = writer.finish()
+    except Exception:
+        writer.abort()
+        raise
+
+    index = {
+        'url': url,
+        'shard_by': shard_by,
+        'generated_at': datetime.datetime.now().isoformat(timespec='seconds'),
+        'shards': shards,
+    }
+    index_path = get_index_path(base_path)
+    previous_index = _read_index(index_path)
+    write_file_atomic(index_path, json.dumps(index, ensure_ascii=False, indent=2).encode('utf-8'))
+
+    removed = remove_stale_shards(base_path, previous_index, {shard['key'] for shard in shards})
+    if removed:
+        logger.info(f"出力されなくなった{len(removed)}件のシャードを削除しました: {', '.join(removed)}")
+
+    updated = sum(1 for shard in shards if shard['updated'])
+    logger.info(f"{len(shards)}件のシャードを出力しました（更新: {updated}件）。一覧: '{index_path}'")
+    return index
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+Last-good item snapshots for stale-while-revalidate
+
+The raw (unfiltered) items of the last good scrape are kept per URL in the
+state directory, one JSON file per URL:
+
+    {
+        'url': 'https://ja.monaca.io/headline/',
+        'saved_at': 1760000000.0,
+        'scraper': 'ja_monaca_io_headline',
+        'items': [...],
+    }
+
+With --stale-while-revalidate the outputs are first produced from the
+snapshot, then a fresh scrape runs (bounded by --url-deadline) and replaces
+the snapshot and the outputs only when it is at least as good: it must meet
+the site's min_items_threshold and have at least as many items as the
+snapshot. A site whose list legitimately shrinks can lower the bar with
+'snapshot_min_ratio' in SITE_CONFIGS (e.g. 0.8); otherwise the smaller list
+is published once the snapshot is older than --stale-max-age.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+import urllib.parse
+from typing import Any, Dict, List, Optional
+
+from scrapers.state import get_state_dir, write_file_atomic
+
+# ロガーの設定
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_DIRECTORY = 'snapshots'
+
+# 新しい取得結果に求める、スナップショットのアイテム数に対する割合の既定値（サイト設定のsnapshot_min_ratioで変更できる）
+DEFAULT_MIN_RETAINED_RATIO = 1.0
+
+def get_snapshot_path(url: str) -> str:
+    """URLのスナップショットのファイルパスを返す（ホスト名とURLのハッシュから作成する）"""
+    host = urllib.parse.urlparse(url).netloc.replace(':', '_') or 'unknown'
+    digest = hashlib.sha1(url.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(get_state_dir(), SNAPSHOT_DIRECTORY, f"{host}_{digest}.json")
+
+def load_snapshot(url: str, max_age: Optional[float] = None,
+                  now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """URLのスナップショットを読み込む
+
+    Args:
+        max_age: これより古い（秒）スナップショットは使用しない
+        now: 現在時刻（UNIX時間、テスト用）
+
+    Returns:
+        スナップショット。存在しない場合、壊れている場合、古すぎる場合はNone
+    """
+    path = get_snapshot_path(url)
+    try:
+        with open(path, encoding='utf-8') as f:
+            snapshot = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"スナップショットの読み込みに失敗しました: {path}: {e}")
+        return None
+
+    if snapshot.get('url') != url or not isinstance(snapshot.get('items'), list):
+        return None
+
+    if max_age is not None and get_snapshot_age(snapshot, now) > max_age:
+        logger.info(f"スナップショットが古いため使用しません: {url}（{get_snapshot_age(snapshot, now):.0f}秒前）")
+        return None
+
+    return snapshot
+
+def save_snapshot(url: str, items: List[Dict[str, Any]], scraper: Optional[str] = None,
+                  now: Optional[float] = None):
+    """URLの取得結果をスナップショットとして保存する"""
+    snapshot = {
+        'url': url,
+        'saved_at': now if now is not None else time.time(),
+        'scraper': scraper,
+        'items': items,
+    }
+    payload = json.dumps(snapshot, ensure_ascii=False, default=str).encode('utf-8')
+    write_file_atomic(get_snapshot_path(url), payload)
+
+def get_snapshot_age(snapshot: Dict[str, Any], now: Optional[float] = None) -> float:
+    """スナップショットの経過時間（秒）を返す"""
+    now = now if now is not None else time.time()
+    return max(0.0, now - snapshot.get('saved_at', 0))
+
+def is_at_least_as_good(items: Optional[List[Dict[str, Any]]], snapshot: Dict[str, Any],
+                        min_items: int = 1, min_ratio: float = DEFAULT_MIN_RETAINED_RATIO) -> bool:
+    """新しい取得結果がスナップショットと同等以上かを判定する
+
+    取得に失敗した場合や最小しきい値を下回る場合は劣るものとする。それ以外は、スナップショットの
+    アイテム数のmin_ratio倍（既定ではスナップショットと同じ数）以上あれば同等以上とする。
+    """
+    if not items or len(items) < max(1, min_items):
+        return False
+    return len(items) >= len(snapshot['items']) * min_ratio
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests for the shared browser helpers that do not need a Chrome install
+"""
+
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from scrapers.browser import build_blocked_url_patterns, summarize_network_events
+from scrapers.config import get_site_config, TYPICAL_RESOURCE_BYTES
+
+def test_blocked_url_patterns():
+    """Denylist patterns and resource types are turned into URL patterns"""
+    policy = get_site_config('https://ja.monaca.io/headline/')['resource_blocking']
+    patterns = build_blocked_url_patterns(policy)
+
+    assert '*googletagmanager.com/*' in patterns
+    assert '*.woff*' in patterns
+    assert len(patterns) == len(set(patterns))
+    assert build_blocked_url_patterns(None) == []
+
+def test_summarize_network_events():
+    """Blocked requests and transferred bytes are counted from DevTools events"""
+    policy = {'warn_if_blocked_patterns': ['*://example.com/*.js*']}
+    events = [
+        {'method': 'Network.requestWillBeSent',
+         'params': {'requestId': '1', 'type': 'Document', 'request': {'url': 'https://example.com/'}}},
+        {'method': 'Network.loadingFinished', 'params': {'requestId': '1', 'encodedDataLength': 1200}},
+        {'method': 'Network.requestWillBeSent',
+         'params': {'requestId': '2', 'type': 'Font', 'request': {'url': 'https://fonts.example.net/a.woff2'}}},
+        {'method': 'Network.loadingFailed',
+         'params': {'requestId': '2', 'type': 'Font', 'errorText': 'net::ERR_BLOCKED_BY_CLIENT', 'blockedReason': 'inspector'}},
+        {'method': 'Network.requestWillBeSent',
+         'params': {'requestId': '3', 'type': 'Script', 'request': {'url': 'https://example.com/app.js'}}},
+        {'method': 'Network.loadingFailed',
+         'params': {'requestId': '3', 'type': 'Script', 'blockedReason': 'inspector'}},
+        {'method': 'Network.loadingFailed',
+         'params': {'requestId': '4', 'type': 'XHR', 'errorText': 'net::ERR_FAILED'}},
+    ]
+
+    stats = summarize_network_events(events, policy)
+
+    assert stats['requests'] == 3
+    assert stats['blocked_requests'] == 2
+    assert stats['transferred_bytes'] == 1200
+    assert stats['estimated_bytes_saved'] == TYPICAL_RESOURCE_BYTES['Font'] + TYPICAL_RESOURCE_BYTES['Script']
+    assert stats['blocked_essential_requests'] == ['https://example.com/app.js']
+
+def test_driver_path_is_cached_until_chrome_changes(monkeypatch, tmp_path):
+    """The resolved ChromeDriver path is reused until the Chrome version changes"""
+    from scrapers import browser
+
+    monkeypatch.setenv('FEED_GENERATOR_STATE_DIR', str(tmp_path))
+    monkeypatch.setattr(browser, 'SYSTEM_CHROMEDRIVER', str(tmp_path / 'missing'))
+    monkeypatch.setattr(browser, '_resolved_driver_path', None)
+
+    driver = tmp_path / 'chromedriver'
+    driver.write_text('')
+    driver.chmod(0o755)
+    installs = []
+    monkeypatch.setattr(browser, 'install_driver', lambda: installs.append(1) or str(driver))
+    version = {'current': '120.0.6099.71'}
+    monkeypatch.setattr(browser, 'get_browser_version', lambda: version['current'])
+
+    assert browser.resolve_driver_path() == str(driver)
+    monkeypatch.setattr(browser, '_resolved_driver_path', None)
+    assert browser.resolve_driver_path() == str(driver)
+    assert len(installs) == 1
+
+    # Chromeが更新された場合は解決し直す
+    version['current'] = '121.0.6167.85'
+    monkeypatch.setattr(browser, '_resolved_driver_path', None)
+    browser.resolve_driver_path()
+    assert len(installs) == 2
+
+    entry = {'path': str(driver), 'browser_version': '1', 'resolved_at': 0}
+    assert not browser.is_driver_entry_valid(entry, '1', now=browser.DRIVER_CACHE_MAX_AGE + 1)
+    assert not browser.is_driver_entry_valid(dict(entry, path=str(tmp_path / 'missing')), '1', now=1)
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests for record/replay cassettes
+"""
+
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import pytest
+import requests
+
+from scrapers import cassette
+from scrapers import fetch
+from scrapers import ja_monaca_io_headline
+
+URL = 'https://example.com/news'
+
+@pytest.fixture(autouse=True)
+def reset_cassette():
+    fetch.reset_host_states()
+    yield
+    cassette.configure()
+    fetch.reset_host_states()
+
+class Session:
+    def __init__(self):
+        self.calls = 0
+
+    def get(self, url, headers=None, **kwargs):
+        self.calls += 1
+        response = requests.Response()
+        response.status_code = 200
+        response.headers['Content-Type'] = 'text/html; charset=utf-8'
+        response.encoding = 'utf-8'
+        response.url = url
+        response._content = 'お知らせ一覧'.encode('utf-8')
+        return response
+
+def test_recorded_responses_are_replayed_offline(monkeypatch, tmp_path):
+    """Recorded HTTP responses and Selenium pages are served without the network or Chrome"""
+    session = Session()
+    monkeypatch.setattr(fetch, 'get_session', lambda: session)
+
+    cassette.configure(record_dir=str(tmp_path))
+    assert fetch.get(URL).text == 'お知らせ一覧'
+    cassette.record_page(URL, 'outer_html', '<div class="headline-entries"></div>')
+
+    cassette.configure(replay_dir=str(tmp_path))
+    response = fetch.get(URL)
+    assert response.text == 'お知らせ一覧'
+    assert response.headers['Content-Type'] == 'text/html; charset=utf-8'
+    assert session.calls == 1
+
+    html = ja_monaca_io_headline.scrape_with_selenium(URL, extract={'mode': 'outer_html'})
+    assert html == '<div class="headline-entries"></div>'
+
+    # 記録されていないリクエストはネットワークエラーと同様に扱う
+    with pytest.raises(requests.RequestException):
+        fetch.get('https://example.com/other')
+    assert ja_monaca_io_headline.scrape_with_selenium(URL) is None
+
+def test_replay_uses_scratch_state(monkeypatch, tmp_path):
+    """Replay never reads or writes the real state directory, and each replay starts empty"""
+    from scrapers import state
+
+    real_state = tmp_path / 'state'
+    monkeypatch.setenv('FEED_GENERATOR_STATE_DIR', str(real_state))
+    state.set_entry('feed_sources', URL, {'type': 'rss', 'url': 'https://example.com/feed.xml'})
+
+    cassette.configure(replay_dir=str(tmp_path))
+    scratch = state.get_state_dir()
+    assert scratch != str(real_state)
+    assert state.get_entry('feed_sources', URL) is None
+    state.set_entry('seen_guids', URL, ['a'])
+
+    cassette.configure(replay_dir=str(tmp_path))
+    assert state.get_entry('seen_guids', URL) is None
+    assert not os.path.exists(scratch)
+
+    cassette.configure()
+    assert state.get_state_dir() == str(real_state)
+    assert state.get_entry('feed_sources', URL)['type'] == 'rss'
+    assert state.get_entry('seen_guids', URL) is None
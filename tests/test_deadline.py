@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests for deadline budgets
+"""
+
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import pytest
+import requests
+
+from scrapers import deadline
+from scrapers import fetch
+
+@pytest.fixture
+def fake_clock(monkeypatch):
+    clock = {'now': 0.0, 'sleeps': []}
+
+    def sleep(seconds):
+        clock['sleeps'].append(seconds)
+        clock['now'] += seconds
+
+    monkeypatch.setattr(deadline, '_clock', lambda: clock['now'])
+    monkeypatch.setattr(fetch, '_clock', lambda: clock['now'])
+    monkeypatch.setattr(fetch, '_sleep', sleep)
+    fetch.reset_host_states()
+    yield clock
+    fetch.reset_host_states()
+
+def test_nested_scope_never_extends_outer_deadline(fake_clock):
+    """An inner scope is capped by the outer one, and timeouts are clamped to what is left"""
+    assert deadline.remaining() is None
+    assert deadline.clamp(30) == 30
+
+    with deadline.deadline_scope(10):
+        with deadline.deadline_scope(60):
+            assert deadline.remaining() == 10
+        with deadline.deadline_scope(None):
+            assert deadline.remaining() == 10
+
+        fake_clock['now'] = 7
+        assert deadline.clamp(30) == 3
+        assert deadline.clamp(30, reserve=1) == 2
+        assert deadline.has_time_for(3) and not deadline.has_time_for(4)
+
+        fake_clock['now'] = 12
+        assert deadline.expired()
+        with pytest.raises(deadline.DeadlineExceeded):
+            deadline.check('stage')
+
+    assert deadline.remaining() is None
+
+def test_fetch_does_not_retry_past_deadline(monkeypatch, fake_clock):
+    """A retry whose back-off does not fit in the budget is not attempted"""
+    calls = []
+
+    class Session:
+        def get(self, url, headers=None, timeout=None, **kwargs):
+            calls.append(timeout)
+            response = requests.Response()
+            response.status_code = 503
+            response.headers['Retry-After'] = '5'
+            return response
+
+    monkeypatch.setattr(fetch, 'get_session', lambda: Session())
+
+    with deadline.deadline_scope(3):
+        with pytest.raises(requests.HTTPError):
+            fetch.get('https://a.example.com/news')
+
+    assert calls == [3]
+    assert fake_clock['sleeps'] == []
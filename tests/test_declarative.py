@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests for declarative site definitions and the host index of site configs
+"""
+
+import sys
+import os
+import json
+import argparse
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import pytest
+from bs4 import BeautifulSoup
+
+import main
+from scrapers import config
+from scrapers import declarative
+
+URL = 'https://news.example.com/info/'
+
+HTML = """
+<ul class="news">
+  <li><span class="date">2025.10.06</span><span class="badge">重要</span>
+      <a href="/info/1">サービス終了のお知らせ</a></li>
+  <li><span class="date">2025.10.01</span><a href="/info/2">新機能のご案内</a></li>
+</ul>
+"""
+
+@pytest.fixture
+def site(monkeypatch, tmp_path):
+    """一時的なサイト定義を登録する"""
+    monkeypatch.setattr(config, 'SITE_CONFIGS', dict(config.SITE_CONFIGS))
+    path = tmp_path / 'sites.json'
+    path.write_text(json.dumps({'sites': [{
+        'url': URL,
+        'extraction': {
+            'entry': 'ul.news li',
+            'date': '.date',
+            'title': 'a',
+            'category': '.badge',
+            'date_formats': ['%Y.%m.%d'],
+            'keywords': {'終了': 'Shutdown', 'サービス終了': 'Shutdown', '新機能': 'Feature'},
+        },
+    }]}), encoding='utf-8')
+    assert declarative.load_site_definitions(str(path)) == [URL]
+    return URL
+
+def test_host_index_lookup(site):
+    """Configs are found by host and path prefix, most specific path first"""
+    assert config.get_site_key('https://ja.monaca.io/headline/?page=2') == 'https://ja.monaca.io/headline/'
+    assert config.get_site_key('https://ja.monaca.io') == 'https://ja.monaca.io/headline/'
+    assert config.get_site_key('https://news.example.com/info/2025') == URL
+    assert config.get_site_key('https://news.example.com/blog/') is None
+    assert config.get_site_config('https://news.example.com/info/')['min_items_threshold'] == 1
+    assert URL in main.get_target_urls()
+
+def test_plan_extracts_items(site):
+    """The compiled plan reads the fields, converts dates and applies the keyword table"""
+    plan = declarative.get_plan(URL)
+    assert declarative.get_plan(URL) is plan
+
+    items = declarative.extract_items(plan, BeautifulSoup(HTML, 'html.parser'), URL)
+    assert [item['title'] for item in items] == ['サービス終了のお知らせ', '新機能のご案内']
+    assert items[0]['link'] == 'https://news.example.com/info/1'
+    assert items[0]['pubDate'] == 'Mon, 06 Oct 2025 00:00:00 +0000'
+    assert items[0]['categories'] == ['重要', 'Shutdown']
+    assert items[1]['categories'] == ['Feature']
+
+def test_declarative_scraper_is_loaded(site):
+    """Sites with a definition and no scraper module use the declarative scraper"""
+    module = main.load_scraper_module(URL, os.path.join(os.path.dirname(__file__), '..', 'src'))
+    assert module is declarative
+
+def test_invalid_definition_is_rejected():
+    with pytest.raises(ValueError):
+        declarative.compile_plan({'entry': 'li', 'fetch': 'ftp'})
+    with pytest.raises(ValueError):
+        declarative.compile_plan({'title': 'a'})
+
+def test_selenium_site_renders_through_browser_and_is_prewarmed(monkeypatch, tmp_path):
+    """fetch='selenium' uses the shared browser helper and counts as a browser site for pre-warming"""
+    monkeypatch.setenv('FEED_GENERATOR_STATE_DIR', str(tmp_path / 'state'))
+    monkeypatch.setattr(config, 'SITE_CONFIGS', dict(config.SITE_CONFIGS))
+    path = tmp_path / 'sites.json'
+    path.write_text(json.dumps({'sites': [{
+        'url': URL,
+        'extraction': {'fetch': 'selenium', 'container': 'ul.news', 'entry': 'ul.news li', 'title': 'a'},
+    }]}), encoding='utf-8')
+    declarative.load_site_definitions(str(path))
+
+    calls = []
+    monkeypatch.setattr(declarative.browser, 'render_page', lambda url, **kwargs: calls.append(kwargs) or HTML)
+    assert declarative.fetch_html(URL, declarative.get_plan(URL)) == HTML
+    assert calls[0]['extract'] == {'mode': 'outer_html', 'container': 'ul.news'}
+
+    prewarmed = []
+    monkeypatch.setattr(main.browser, 'set_keep_alive', lambda enabled: None)
+    monkeypatch.setattr(main.browser, 'prewarm', lambda **kwargs: prewarmed.append(kwargs) or True)
+    args = argparse.Namespace(reprocess=False, lambda_optimized=False, debug=False, debug_selenium=False)
+    static_url = 'https://example.org/news'
+    assert main.start_browser_prewarm([URL, static_url], args) == [static_url, URL]
+    assert len(prewarmed) == 1
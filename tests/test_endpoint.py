@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests for data endpoint discovery without a browser
+"""
+
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from scrapers import endpoint
+from scrapers.ja_monaca_io_headline import items_from_records
+
+PAYLOAD = {
+    'status': 'ok',
+    'data': {
+        'entries': [
+            {
+                'id': 1,
+                'published_at': '2025-10-15',
+                'type': {'label': '重要'},
+                'body': '<p>Monaca のメンテナンスを実施します。ご注意ください。</p>',
+                'permalink': '/headline/1',
+            },
+            {
+                'id': 2,
+                'published_at': '2025-09-01',
+                'type': {'label': 'リリース'},
+                'body': '<p>新しいバージョンをリリースしました。詳細はこちら。</p>',
+                'permalink': '/headline/2',
+            },
+        ]
+    }
+}
+
+HTML_ITEMS = [
+    {'description': 'Monaca のメンテナンスを実施します。ご注意ください。', 'categories': ['重要', 'Maintenance']},
+    {'description': '新しいバージョンをリリースしました。詳細はこちら。', 'categories': ['リリース', 'Release']},
+]
+
+def test_discover_mapping():
+    """The JSON list carrying the rendered items is found and its fields are mapped"""
+    responses = [
+        ('https://ja.monaca.io/api/config', {'features': [{'name': 'x', 'enabled': True}]}),
+        ('https://ja.monaca.io/api/headlines', PAYLOAD),
+    ]
+    mapping = endpoint.discover_mapping(responses, HTML_ITEMS, min_matches=2)
+
+    assert mapping['url'] == 'https://ja.monaca.io/api/headlines'
+    assert mapping['items_path'] == ['data', 'entries']
+    assert mapping['fields']['content'] == 'body'
+    assert mapping['fields']['date'] == 'published_at'
+    assert mapping['fields']['category'] == 'type.label'
+    assert mapping['fields']['link'] == 'permalink'
+
+def test_no_matching_response():
+    """No mapping is produced when no response carries the items"""
+    responses = [('https://ja.monaca.io/api/config', {'features': [{'name': 'x'}]})]
+    assert endpoint.discover_mapping(responses, HTML_ITEMS) is None
+
+def test_records_to_items():
+    """Records extracted with a mapping become feed items"""
+    mapping = {
+        'items_path': ['data', 'entries'],
+        'fields': {'content': 'body', 'date': 'published_at', 'category': 'type.label', 'link': 'permalink'},
+    }
+    records = endpoint.extract_records(PAYLOAD, mapping)
+    items = items_from_records(records, 'https://ja.monaca.io/headline/')
+
+    assert len(items) == 2
+    assert items[0]['description'] == 'Monaca のメンテナンスを実施します。ご注意ください。'
+    assert items[0]['link'] == 'https://ja.monaca.io/headline/1'
+    assert items[0]['pubDate'].startswith('Wed, 15 Oct 2025')
+    assert '重要' in items[0]['categories']
+
+def test_saved_endpoint_roundtrip(tmp_path, monkeypatch):
+    """Discovered endpoints are persisted in the state directory"""
+    monkeypatch.setenv('FEED_GENERATOR_STATE_DIR', str(tmp_path))
+    url = 'https://example.com/headline/'
+    mapping = {'url': 'https://example.com/api', 'items_path': [], 'fields': {'content': 'body'}}
+
+    endpoint.save_endpoint(url, mapping)
+    assert endpoint.get_endpoint(url) == mapping
+
+    endpoint.save_endpoint(url, None)
+    assert endpoint.get_endpoint(url) is None
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests for retries, rate limiting and the circuit breaker in the fetch layer
+"""
+
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import pytest
+import requests
+
+from scrapers import fetch
+
+def make_response(status, headers=None):
+    response = requests.Response()
+    response.status_code = status
+    response.headers.update(headers or {})
+    response._content = b''
+    return response
+
+class FakeSession:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    def get(self, url, headers=None, **kwargs):
+        self.calls += 1
+        result = self.responses.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+@pytest.fixture
+def fake_clock(monkeypatch):
+    clock = {'now': 0.0, 'sleeps': []}
+
+    def sleep(seconds):
+        clock['sleeps'].append(seconds)
+        clock['now'] += seconds
+
+    monkeypatch.setattr(fetch, '_sleep', sleep)
+    monkeypatch.setattr(fetch, '_clock', lambda: clock['now'])
+    fetch.reset_host_states()
+    yield clock
+    fetch.reset_host_states()
+
+def test_retries_honour_retry_after(monkeypatch, fake_clock):
+    """429/5xx are retried, waiting for Retry-After when given"""
+    session = FakeSession([make_response(429, {'Retry-After': '7'}), requests.ConnectionError('reset'),
+                           make_response(200)])
+    monkeypatch.setattr(fetch, 'get_session', lambda: session)
+
+    assert fetch.get('https://a.example.com/news').status_code == 200
+    assert session.calls == 3
+    assert fake_clock['sleeps'][0] == 7
+    assert 0 <= fake_clock['sleeps'][1] <= fetch.DEFAULT_FETCH_POLICY['backoff_base'] * 2
+
+def test_client_errors_are_not_retried(monkeypatch, fake_clock):
+    """404 is raised immediately"""
+    session = FakeSession([make_response(404)])
+    monkeypatch.setattr(fetch, 'get_session', lambda: session)
+
+    with pytest.raises(requests.HTTPError):
+        fetch.get('https://a.example.com/missing')
+    assert session.calls == 1
+
+def test_circuit_breaker_skips_failing_host(monkeypatch, fake_clock):
+    """After repeated failures the host is skipped until the cool-down has passed"""
+    session = FakeSession([make_response(503)] * 5 + [make_response(200)])
+    monkeypatch.setattr(fetch, 'get_session', lambda: session)
+    monkeypatch.setitem(fetch.DEFAULT_FETCH_POLICY, 'max_retries', 10)
+
+    with pytest.raises(requests.HTTPError):
+        fetch.get('https://down.example.com/')
+    assert session.calls == 5
+
+    with pytest.raises(fetch.CircuitOpenError):
+        fetch.get('https://down.example.com/')
+    assert session.calls == 5
+
+    fake_clock['now'] += fetch.DEFAULT_FETCH_POLICY['cooldown'] + 1
+    assert fetch.get('https://down.example.com/').status_code == 200
+
+def test_rate_limit_spaces_requests(monkeypatch, fake_clock):
+    """requests_per_second spaces out requests to the same host"""
+    session = FakeSession([make_response(200)] * 3)
+    monkeypatch.setattr(fetch, 'get_session', lambda: session)
+    monkeypatch.setitem(fetch.DEFAULT_FETCH_POLICY, 'requests_per_second', 2.0)
+
+    for _ in range(3):
+        fetch.get('https://slow.example.com/')
+    assert fake_clock['sleeps'] == [0.5, 0.5]
+
+def test_half_open_trial_is_released_on_any_error(monkeypatch, fake_clock):
+    """Errors other than connection errors still count as failures and end the half-open trial"""
+    session = FakeSession([make_response(503)] * 5 + [requests.exceptions.ChunkedEncodingError('broken'),
+                                                      ValueError('bad timeout'), make_response(200)])
+    monkeypatch.setattr(fetch, 'get_session', lambda: session)
+    monkeypatch.setitem(fetch.DEFAULT_FETCH_POLICY, 'max_retries', 10)
+
+    with pytest.raises(requests.HTTPError):
+        fetch.get('https://flaky.example.com/')
+
+    fake_clock['now'] += fetch.DEFAULT_FETCH_POLICY['cooldown'] + 1
+    with pytest.raises(requests.exceptions.ChunkedEncodingError):
+        fetch.get('https://flaky.example.com/')
+
+    fake_clock['now'] += fetch.DEFAULT_FETCH_POLICY['cooldown'] + 1
+    with pytest.raises(ValueError):
+        fetch.get('https://flaky.example.com/')
+    assert fetch.get('https://flaky.example.com/').status_code == 200
+
+def test_no_request_without_time_left(monkeypatch, fake_clock):
+    """A deadline with no time left raises instead of sending a request with timeout=0"""
+    from scrapers import deadline
+
+    session = FakeSession([make_response(200)] * 2)
+    monkeypatch.setattr(fetch, 'get_session', lambda: session)
+    monkeypatch.setattr(deadline, '_clock', lambda: fake_clock['now'])
+    monkeypatch.setitem(fetch.DEFAULT_FETCH_POLICY, 'requests_per_second', 0.1)
+
+    with deadline.deadline_scope(5.0):
+        fetch.get('https://slow.example.com/')
+        with pytest.raises(deadline.DeadlineExceeded):
+            fetch.get('https://slow.example.com/')
+    assert session.calls == 1 and fake_clock['sleeps'] == []
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests for the generic scraper
+"""
+
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from bs4 import BeautifulSoup
+
+from scrapers import generic
+
+SELECTOR = 'article, .news-item, .notice, .announcement, .post, .entry, div[class*="news"], div[class*="notice"], div[class*="announcement"]'
+
+HTML = """
+<div class="news-list">
+  <div class="news-item"><article><h3>First</h3><time>2025-10-01</time><a href="/1">more</a></article></div>
+  <article><h3>Second</h3><span class="post-date">2025-09-01</span><!-- note --><a href="/2">more</a></article>
+  <div class="notice"><p>Standalone notice 2025-08-01</p></div>
+</div>
+"""
+
+def test_nested_matches_are_deduplicated():
+    """Containers are dropped and single-child wrappers absorb their inner match"""
+    soup = BeautifulSoup(HTML, 'html.parser')
+    elements = generic.dedupe_nested(soup.select(SELECTOR))
+
+    assert [element.name for element in elements] == ['div', 'article', 'div']
+    assert elements[0].get('class') == ['news-item']
+
+def test_wrapper_around_list_is_dropped():
+    """A wrapper around a list of items is a container even though it holds a single matched list"""
+    html = ('<div class="news-section"><div class="news-list">'
+            '<article>A</article><article>B</article></div></div>')
+    soup = BeautifulSoup(html, 'html.parser')
+    elements = generic.dedupe_nested(soup.select(SELECTOR))
+
+    assert [element.get_text() for element in elements] == ['A', 'B']
+
+def test_single_traversal_matches_selectors():
+    """extract_fields returns what select_one/get_text would return"""
+    soup = BeautifulSoup(HTML, 'html.parser')
+    for element in soup.select(SELECTOR):
+        fields = generic.extract_fields(element)
+        assert fields['content'] == element.get_text(strip=True)
+        assert fields['title_element'] is element.select_one('h1, h2, h3, h4, .title, [class*="title"]')
+        assert fields['date_element'] is element.select_one('time, .date, [class*="date"], .time, [class*="time"]')
+        assert fields['link_element'] is element.select_one('a')
+
+TEMPLATE_HTML = """
+<html><body>
+<nav><ul><li><a href="/">Home</a></li><li><a href="/about">About</a></li></ul></nav>
+<div class="updates">
+  <ul>
+    <li class="row"><span>2025/10/01</span><h3><a href="/n/3">Third release</a></h3></li>
+    <li class="row"><span>2025/09/15</span><h3><a href="/n/2">Second release</a></h3></li>
+    <li class="row"><span>2025/09/01</span><h3><a href="/n/1">First release</a></h3></li>
+  </ul>
+</div>
+</body></html>
+"""
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, text):
+        self.text = text
+
+def test_template_is_learned_once_and_reused(monkeypatch, tmp_path):
+    """The repeating block is learned, cached per site path and reused on later runs"""
+    monkeypatch.setenv('FEED_GENERATOR_STATE_DIR', str(tmp_path))
+    monkeypatch.setattr(generic.fetch, 'get', lambda url, headers=None: FakeResponse(TEMPLATE_HTML))
+
+    items = generic.scrape('https://vendor.example.com/news')
+    assert [item['title'] for item in items] == ['Third release', 'Second release', 'First release']
+    assert items[0]['link'] == 'https://vendor.example.com/n/3'
+
+    cached = generic.template.get_template('https://vendor.example.com/news/?page=2')
+    assert cached['item_selector'] == 'div.updates > ul > li.row'
+    assert generic.template.get_template('https://vendor.example.com/other') is None
+
+    calls = []
+    monkeypatch.setattr(generic.template, 'learn_template', lambda *args, **kwargs: calls.append(1))
+    assert len(generic.scrape('https://vendor.example.com/news')) == 3
+    assert calls == []
+
+def test_blocks_without_headings_are_not_learned(monkeypatch, tmp_path):
+    """Blocks whose title would fall back to the text are not saved, and the failure is cached"""
+    monkeypatch.setenv('FEED_GENERATOR_STATE_DIR', str(tmp_path))
+    html = TEMPLATE_HTML.replace('<h3>', '').replace('</h3>', '')
+    soup = BeautifulSoup(html, 'html.parser')
+    has_date = lambda text: generic.extract_date(text) != "不明"
+    has_title = lambda element: generic.extract_fields(element)['title_element'] is not None
+
+    url = 'https://vendor.example.com/news'
+    assert generic.template.select_with_template(url, soup, has_date, has_title=has_title) is None
+    assert generic.template.get_template(url)['item_selector'] is None
+
+    calls = []
+    original = generic.template.learn_template
+    monkeypatch.setattr(generic.template, 'learn_template', lambda *args, **kwargs: calls.append(1) or original(*args, **kwargs))
+    assert generic.template.select_with_template(url, soup, has_date, has_title=has_title) is None
+    assert calls == []
+
+    # 有効期間を過ぎた記録は無視して再学習する
+    generic.template.save_template(url, {'item_selector': None, 'learned_at': '2000-01-01T00:00:00'})
+    assert generic.template.select_with_template(url, soup, has_date, has_title=has_title) is None
+    assert calls == [1]
+
+RSS = """<?xml version="1.0"?>
+<rss version="2.0"><channel><title>News</title>
+<item><title>Release 2</title><link>/n/2</link><description><![CDATA[<p>Second</p>]]></description>
+<pubDate>Tue, 07 Oct 2025 00:00:00 +0000</pubDate><category>Release</category><guid>n-2</guid></item>
+</channel></rss>"""
+
+ATOM = """<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom"><title>News</title>
+<entry><title>Deprecation notice</title><link href="https://vendor.example.com/n/9"/>
+<id>tag:vendor,9</id><updated>2025-10-08T09:00:00Z</updated><summary>API v1 is deprecated</summary></entry>
+</feed>"""
+
+def test_published_feed_is_used_and_remembered(monkeypatch, tmp_path):
+    """A <link rel=alternate> feed is parsed, and later runs fetch only the feed"""
+    monkeypatch.setenv('FEED_GENERATOR_STATE_DIR', str(tmp_path))
+    page = ('<html><head><link rel="alternate" type="application/rss+xml" href="/feed.xml"></head>'
+            '<body><a href="/n/2">Release 2</a></body></html>')
+    documents = {'https://vendor.example.com/news': page, 'https://vendor.example.com/feed.xml': RSS}
+    fetched = []
+
+    def fake_get(url, headers=None):
+        fetched.append(url)
+        response = FakeResponse(documents[url])
+        response.content = documents[url].encode('utf-8')
+        return response
+
+    monkeypatch.setattr(generic.fetch, 'get', fake_get)
+    items = generic.scrape('https://vendor.example.com/news')
+    assert items[0]['title'] == 'Release 2'
+    assert items[0]['description'] == 'Second'
+    assert items[0]['link'] == 'https://vendor.example.com/n/2'
+    assert items[0]['guid'] == 'n-2'
+
+    fetched.clear()
+    assert len(generic.scrape('https://vendor.example.com/news')) == 1
+    assert fetched == ['https://vendor.example.com/feed.xml']
+
+def test_unrelated_feed_is_not_used(monkeypatch, tmp_path):
+    """A site-wide feed whose items are neither linked from nor below the page is ignored"""
+    monkeypatch.setenv('FEED_GENERATOR_STATE_DIR', str(tmp_path))
+    page = BeautifulSoup('<html><body><a href="/support/releases/1">Release 1</a></body></html>', 'html.parser')
+    url = 'https://vendor.example.com/support/releases'
+
+    unrelated = [{'link': 'https://vendor.example.com/blog/hello'}]
+    assert not generic.feed_discovery.feed_matches_page(unrelated, page, url)
+    assert generic.feed_discovery.feed_matches_page([{'link': 'https://vendor.example.com/support/releases/2'}], page, url)
+
+    monkeypatch.setattr(generic.feed_discovery, 'discover_feed_links',
+                        lambda soup, base_url: [{'type': 'rss', 'url': 'https://vendor.example.com/blog/feed.xml'}])
+    monkeypatch.setattr(generic.feed_discovery, 'fetch_feed', lambda *args, **kwargs: unrelated)
+    assert generic.feed_discovery.scrape_discovered_sources(url, page, generic.detect_categories) is None
+    assert generic.feed_discovery.get_feed_source(url) is None
+
+def test_atom_and_jsonld_parsing():
+    """Atom entries and ItemList JSON-LD become items with RSS-style dates"""
+    items = generic.feed_discovery.parse_feed(ATOM, 'https://vendor.example.com/', generic.detect_categories)
+    assert items[0]['pubDate'] == 'Wed, 08 Oct 2025 09:00:00 +0000'
+    assert 'Deprecated' in items[0]['categories']
+
+    page = """<script type="application/ld+json">{"@type": "ItemList", "itemListElement": [
+        {"@type": "ListItem", "item": {"@type": "NewsArticle", "headline": "A", "url": "/a", "datePublished": "2025-10-01"}},
+        {"@type": "ListItem", "item": {"@type": "NewsArticle", "headline": "B", "url": "/b"}}]}</script>"""
+    soup = BeautifulSoup(page, 'html.parser')
+    items = generic.feed_discovery.parse_jsonld(soup, 'https://vendor.example.com/news', generic.detect_categories)
+    assert [item['link'] for item in items] == ['https://vendor.example.com/a', 'https://vendor.example.com/b']
+    assert items[0]['pubDate'] == 'Wed, 01 Oct 2025 00:00:00 +0000'
+    assert items[1]['pubDate'] == '不明'
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests for deterministic item GUIDs
+"""
+
+import sys
+import os
+import subprocess
+
+# Add src to path
+SRC_DIR = os.path.join(os.path.dirname(__file__), '..', 'src')
+sys.path.insert(0, SRC_DIR)
+
+from scrapers.guid import stable_guid
+from scrapers.ja_monaca_io_headline import build_item
+
+def test_guid_is_deterministic():
+    """The same inputs give the same GUID; whitespace and width variants are normalised"""
+    link = 'https://ja.monaca.io/headline/1'
+    assert stable_guid(link, '2025-10-15', 'メンテナンス  のお知らせ') == \
+        stable_guid(link, '2025-10-15', 'メンテナンス のお知らせ ')
+    assert stable_guid(link, 'ＡＢＣ') == stable_guid(link, 'ABC')
+    assert stable_guid(link, 'ab', 'c') != stable_guid(link, 'a', 'bc')
+    assert stable_guid(link, 'x').startswith(link + '#')
+
+def test_guid_is_process_independent():
+    """GUIDs do not depend on Python's per-process hash randomisation"""
+    code = (
+        "import sys; sys.path.insert(0, %r);"
+        "from scrapers.ja_monaca_io_headline import build_item;"
+        "print(build_item('2025年10月15日', '重要', 'メンテナンスのお知らせ', '', 'https://ja.monaca.io/headline/1')['guid'])"
+    ) % os.path.abspath(SRC_DIR)
+
+    guids = set()
+    for seed in ('1', '2'):
+        env = dict(os.environ, PYTHONHASHSEED=seed)
+        output = subprocess.run([sys.executable, '-c', code], env=env, capture_output=True, text=True, check=True)
+        guids.add(output.stdout.strip())
+
+    assert len(guids) == 1
+    assert guids == {build_item('2025年10月15日', '重要', 'メンテナンスのお知らせ', '',
+                                'https://ja.monaca.io/headline/1')['guid']}
+
+def test_monaca_guid_is_independent_of_source():
+    """The endpoint record and the rendered HTML of one announcement give the same GUID"""
+    from scrapers.ja_monaca_io_headline import items_from_records, parse_html_content
+
+    url = 'https://ja.monaca.io/headline/'
+    record = {'date': '2025-10-15T09:00:00', 'category': '重要', 'content': 'メンテナンス の お知らせ',
+              'link': '/headline/1?ref=api'}
+    html = ('<div class="headline-entries"><div class="headline-entry">'
+            '<span class="headline-entry-date">2025年10月15日</span>'
+            '<span class="headline-entry-type-badge">重要</span>'
+            '<div class="headline-entry-content"><a href="https://ja.monaca.io/headline/1">メンテナンスのお知らせ</a></div>'
+            '</div></div>')
+
+    from_endpoint = items_from_records([record], url)[0]
+    patterns = [{'entry': '.headline-entry', 'date': '.headline-entry-date',
+                 'category': '.headline-entry-type-badge', 'content': '.headline-entry-content', 'title': None}]
+    from_html = parse_html_content(html, url, patterns)[0]
+    assert from_endpoint['pubDate'] == from_html['pubDate']
+    assert from_endpoint['guid'] == from_html['guid']
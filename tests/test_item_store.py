@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests for the raw item store and the reprocess subcommand
+"""
+
+import sys
+import os
+import datetime
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import main
+import item_store
+
+URL = 'https://example.com/news'
+
+def make_item(number, date):
+    return {
+        'title': f'お知らせ{number}',
+        'description': f'お知らせ{number}の本文',
+        'link': f'https://example.com/news/{number}',
+        'pubDate': date,
+        'categories': ['Other'],
+        'guid': f'https://example.com/news/{number}',
+    }
+
+def test_runs_are_merged_newest_first(tmp_path):
+    """Stored runs are read newest first, de-duplicated by GUID, and runs before since are skipped"""
+    store = str(tmp_path)
+    item_store.save_run(store, URL, [make_item(1, 'Wed, 01 Oct 2025 00:00:00 +0000')],
+                        scraped_at=datetime.datetime(2025, 10, 1))
+    item_store.save_run(store, URL, [make_item(2, 'Fri, 10 Oct 2025 00:00:00 +0000'),
+                                     dict(make_item(1, 'Wed, 01 Oct 2025 00:00:00 +0000'), title='更新後')],
+                        scraped_at=datetime.datetime(2025, 10, 10))
+
+    items = item_store.load_items(store, URL)
+    assert [item['title'] for item in items] == ['お知らせ2', '更新後']
+    assert len(item_store.load_items(store, URL, since='2025-10-05')) == 2
+    assert item_store.load_items(store, URL, since='2025-10-11') is None
+    assert item_store.load_items(store, 'https://example.com/other') is None
+
+    item_store.save_run(store, URL, [], scraped_at=datetime.datetime(2025, 10, 11), max_runs=2)
+    assert len(item_store.list_runs(store, URL)) == 2
+
+def test_reprocess_writes_outputs_without_scraping(monkeypatch, tmp_path):
+    """reprocess filters the stored items and writes the outputs without loading a scraper"""
+    store = str(tmp_path / 'store')
+    item_store.save_run(store, URL, [make_item(1, 'Wed, 01 Oct 2025 00:00:00 +0000'),
+                                     make_item(2, 'Fri, 10 Oct 2025 00:00:00 +0000')])
+
+    def no_scraping(*args, **kwargs):
+        raise AssertionError('スクレイパーを読み込んではいけない')
+    monkeypatch.setattr(main, 'load_scraper_module', no_scraping)
+
+    feed = str(tmp_path / 'feed.xml')
+    args = main.parse_args(['reprocess', URL, '--item-store', store, '--feed-output', feed,
+                            '--csv-output', str(tmp_path / 'feed.csv'), '--since', '2025-10-05'])
+    assert args.reprocess and args.url == URL
+    assert main.process_url(URL, args, str(tmp_path)) is True
+
+    with open(feed, encoding='utf-8') as f:
+        text = f.read()
+    assert 'お知らせ2' in text and 'お知らせ1' not in text
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests for the AWS Lambda handler using a fake event and context
+"""
+
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import lambda_handler
+from lambda_handler import handler, LocalContext
+
+SAMPLE_ITEMS = [
+    {
+        'title': '重要なお知らせ',
+        'description': 'メンテナンスのお知らせ',
+        'link': 'https://example.com/news/1',
+        'pubDate': 'Mon, 06 Oct 2025 00:00:00 +0000',
+        'categories': ['Important'],
+        'guid': 'https://example.com/news/1#1',
+    },
+    {
+        'title': 'リリースノート',
+        'description': '新機能を追加しました',
+        'link': 'https://example.com/news/2',
+        'pubDate': 'Wed, 01 Jan 2025 00:00:00 +0000',
+        'categories': ['Release'],
+        'guid': 'https://example.com/news/2#2',
+    },
+]
+
+def fake_scrape_url(url, args, script_dir):
+    assert args.lambda_optimized is True
+    return list(SAMPLE_ITEMS)
+
+def test_inline_output(monkeypatch):
+    """Inline output returns feed and CSV in the response"""
+    monkeypatch.setattr(lambda_handler.feed_main, 'scrape_url', fake_scrape_url)
+
+    event = {'urls': ['https://example.com/news'], 'since': '2025-06-01'}
+    response = handler(event, LocalContext())
+
+    assert response['statusCode'] == 200
+    result = response['results'][0]
+    assert result['item_count'] == 1
+    assert '<title>重要なお知らせ</title>' in result['feed']
+    assert 'リリースノート' not in result['csv']
+
+def test_local_output(monkeypatch, tmp_path):
+    """Local output writes files to the configured directory"""
+    monkeypatch.setattr(lambda_handler.feed_main, 'scrape_url', fake_scrape_url)
+
+    event = {
+        'urls': 'https://example.com/news',
+        'output': {'type': 'local', 'directory': str(tmp_path)},
+    }
+    response = handler(event, LocalContext())
+
+    result = response['results'][0]
+    assert os.path.exists(result['feed_output'])
+    assert os.path.exists(result['csv_output'])
+    assert 'feed' not in result
+
+def test_failed_scrape_is_reported(monkeypatch):
+    """A URL whose scrape fails is reported without aborting the invocation"""
+    monkeypatch.setattr(lambda_handler.feed_main, 'scrape_url', lambda url, args, script_dir: None)
+
+    response = handler({'urls': ['https://example.com/news']}, LocalContext())
+
+    assert response['statusCode'] == 207
+    assert response['results'][0]['status'] == 'error'
+
+def test_output_errors_are_reported_per_url(monkeypatch):
+    """A URL whose output cannot be written is reported and the next URL is still processed"""
+    monkeypatch.setattr(lambda_handler.feed_main, 'scrape_url', fake_scrape_url)
+
+    def write_output(output, filename, data):
+        if filename.startswith('example.com_broken'):
+            raise OSError('No space left on device')
+        return f'/tmp/{filename}'
+    monkeypatch.setattr(lambda_handler, 'write_output', write_output)
+
+    event = {'urls': ['https://example.com/broken', 'https://example.com/news'], 'output': {'type': 'local'}}
+    response = handler(event, LocalContext())
+
+    assert response['statusCode'] == 207
+    failed, succeeded = response['results']
+    assert failed['status'] == 'error'
+    assert failed['report']['output_error'] == 'No space left on device'
+    assert succeeded['status'] == 'ok'
+
+def test_warm_reuse_enabled_on_first_invocation(monkeypatch):
+    """The driver is kept alive across invocations once the handler has run, not on import"""
+    monkeypatch.setattr(lambda_handler.feed_main, 'scrape_url', fake_scrape_url)
+    monkeypatch.setattr(lambda_handler, '_cold_start', True)
+    monkeypatch.setattr(lambda_handler.browser, '_keep_alive', False)
+
+    handler({'urls': ['https://example.com/news']}, LocalContext())
+
+    assert lambda_handler.browser._keep_alive is True
+    assert lambda_handler._cold_start is False
+    assert LocalContext(timeout_seconds=10).get_remaining_time_in_millis() <= 10000
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests for the combined multi-source feed
+"""
+
+import datetime
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import main
+from merge import merge_item_streams
+
+def item(guid, day):
+    return {'guid': guid, 'title': guid, 'pubDate': f'{day:02d} Oct 2025' if day else None}
+
+def parse(value):
+    return datetime.datetime.strptime(value, '%d %b %Y') if value else None
+
+def test_merge_orders_newest_first_and_dedupes():
+    """Sources are merged by date, duplicates by GUID are dropped and undated items come last"""
+    sources = [
+        [item('a1', 1), item('a5', 5), item('x', 3)],
+        [item('b4', 4), item('x', 3), item('b0', 0)],
+    ]
+    merged = [entry['guid'] for entry in merge_item_streams(sources, parse)]
+    assert merged == ['a5', 'b4', 'x', 'a1', 'b0']
+
+def test_merge_caps_by_items_and_days():
+    """The merge stops at the item cap or the age cutoff"""
+    sources = [[item('a1', 1), item('a9', 9)], [item('b5', 5)]]
+    assert [entry['guid'] for entry in merge_item_streams(sources, parse, max_items=2)] == ['a9', 'b5']
+
+    now = datetime.datetime(2025, 10, 10, tzinfo=datetime.timezone.utc)
+    merged = merge_item_streams(sources, parse, max_days=6, now=now)
+    assert [entry['guid'] for entry in merged] == ['a9', 'b5']
+
+def test_merged_outputs_from_all_sources(tmp_path, monkeypatch):
+    """--merge-output writes one feed across all target URLs"""
+    results = {
+        'https://a.example.com/': [{'guid': 'a', 'title': 'A', 'pubDate': 'Mon, 06 Oct 2025 00:00:00 +0000',
+                                    'categories': []}],
+        'https://b.example.com/': [{'guid': 'b', 'title': 'B', 'pubDate': 'Tue, 07 Oct 2025 00:00:00 +0000',
+                                    'categories': []}],
+    }
+    monkeypatch.setattr(main, 'scrape_url', lambda url, args, script_dir: results[url])
+    args = main.parse_args(['all', '--merge-output', str(tmp_path / 'all.xml')])
+
+    assert main.write_merged_outputs(list(results), args, '.') == 2
+    feed = (tmp_path / 'all.xml').read_text(encoding='utf-8')
+    assert feed.index('<title>B</title>') < feed.index('<title>A</title>')
+    assert (tmp_path / 'all.csv').exists()
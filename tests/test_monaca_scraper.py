@@ -138,6 +138,54 @@ def test_parse_functions():
     
     print(f"  ✅ Category detection test passed ({len(test_cases)} cases)\n")
 
+def test_container_extraction():
+    """Test container-only extraction from Selenium"""
+    print("Testing container extraction...")
+    
+    import json
+    from scrapers.ja_monaca_io_headline import extract_from_driver, parse_selenium_result
+    
+    fragment = (
+        '<div class="headline-entries">'
+        '<div class="headline-entry"><span class="headline-entry-date">2025年10月15日</span>'
+        '<span class="headline-entry-type-badge">重要</span>'
+        '<div class="headline-entry-content"><a href="/headline/1">メンテナンスのお知らせ</a></div></div>'
+        '</div>'
+    )
+    
+    class FakeDriver:
+        page_source = '<html><body>' + fragment + '</body></html>'
+        
+        def execute_script(self, script, *args):
+            if 'outerHTML' in script:
+                return fragment if args[0] == '.headline-entries' else None
+            return [{'date': '2025年10月15日', 'category': '重要', 'content': 'メンテナンスのお知らせ',
+                     'title': '', 'link': '/headline/1'}]
+    
+    patterns = [{'entry': '.headline-entry', 'date': '.headline-entry-date',
+                 'category': '.headline-entry-type-badge', 'content': '.headline-entry-content', 'title': None}]
+    url = 'https://ja.monaca.io/headline/'
+    
+    outer = {'container': '.headline-entries', 'mode': 'outer_html'}
+    html = extract_from_driver(FakeDriver(), outer)
+    assert html == fragment, "Only the container HTML should be returned"
+    
+    missing = {'container': '.missing', 'mode': 'outer_html'}
+    assert extract_from_driver(FakeDriver(), missing) == FakeDriver.page_source, "Missing container should fall back to page_source"
+    
+    structured = {'container': '.headline-entries', 'mode': 'structured'}
+    result = extract_from_driver(FakeDriver(), structured, patterns)
+    assert json.loads(result)[0]['category'] == '重要'
+    
+    html_items = parse_selenium_result(html, url, patterns, outer)
+    structured_items = parse_selenium_result(result, url, patterns, structured)
+    assert len(html_items) == len(structured_items) == 1
+    for key in ('title', 'description', 'link', 'pubDate'):
+        assert html_items[0][key] == structured_items[0][key], f"{key} should match between modes"
+    assert sorted(html_items[0]['categories']) == sorted(structured_items[0]['categories'])
+    
+    print("  ✅ Container extraction test passed\n")
+
 def main():
     """Run all tests"""
     print("=" * 60)
@@ -150,6 +198,7 @@ def main():
         test_site_config()
         test_chrome_options()
         test_parse_functions()
+        test_container_extraction()
         
         print("=" * 60)
         print("✅ All tests passed!")
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests for feed/CSV output generation in main.py
+"""
+
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import main
+
+URL = 'https://example.com/news'
+
+def sample_items():
+    return [
+        {
+            'title': '重要なお知らせ',
+            'description': 'メンテナンスのお知らせ',
+            'link': 'https://example.com/news/1',
+            'pubDate': 'Mon, 06 Oct 2025 00:00:00 +0000',
+            'categories': ['Important'],
+            'guid': 'https://example.com/news/1#1',
+        },
+    ]
+
+def test_unchanged_items_skip_writing(tmp_path):
+    """Outputs are only rewritten when the item hash changes"""
+    feed = str(tmp_path / 'feed.xml')
+    csv = str(tmp_path / 'feed.csv')
+
+    assert main.write_feed_outputs(sample_items(), URL, feed, csv) is True
+    first_mtime = os.stat(feed).st_mtime_ns
+    assert main.read_hash_sidecar(feed) == main.compute_items_hash(sample_items(), URL)
+
+    assert main.write_feed_outputs(sample_items(), URL, feed, csv) is False
+    assert os.stat(feed).st_mtime_ns == first_mtime
+
+    changed = sample_items()
+    changed[0]['title'] = '更新されたお知らせ'
+    assert main.write_feed_outputs(changed, URL, feed, csv) is True
+    with open(feed, encoding='utf-8') as f:
+        assert '更新されたお知らせ' in f.read()
+
+def test_items_hash_is_stable_across_processes():
+    """Categories built from sets give the same items hash under any hash seed"""
+    import subprocess
+
+    code = ("import main; from scrapers.ja_monaca_io_headline import detect_categories; "
+            "item = dict(title='x', categories=list(detect_categories('重要 メンテナンス 新機能 リリース'))); "
+            "print(main.compute_items_hash([item], 'u'))")
+    src_dir = os.path.join(os.path.dirname(__file__), '..', 'src')
+    hashes = {
+        subprocess.run([sys.executable, '-c', code], cwd=src_dir, capture_output=True, text=True, check=True,
+                       env=dict(os.environ, PYTHONHASHSEED=str(seed))).stdout
+        for seed in (1, 2, 3)
+    }
+    assert len(hashes) == 1
+
+    item = sample_items()[0]
+    assert (main.compute_items_hash([dict(item, categories=['b', 'a'])], URL)
+            == main.compute_items_hash([dict(item, categories=('a', 'b'))], URL))
+
+def test_missing_output_is_rewritten(tmp_path):
+    """A missing output file is regenerated even when the hash matches"""
+    feed = str(tmp_path / 'feed.xml')
+    csv = str(tmp_path / 'feed.csv')
+
+    main.write_feed_outputs(sample_items(), URL, feed, csv)
+    os.remove(csv)
+
+    assert main.write_feed_outputs(sample_items(), URL, feed, csv) is True
+    assert os.path.exists(csv)
+
+def test_atomic_write_leaves_no_temp_files(tmp_path):
+    """Atomic replacement does not leave temporary files behind"""
+    feed = str(tmp_path / 'feed.xml')
+    csv = str(tmp_path / 'feed.csv')
+
+    main.write_feed_outputs(sample_items(), URL, feed, csv, force=True)
+    main.write_feed_outputs(sample_items(), URL, feed, csv, force=True)
+
+    assert sorted(os.listdir(tmp_path)) == ['feed.csv', 'feed.xml', 'feed.xml.hash']
+
+def test_atomic_write_keeps_readable_permissions(tmp_path):
+    """New files follow the umask like open() does, and existing files keep their mode"""
+    import stat
+    from scrapers.state import write_file_atomic
+
+    old_umask = os.umask(0o022)
+    try:
+        path = str(tmp_path / 'feed.xml')
+        write_file_atomic(path, b'a')
+        assert stat.S_IMODE(os.stat(path).st_mode) == 0o644
+
+        os.chmod(path, 0o640)
+        write_file_atomic(path, b'b')
+        assert stat.S_IMODE(os.stat(path).st_mode) == 0o640
+    finally:
+        os.umask(old_umask)
+
+def test_compressed_outputs_with_sidecar(tmp_path):
+    """gzip variants are written with size/hash/ETag metadata and are reproducible"""
+    import gzip
+    import json
+
+    feed = str(tmp_path / 'feed.xml')
+    csv = str(tmp_path / 'feed.csv')
+    compression = {'encodings': ['gzip'], 'level': 6, 'keep_plain': False}
+
+    assert main.write_feed_outputs(sample_items(), URL, feed, csv, compression=compression)
+    assert not os.path.exists(feed)
+    with open(feed + '.gz', 'rb') as f:
+        body = f.read()
+    text = gzip.decompress(body).decode('utf-8')
+    assert text.startswith('<?xml') and '重要なお知らせ' in text
+
+    with open(feed + '.gz.json', encoding='utf-8') as f:
+        metadata = json.load(f)
+    assert metadata['size'] == len(body)
+    assert metadata['encoding'] == 'gzip' and metadata['level'] == 6
+    assert metadata['etag'].strip('"') == metadata['sha256'][:32]
+
+    # Unchanged content is detected from the compressed files
+    assert not main.write_feed_outputs(sample_items(), URL, feed, csv, compression=compression)
+
+def test_ndjson_records_have_stable_schema():
+    """NDJSON lines carry a fixed set of keys with ISO-8601 dates"""
+    import io
+    import json
+
+    items = sample_items() + [dict(sample_items()[0], categories=['Other'], guid='x')]
+    stream = io.StringIO()
+    matches = main.build_item_filter(None, None, None, 'Other')
+
+    assert main.write_ndjson(items, URL, stream, matches, scraper='generic') == 1
+    lines = stream.getvalue().splitlines()
+    record = json.loads(lines[0])
+    assert tuple(record) == main.NDJSON_FIELDS
+    assert record['date'] == '2025-10-06T00:00:00+00:00'
+    assert record['categories'] == ['Important']
+    assert record['source'] == URL and record['scraper'] == 'generic'
+
+def make_item(index, day):
+    return {
+        'title': f'item {index}',
+        'description': f'line "{index}"\nsecond line',
+        'link': f'https://example.com/news/{index}',
+        'pubDate': f'{["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"][(day + 1) % 7]}, {day:02d} Sep 2025 00:00:00 +0000',
+        'categories': ['Info'],
+        'guid': f'https://example.com/news/{index}#g',
+    }
+
+def test_incremental_update_keeps_existing_blocks(tmp_path):
+    """Only new items are added in front and the retention limit evicts from the end"""
+    feed = str(tmp_path / 'feed.xml')
+    csv = str(tmp_path / 'feed.csv')
+
+    stats = main.update_feed_incrementally([make_item(2, 2), make_item(1, 1)], URL, feed, csv)
+    assert stats == {'added': 2, 'evicted': 0, 'retained': 2}
+
+    stats = main.update_feed_incrementally([make_item(3, 3), make_item(2, 2)], URL, feed, csv, max_items=2)
+    assert stats == {'added': 1, 'evicted': 1, 'retained': 2}
+
+    text = open(feed, encoding='utf-8').read()
+    assert text.index('item 3') < text.index('item 2') and 'item 1' not in text
+    assert main.get_latest_date_from_feed(feed).day == 3
+
+    from incremental import split_csv_rows
+    _, rows = split_csv_rows(open(csv, encoding='utf-8').read())
+    assert len(rows) == 2 and 'item 3' in rows[0]
+
+    # Nothing new: the files are left untouched
+    mtime = os.path.getmtime(feed)
+    assert main.update_feed_incrementally([make_item(3, 3)], URL, feed, csv)['added'] == 0
+    assert os.path.getmtime(feed) == mtime
+
+def test_incremental_update_orders_by_date(tmp_path):
+    """A newly found but older item is placed by date, so retention evicts it instead of a newer one"""
+    feed = str(tmp_path / 'feed.xml')
+    csv = str(tmp_path / 'feed.csv')
+
+    main.update_feed_incrementally([make_item(3, 3), make_item(2, 2)], URL, feed, csv)
+    stats = main.update_feed_incrementally([make_item(1, 1)], URL, feed, csv, max_items=2)
+    assert stats == {'added': 0, 'evicted': 1, 'retained': 2}
+
+    text = open(feed, encoding='utf-8').read()
+    assert text.index('item 3') < text.index('item 2') and 'item 1' not in text
+
+def test_unparsable_feed_is_rewritten(tmp_path):
+    """A block that is not valid XML makes the update fall back to a full rewrite"""
+    feed = str(tmp_path / 'feed.xml')
+    csv = str(tmp_path / 'feed.csv')
+
+    main.update_feed_incrementally([make_item(1, 1)], URL, feed, csv)
+    text = open(feed, encoding='utf-8').read()
+    with open(feed, 'w', encoding='utf-8') as f:
+        f.write(text.replace('<title>item 1</title>', '<title>Q&A item 1</title>'))
+    os.remove(csv)
+
+    stats = main.update_feed_incrementally([make_item(2, 2)], URL, feed, csv)
+    assert stats == {'added': 1, 'evicted': 0, 'retained': 1}
+    assert 'item 2' in open(csv, encoding='utf-8').read()
+
+def test_next_available_filename_fills_first_gap(tmp_path):
+    """Numbered files are found with a single directory scan"""
+    for name in ('feed.xml', 'feed_1.xml', 'feed_3.xml'):
+        (tmp_path / name).write_text('')
+    assert main.get_next_available_filename(str(tmp_path / 'feed.xml')) == str(tmp_path / 'feed_2.xml')
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests for pagination with stop-on-seen-GUID
+"""
+
+import sys
+import os
+import threading
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from bs4 import BeautifulSoup
+
+from scrapers import pagination
+
+URL = 'https://vendor.example.com/news'
+
+def page_html(page, next_link=True):
+    entries = ''.join(f'<li data-guid="p{page}-{i}">2025-0{9 - page}-1{i}</li>' for i in range(2))
+    link = f'<a rel="next" href="/news?page={page + 1}">older</a>' if next_link else ''
+    return f'<ul>{entries}</ul>{link}'
+
+def parse_page(page_url, soup):
+    return [{'guid': li['data-guid'], 'pubDate': li.get_text()} for li in soup.select('li')]
+
+def test_numbered_pages_are_prefetched_and_stop_on_seen_guid(monkeypatch, tmp_path):
+    """A backfill walks the pages; the next run stops at the first page"""
+    monkeypatch.setenv('FEED_GENERATOR_STATE_DIR', str(tmp_path))
+    fetched = []
+    lock = threading.Lock()
+
+    def fetch_html(page_url):
+        with lock:
+            fetched.append(page_url)
+        page = int(page_url.rsplit('=', 1)[1])
+        return page_html(page) if page <= 4 else '<ul></ul>'
+
+    rules = {'url_template': '?page={page}', 'max_pages': 10, 'prefetch': 2}
+    items = pagination.crawl(URL, BeautifulSoup(page_html(1), 'html.parser'), parse_page, fetch_html, rules)
+    assert len(items) == 8
+    assert len(fetched) <= 6  # pages 2-5 plus at most prefetch-1 pages beyond the empty one
+
+    fetched.clear()
+    items = pagination.crawl(URL, BeautifulSoup(page_html(1), 'html.parser'), parse_page, fetch_html, rules)
+    assert len(items) == 2
+    assert fetched == []
+
+def test_next_links_stop_at_date_cutoff(monkeypatch, tmp_path):
+    """Next-page links are followed until a page is entirely older than since"""
+    monkeypatch.setenv('FEED_GENERATOR_STATE_DIR', str(tmp_path))
+    fetched = []
+
+    def fetch_html(page_url):
+        fetched.append(page_url)
+        return page_html(int(page_url.rsplit('=', 1)[1]))
+
+    items = pagination.crawl(URL, BeautifulSoup(page_html(1), 'html.parser'), parse_page, fetch_html,
+                             {'max_pages': 10}, since='2025-06-15')
+    # page 2 (2025-07) is kept, page 3 (2025-06-10/11) is older than the cutoff and ends the crawl
+    assert fetched == [f'{URL}?page=2', f'{URL}?page=3']
+    assert len(items) == 6
+
+def test_stop_rule_uses_the_last_entry():
+    """The crawl stops when the page's last entry is known, not when only a pinned entry is"""
+    seen = {'pinned', 'p1-1', 'p2-0', 'p2-1'}
+
+    # 通常の差分取得: 新しい項目が1件あっても、最後の項目が取得済みなら次のページは取得しない
+    assert pagination.should_stop([{'guid': 'new'}, {'guid': 'p1-1'}], seen, None) is not None
+    # 先頭に固定表示された取得済みの項目だけでは終了しない
+    assert pagination.should_stop([{'guid': 'pinned'}, {'guid': 'new-1'}, {'guid': 'new-2'}], seen, None) is None
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests for the static-content probe that decides whether Chrome is needed
+"""
+
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from scrapers import probe
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+def make_fetch(calls, html='<div class="entry">a</div><div class="entry">b</div>'):
+    def fake_get(url, headers=None, **kwargs):
+        calls.append(url)
+        return FakeResponse(html)
+    return fake_get
+
+def count_entries(html):
+    return [{'title': str(i)} for i in range(html.count('class="entry"'))]
+
+def test_requires_selenium_skips_probe(monkeypatch, tmp_path):
+    """Sites marked as requiring JavaScript go straight to the browser"""
+    monkeypatch.setenv('FEED_GENERATOR_STATE_DIR', str(tmp_path))
+    calls = []
+    monkeypatch.setattr(probe.fetch, 'get', make_fetch(calls))
+
+    items, needs_browser = probe.scrape_static_first(
+        'https://example.com/', {'requires_selenium': True}, count_entries)
+
+    assert items is None and needs_browser
+    assert calls == []
+
+def test_server_rendered_site_does_not_need_browser(monkeypatch, tmp_path):
+    """Static HTML with enough items is used directly"""
+    monkeypatch.setenv('FEED_GENERATOR_STATE_DIR', str(tmp_path))
+    calls = []
+    monkeypatch.setattr(probe.fetch, 'get', make_fetch(calls))
+
+    items, needs_browser = probe.scrape_static_first(
+        'https://example.com/', {'min_items_threshold': 2}, count_entries)
+
+    assert len(items) == 2 and not needs_browser
+    assert probe.get_probe_result('https://example.com/')['static_ok'] is True
+
+def test_insufficient_probe_is_remembered(monkeypatch, tmp_path):
+    """Once static HTML is known to be insufficient, later runs skip the probe"""
+    monkeypatch.setenv('FEED_GENERATOR_STATE_DIR', str(tmp_path))
+    calls = []
+    monkeypatch.setattr(probe.fetch, 'get', make_fetch(calls, html='<div class="entries"></div>'))
+    config = {'min_items_threshold': 2}
+
+    items, needs_browser = probe.scrape_static_first('https://example.com/', config, count_entries)
+    assert items == [] and needs_browser
+    assert len(calls) == 1
+
+    items, needs_browser = probe.scrape_static_first('https://example.com/', config, count_entries)
+    assert items is None and needs_browser
+    assert len(calls) == 1, "The recorded outcome should skip the probe"
+
+    # An expired record triggers a new probe
+    items, needs_browser = probe.scrape_static_first(
+        'https://example.com/', dict(config, probe_ttl=-1), count_entries)
+    assert len(calls) == 2
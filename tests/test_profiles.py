@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests for filter profiles (many outputs from a single scrape)
+"""
+
+import datetime
+import json
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import pytest
+
+import main
+import profiles
+
+URL = 'https://example.com/news'
+
+def sample_items():
+    return [
+        {'title': 'a', 'description': 'a', 'link': URL, 'guid': f'{URL}#a',
+         'pubDate': 'Mon, 06 Oct 2025 00:00:00 +0000', 'categories': ['Deprecated']},
+        {'title': 'b', 'description': 'b', 'link': URL, 'guid': f'{URL}#b',
+         'pubDate': 'Wed, 01 Jan 2025 00:00:00 +0000', 'categories': ['Other']},
+    ]
+
+def test_load_profiles_toml_and_json(tmp_path):
+    """TOML and JSON profile files are accepted; unknown keys are rejected"""
+    toml_path = tmp_path / 'profiles.toml'
+    toml_path.write_text('[[profiles]]\nname = "dep"\ncategory = "deprecated"\n\n[[profiles]]\nsince_days = 30\n')
+    loaded = profiles.load_profiles(str(toml_path))
+    assert [p['name'] for p in loaded] == ['dep', 'profile2']
+
+    json_path = tmp_path / 'profiles.json'
+    json_path.write_text(json.dumps([{'name': 'x', 'categroy': 'typo'}]))
+    with pytest.raises(ValueError):
+        profiles.load_profiles(str(json_path))
+
+def test_invalid_profile_values_are_rejected_on_load(tmp_path):
+    """Dates and value types are checked when the file is loaded, not when outputs are written"""
+    json_path = tmp_path / 'profiles.json'
+    for profile in ({'since': '2025/01/01'}, {'until': 20250101}, {'since_days': '30'},
+                    {'category': ['a']}, {'urls': 'https://example.com'}):
+        json_path.write_text(json.dumps([profile]))
+        with pytest.raises(ValueError):
+            profiles.load_profiles(str(json_path))
+
+    toml_path = tmp_path / 'profiles.toml'
+    toml_path.write_text('[[profiles]]\nsince = 2025-01-01\n')
+    assert profiles.load_profiles(str(toml_path))[0]['since'] == '2025-01-01'
+
+def test_since_days_and_output_paths():
+    """since_days is relative to today and paths expand placeholders"""
+    assert profiles.resolve_since({'since_days': 10}, datetime.date(2025, 10, 11)) == '2025-10-01'
+
+    feed, csv = profiles.resolve_output_paths({'name': 'dep'}, URL, 'example_com_news.xml')
+    assert (feed, csv) == ('example_com_news_dep.xml', 'example_com_news_dep.csv')
+
+    feed, _ = profiles.resolve_output_paths({'name': 'dep', 'feed_output': 'dep.xml'}, URL, 'x.xml', True)
+    assert feed == 'dep_example_com.xml'
+
+def test_profiles_write_all_outputs_from_one_scrape(tmp_path):
+    """Each profile receives only its matching items"""
+    profile_list = [
+        {'name': 'dep', 'category': 'deprecated', 'feed_output': str(tmp_path / '{name}.xml')},
+        {'name': 'recent', 'since': '2025-06-01', 'feed_output': str(tmp_path / '{name}.xml')},
+        {'name': 'all', 'feed_output': str(tmp_path / '{name}.xml')},
+    ]
+    counts = main.write_profile_outputs(URL, sample_items(), profile_list, 'unused.xml')
+
+    assert counts == {'dep': 1, 'recent': 1, 'all': 2}
+    assert (tmp_path / 'all.xml').exists()
+    assert (tmp_path / 'all.csv').exists()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests for the built-in site scheduler
+"""
+
+import sys
+import os
+import threading
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from scheduler import SiteScheduler
+from scrapers.config import get_site_config
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+def test_refresh_interval_from_site_config():
+    """Sites without an explicit interval use refresh_interval from SITE_CONFIGS"""
+    clock = FakeClock()
+    scheduler = SiteScheduler(lambda url: None, jitter=0, clock=clock)
+    url = 'https://ja.monaca.io/headline/'
+    scheduler.add_site(url)
+
+    assert scheduler._intervals[url] == get_site_config(url)['refresh_interval']
+
+def test_triggers_are_coalesced():
+    """Repeated triggers for the same site result in a single run"""
+    clock = FakeClock()
+    calls = []
+    done = threading.Event()
+
+    def job(url):
+        calls.append(url)
+        done.set()
+
+    scheduler = SiteScheduler(job, jitter=0, clock=clock)
+    scheduler.add_site('https://example.com/news', interval=60)
+    scheduler.trigger('https://example.com/news')
+    scheduler.trigger('https://example.com/news')
+
+    assert scheduler.run_pending() == 1
+    assert done.wait(timeout=5)
+    assert calls == ['https://example.com/news']
+    assert scheduler.stats['coalesced'] == 2
+
+def test_skip_while_in_flight():
+    """A due run is skipped while the previous run for the site is still running"""
+    clock = FakeClock()
+    release = threading.Event()
+    started = threading.Event()
+
+    def job(url):
+        started.set()
+        release.wait(timeout=5)
+
+    scheduler = SiteScheduler(job, jitter=0, max_workers=2, clock=clock)
+    scheduler.add_site('https://example.com/news', interval=60)
+
+    assert scheduler.run_pending() == 1
+    assert started.wait(timeout=5)
+
+    clock.now += 61
+    assert scheduler.run_pending() == 0
+    assert scheduler.stats['skipped_in_flight'] == 1
+
+    release.set()
+    scheduler.stop()
+    scheduler.run()
+    assert scheduler.stats['runs'] == 1
+
+def test_jitter_spreads_first_runs():
+    """First runs are spread within the jitter window"""
+    import random
+
+    clock = FakeClock()
+    scheduler = SiteScheduler(lambda url: None, jitter=30, clock=clock, rng=random.Random(1))
+    for i in range(5):
+        scheduler.add_site(f'https://example.com/{i}', interval=60)
+
+    run_times = list(scheduler._next_run.values())
+    assert all(clock.now <= t <= clock.now + 30 for t in run_times)
+    assert len(set(run_times)) == len(run_times)
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests for sharded feed outputs
+"""
+
+import json
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import xml.etree.ElementTree as ET
+
+import main
+
+URL = 'https://firebase.google.com/support/releases'
+
+def sample_items():
+    items = []
+    for index, (month, product) in enumerate([('Oct', 'Auth'), ('Oct', 'Firestore'), ('Sep', 'Auth'),
+                                              ('Aug', 'Hosting'), ('Aug', None)]):
+        items.append({
+            'title': f'item {index}',
+            'description': f'content {index}',
+            'link': f'{URL}#{index}',
+            'pubDate': f'Wed, 01 {month} 2025 00:00:00 +0000',
+            'categories': ['Feature', 'Important'] if index == 0 else ['Fixed'],
+            'product': product,
+            'guid': f'{URL}#{index}',
+        })
+    return items
+
+def test_shard_by_product_with_bounded_handles(tmp_path):
+    """Each shard is a complete feed even when handles are evicted"""
+    base = str(tmp_path / 'firebase.xml')
+    index = main.write_sharded_outputs(sample_items(), URL, 'product', base, max_open_files=1)
+
+    counts = {shard['key']: shard['item_count'] for shard in index['shards']}
+    assert counts == {'Auth': 2, 'Firestore': 1, 'Hosting': 1, 'unknown': 1}
+
+    root = ET.parse(tmp_path / 'firebase_Auth.xml').getroot()
+    assert [e.text for e in root.iter('title')][1:] == ['item 0', 'item 2']
+    assert (tmp_path / 'firebase_Auth.csv').read_text().count('\n') == 3
+
+    with open(tmp_path / 'firebase_index.json', encoding='utf-8') as f:
+        assert json.load(f)['shard_by'] == 'product'
+    assert not [name for name in os.listdir(tmp_path) if name.startswith('.tmp-')]
+
+def test_shard_by_month_and_category_skip_unchanged(tmp_path):
+    """Items with several categories go to each category shard; unchanged shards are not rewritten"""
+    base = str(tmp_path / 'feed.xml')
+    index = main.write_sharded_outputs(sample_items(), URL, 'month', base)
+    assert [shard['key'] for shard in index['shards']] == ['2025-08', '2025-09', '2025-10']
+
+    index = main.write_sharded_outputs(sample_items(), URL, 'category', base)
+    counts = {shard['key']: shard['item_count'] for shard in index['shards']}
+    assert counts == {'Feature': 1, 'Fixed': 4, 'Important': 1}
+
+    index = main.write_sharded_outputs(sample_items(), URL, 'category', base)
+    assert not any(shard['updated'] for shard in index['shards'])
+
+def test_category_order_and_dropped_shards(tmp_path):
+    """Reordered categories do not update shards, and shards whose key disappears are deleted"""
+    base = str(tmp_path / 'feed.xml')
+    main.write_sharded_outputs(sample_items(), URL, 'category', base, compression={
+        'encodings': ['gzip'], 'level': 6, 'keep_plain': True})
+    assert (tmp_path / 'feed_Feature.xml.gz').exists()
+    assert (tmp_path / 'feed_Feature.csv.gz.json').exists()
+
+    reordered = sample_items()
+    reordered[0]['categories'] = ['Important', 'Feature']
+    index = main.write_sharded_outputs(reordered, URL, 'category', base, compression={
+        'encodings': ['gzip'], 'level': 6, 'keep_plain': True})
+    assert not any(shard['updated'] for shard in index['shards'])
+
+    index = main.write_sharded_outputs(sample_items()[1:], URL, 'category', base)
+    assert [shard['key'] for shard in index['shards']] == ['Fixed']
+    assert sorted(os.listdir(tmp_path)) == ['feed_Fixed.csv', 'feed_Fixed.csv.gz', 'feed_Fixed.csv.gz.json',
+                                            'feed_Fixed.xml', 'feed_Fixed.xml.gz', 'feed_Fixed.xml.gz.json',
+                                            'feed_Fixed.xml.hash', 'feed_index.json']
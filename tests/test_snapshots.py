@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests for stale-while-revalidate snapshots
+"""
+
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import main
+import snapshots
+
+URL = 'https://example.com/news'
+
+def make_items(count):
+    return [
+        {
+            'title': f'お知らせ{i}',
+            'description': f'お知らせ{i}の本文',
+            'link': f'https://example.com/news/{i}',
+            'pubDate': 'Mon, 06 Oct 2025 00:00:00 +0000',
+            'categories': ['Other'],
+            'guid': f'https://example.com/news/{i}',
+        }
+        for i in range(count)
+    ]
+
+def run(monkeypatch, tmp_path, result):
+    """スクレイピング結果を差し替えて処理し、出力されたアイテム数の履歴を返す"""
+    written = []
+    monkeypatch.setattr(main, 'scrape_url', lambda url, args, script_dir: result)
+    monkeypatch.setattr(main, 'write_url_outputs', lambda url, items, *args, **kwargs: written.append(len(items)))
+    args = main.parse_args([URL, '--stale-while-revalidate', '--feed-output', str(tmp_path / 'feed.xml')])
+    assert main.process_url(URL, args, str(tmp_path)) is True
+    return written
+
+def test_snapshot_is_published_first_and_kept_on_thin_result(monkeypatch, tmp_path):
+    """A failed or thin scrape keeps the last good items; a good one replaces them"""
+    monkeypatch.setenv('FEED_GENERATOR_STATE_DIR', str(tmp_path))
+
+    assert run(monkeypatch, tmp_path, make_items(10)) == [10]
+    assert len(snapshots.load_snapshot(URL)['items']) == 10
+
+    # 取得に失敗した場合と少ない場合は、スナップショットの出力のみ
+    assert run(monkeypatch, tmp_path, None) == [10]
+    assert run(monkeypatch, tmp_path, make_items(3)) == [10]
+    assert run(monkeypatch, tmp_path, make_items(9)) == [10]
+    assert len(snapshots.load_snapshot(URL)['items']) == 10
+
+    # 同等以上の場合は、スナップショットの出力の後に置き換える
+    assert run(monkeypatch, tmp_path, make_items(12)) == [10, 12]
+    assert len(snapshots.load_snapshot(URL)['items']) == 12
+
+def test_min_ratio_is_configurable():
+    """Sites can accept a somewhat smaller result with snapshot_min_ratio"""
+    snapshot = {'items': make_items(10)}
+    assert not snapshots.is_at_least_as_good(make_items(5), snapshot)
+    assert snapshots.is_at_least_as_good(make_items(10), snapshot)
+    assert snapshots.is_at_least_as_good(make_items(8), snapshot, min_ratio=0.8)
+    assert not snapshots.is_at_least_as_good(make_items(8), snapshot, min_items=9, min_ratio=0.5)
+
+def test_snapshot_max_age(monkeypatch, tmp_path):
+    """Snapshots older than max_age are ignored"""
+    monkeypatch.setenv('FEED_GENERATOR_STATE_DIR', str(tmp_path))
+    snapshots.save_snapshot(URL, make_items(2), now=1000.0)
+
+    assert snapshots.load_snapshot(URL, max_age=60, now=1030.0) is not None
+    assert snapshots.load_snapshot(URL, max_age=60, now=1100.0) is None
+    assert snapshots.load_snapshot('https://example.com/other') is None